@@ -1,12 +1,25 @@
 import logging
 from aiogram import executor
+from aiogram.utils.executor import Executor
+from data import config
 from loader import dp, bot
-from utils.db_api.users import init_users_db
-from utils.db_api.jurnallar import init_journals_db
+from utils.db_api.pool import db_pool
+from utils.db_api.activity import activity_buffer
+from utils.db_api.catalog import catalog
+from utils.db_api.backup import backup_job
+from utils.db_api.maintenance import maintenance_job
+from utils.db_api.migrations import migrate
+from utils.misc.broadcast import broadcaster
+from utils.misc.metrics_server import metrics_server
+from utils.misc.watchdog import loop_watchdog
+from utils.misc.webhook import SecretWebhookRequestHandler, setup_webhook, webhook_inflight
 
 # Handlerlarni import qilish
 import handlers.users.start  # User handlerlar
 import handlers.users.admin  # Admin handlerlar
+import middlewares
+
+middlewares.setup(dp)
 
 # Logging ni sozlash
 logging.basicConfig(
@@ -23,15 +36,50 @@ async def on_startup(dispatcher):
     """Bot ishga tushganda"""
     logger.info("Bot ishga tushmoqda...")
 
-    # Ma'lumotlar bazasini yaratish (users va journals)
+    # Ma'lumotlar bazasi sxemasini yangilash (migratsiyalar, event loop bloklanmasligi uchun alohida threadda)
     try:
-        init_users_db()
-        init_journals_db()
+        await db_pool.run(migrate)
         logger.info("Ma'lumotlar bazasi muvaffaqiyatli yaratildi")
+        pragmas = await db_pool.run(db_pool.get_pragmas)
+        logger.info(f"Ma'lumotlar bazasi sozlamalari: {pragmas}")
+
+        # Fanlar va bo'limlar katalogini xotiraga yuklash (boshqa nusxalardagi o'zgarishlar davriy tekshiriladi)
+        await db_pool.run(catalog.refresh)
+        catalog.start()
     except Exception as e:
         logger.error(f"Ma'lumotlar bazasi yaratishda xatolik: {str(e)}")
         return
 
+    # Event loop kechikishini o'lchash va Prometheus endpointi
+    loop_watchdog.start()
+    if config.METRICS_ENABLED:
+        try:
+            await metrics_server.start()
+        except Exception as e:
+            logger.error(f"Metrikalar serverini ishga tushirishda xatolik: {str(e)}")
+
+    # Foydalanuvchilar faolligini davriy yozishni boshlash
+    activity_buffer.start()
+
+    # Jadval bo'yicha backup
+    backup_job.start()
+
+    # Kam yuklamali soatda baza xizmati
+    maintenance_job.start()
+
+    # Bot to'xtaganda uzilib qolgan xabar tarqatishlarni davom ettirish
+    try:
+        await broadcaster.resume(bot)
+    except Exception as e:
+        logger.error(f"Xabar tarqatishni davom ettirishda xatolik: {str(e)}")
+
+    # Webhook manzilini o'rnatish
+    if config.WEBHOOK_ENABLED:
+        try:
+            await setup_webhook(bot)
+        except Exception as e:
+            logger.error(f"Webhook o'rnatishda xatolik: {str(e)}")
+
     # Bot ma'lumotlarini olish
     try:
         bot_info = await bot.get_me()
@@ -44,19 +92,54 @@ async def on_shutdown(dispatcher):
     logger.info("Bot to'xtatilmoqda...")
 
     try:
+        # Ishlanayotgan webhook so'rovlari tugashini kutish (baza yopilishidan oldin).
+        # Webhook o'chirilmaydi - boshqa nusxalar ishlashda davom etishi mumkin
+        if config.WEBHOOK_ENABLED:
+            await webhook_inflight.drain(config.WEBHOOK_DRAIN_TIMEOUT)
+
+        # Joriy chunk tugashini kutib, tarqatish jarayonini saqlash
+        await broadcaster.stop()
+
         await dp.storage.close()
         await dp.storage.wait_closed()
+
+        await catalog.stop()
+        await backup_job.stop()
+        await maintenance_job.stop()
+        await metrics_server.stop()
+        await loop_watchdog.stop()
+
+        # Navbatda qolgan faollik yozuvlarini bazaga yozish
+        await activity_buffer.stop()
+        logger.info(f"Ma'lumotlar bazasi statistikasi: {db_pool.get_stats()}")
+        logger.info(f"Obuna keshi statistikasi: {handlers.users.start.subscription_cache.get_stats()}")
+        logger.info(f"Sahifalar keshi statistikasi: {handlers.users.start.jurnallar_page_cache.get_stats()}")
+        logger.info(f"Bot API navbati statistikasi: {bot.get_stats()}")
+        logger.info(f"Event loop kechikishi: {loop_watchdog.get_stats()}")
+        db_pool.close()
         logger.info("Bot muvaffaqiyatli to'xtatildi")
     except Exception as e:
         logger.error(f"Bot to'xtatishda xatolik: {str(e)}")
 
 if __name__ == '__main__':
     try:
-        executor.start_polling(
-            dp,
-            on_startup=on_startup,
-            on_shutdown=on_shutdown,
-            skip_updates=True
-        )
+        if config.WEBHOOK_ENABLED:
+            webhook_executor = Executor(dp, skip_updates=False)
+            webhook_executor.on_startup(on_startup)
+            webhook_executor.on_shutdown(on_shutdown)
+            webhook_executor.start_webhook(
+                webhook_path=config.WEBHOOK_PATH,
+                request_handler=SecretWebhookRequestHandler,
+                host=config.WEBAPP_HOST,
+                port=config.WEBAPP_PORT,
+                shutdown_timeout=config.WEBHOOK_DRAIN_TIMEOUT
+            )
+        else:
+            executor.start_polling(
+                dp,
+                on_startup=on_startup,
+                on_shutdown=on_shutdown,
+                skip_updates=True
+            )
     except Exception as e:
-        logger.error(f"Bot ishga tushishda xatolik: {str(e)}")
\ No newline at end of file
+        logger.error(f"Bot ishga tushishda xatolik: {str(e)}")
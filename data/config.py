@@ -8,3 +8,92 @@ BOT_TOKEN = env.str("BOT_TOKEN")  # Bot token
 ADMINS = env.list("ADMINS", subcast=int)  # Adminlar ro'yxati (int sifatida)
 IP = env.str("ip")  # Xosting IP manzili
 
+# Ma'lumotlar bazasi sozlamalari
+DB_NAME = env.str("DB_NAME", "bot_database.db")  # SQLite fayli
+DB_POOL_SIZE = env.int("DB_POOL_SIZE", 4)  # Ulanishlar puli hajmi
+DB_SLOW_QUERY_MS = env.int("DB_SLOW_QUERY_MS", 100)  # Sekin so'rov chegarasi (ms)
+DB_JOURNAL_MODE = env.str("DB_JOURNAL_MODE", "WAL")  # O'qish va yozish bir-birini bloklamasligi uchun
+DB_SYNCHRONOUS = env.str("DB_SYNCHRONOUS", "NORMAL")  # WAL rejimida xavfsiz va tezroq
+DB_CACHE_SIZE = env.int("DB_CACHE_SIZE", -16000)  # Manfiy qiymat - KiB (16 MB)
+DB_MMAP_SIZE = env.int("DB_MMAP_SIZE", 134217728)  # Xotiraga akslantirish hajmi (bayt, 128 MB)
+DB_BUSY_TIMEOUT = env.int("DB_BUSY_TIMEOUT", 30000)  # Baza band bo'lsa kutish (ms)
+DB_VACUUM_MIGRATION_MAX_MB = env.int("DB_VACUUM_MIGRATION_MAX_MB", 200)  # Ishga tushishda VACUUM qilinadigan maksimal baza hajmi (0 - o'chirilgan)
+ACTIVITY_FLUSH_INTERVAL = env.int("ACTIVITY_FLUSH_INTERVAL", 30)  # Faollikni bazaga yozish oralig'i (soniya)
+ACTIVITY_FLUSH_SIZE = env.int("ACTIVITY_FLUSH_SIZE", 500)  # Shuncha yozuv yig'ilsa darhol yoziladi
+
+# Inline rejim sozlamalari
+INLINE_CACHE_TIME = env.int("INLINE_CACHE_TIME", 300)  # Telegram serverida natijalarni keshlash (soniya)
+INLINE_RESULTS_CACHE_TTL = env.int("INLINE_RESULTS_CACHE_TTL", 600)  # Bot ichidagi natijalar keshi (soniya)
+
+# Majburiy obuna tekshiruvi keshi
+SUBSCRIPTION_CACHE_TTL = env.int("SUBSCRIPTION_CACHE_TTL", 300)  # Obuna bo'lganlar uchun (soniya)
+SUBSCRIPTION_NEGATIVE_TTL = env.int("SUBSCRIPTION_NEGATIVE_TTL", 30)  # Obuna bo'lmaganlar uchun (soniya)
+
+# Jurnallar ro'yxati keshi
+PAGE_CACHE_SIZE = env.int("PAGE_CACHE_SIZE", 512)  # Tayyor sahifalar soni
+CATALOG_CHECK_INTERVAL = env.float("CATALOG_CHECK_INTERVAL", 5)  # Boshqa nusxalardagi o'zgarishlarni tekshirish (soniya, 0 - o'chirilgan)
+SEARCH_QUERY_TTL = env.int("SEARCH_QUERY_TTL", 3600)  # Qidiruv sahifalari uchun so'rov saqlanadi (soniya)
+
+# Webhook sozlamalari (o'chirilgan bo'lsa polling ishlatiladi)
+WEBHOOK_ENABLED = env.bool("WEBHOOK_ENABLED", False)
+WEBHOOK_HOST = env.str("WEBHOOK_HOST", "")  # Tashqi manzil, masalan https://bot.example.uz
+WEBHOOK_PATH = env.str("WEBHOOK_PATH", "/webhook")
+WEBHOOK_URL = f"{WEBHOOK_HOST}{WEBHOOK_PATH}"
+WEBHOOK_SECRET = env.str("WEBHOOK_SECRET", "")  # X-Telegram-Bot-Api-Secret-Token qiymati
+WEBHOOK_MAX_CONNECTIONS = env.int("WEBHOOK_MAX_CONNECTIONS", 40)
+WEBHOOK_DRAIN_TIMEOUT = env.int("WEBHOOK_DRAIN_TIMEOUT", 30)  # To'xtashda so'rovlarni kutish (soniya)
+WEBAPP_HOST = env.str("WEBAPP_HOST", "127.0.0.1")  # Lokal aiohttp server manzili
+WEBAPP_PORT = env.int("WEBAPP_PORT", 8080)
+
+# FSM storage sozlamalari
+FSM_STORAGE = env.str("FSM_STORAGE", "memory")  # memory, sqlite yoki redis
+FSM_STATE_TTL = env.int("FSM_STATE_TTL", 86400)  # Tashlab ketilgan holatlar muddati (soniya)
+REDIS_HOST = env.str("REDIS_HOST", "localhost")
+REDIS_PORT = env.int("REDIS_PORT", 6379)
+REDIS_DB = env.int("REDIS_DB", 0)
+REDIS_PASSWORD = env.str("REDIS_PASSWORD", None)
+
+# Backup sozlamalari
+BACKUP_DIR = env.str("BACKUP_DIR", "backups")
+BACKUP_KEEP = env.int("BACKUP_KEEP", 7)  # Saqlanadigan nusxalar soni
+BACKUP_COMPRESS = env.bool("BACKUP_COMPRESS", True)  # gzip bilan siqish
+BACKUP_INTERVAL = env.int("BACKUP_INTERVAL", 86400)  # Avtomatik backup oralig'i (soniya, 0 - o'chirilgan)
+BACKUP_PAGES = env.int("BACKUP_PAGES", 256)  # Bir qadamda ko'chiriladigan sahifalar
+BACKUP_STEP_SLEEP = env.float("BACKUP_STEP_SLEEP", 0.05)  # Qadamlar orasidagi pauza (soniya)
+BACKUP_MAX_RESTARTS = env.int("BACKUP_MAX_RESTARTS", 5)  # Baza o'zgarib nusxa qayta boshlansa, shundan keyin bitta qadamda olinadi
+
+# Baza xizmati (PRAGMA optimize, incremental_vacuum, wal_checkpoint) sozlamalari
+MAINTENANCE_HOUR = env.int("MAINTENANCE_HOUR", 4)  # Har kuni bajariladigan soat (mahalliy vaqt, -1 - o'chirilgan)
+MAINTENANCE_VACUUM_PAGES = env.int("MAINTENANCE_VACUUM_PAGES", 1000)  # Bir tranzaksiyada qaytariladigan sahifalar
+
+# Xabar tarqatish (broadcast) sozlamalari
+BROADCAST_CONCURRENCY = env.int("BROADCAST_CONCURRENCY", 10)  # Bir vaqtdagi so'rovlar
+BROADCAST_CHUNK_SIZE = env.int("BROADCAST_CHUNK_SIZE", 100)  # Bazadan bir martada olinadigan foydalanuvchilar
+BROADCAST_REPORT_INTERVAL = env.float("BROADCAST_REPORT_INTERVAL", 3)  # Admin xabarini yangilash oralig'i (soniya)
+BROADCAST_MAX_RETRIES = env.int("BROADCAST_MAX_RETRIES", 3)  # RetryAfter dan keyin qayta urinishlar (keyin - xatolik)
+
+# Eksport sozlamalari
+EXPORT_CHUNK_SIZE = env.int("EXPORT_CHUNK_SIZE", 1000)  # Bazadan bir martada o'qiladigan qatorlar
+
+# Anti-flood (ThrottlingMiddleware) sozlamalari
+THROTTLE_RATE_LIMIT = env.float("THROTTLE_RATE_LIMIT", 0.5)  # Handler o'rtacha necha soniyada bir marta chaqirilishi mumkin
+THROTTLE_BURST = env.int("THROTTLE_BURST", 5)  # Ketma-ket ruxsat etilgan so'rovlar (faqat standart limitdagi handlerlar uchun)
+THROTTLE_IDLE_TTL = env.int("THROTTLE_IDLE_TTL", 600)  # Ishlatilmagan chelaklar xotiradan o'chiriladi (soniya)
+THROTTLE_MAX_BUCKETS = env.int("THROTTLE_MAX_BUCKETS", 100000)  # Xotiradagi chelaklar soni chegarasi
+
+# Chiquvchi Bot API so'rovlari limitlari
+BOT_GLOBAL_RATE = env.float("BOT_GLOBAL_RATE", 30)  # Barcha chatlarga soniyasiga xabarlar
+BOT_CHAT_RATE = env.float("BOT_CHAT_RATE", 1)  # Bitta shaxsiy chatga soniyasiga xabarlar
+BOT_CHAT_BURST = env.int("BOT_CHAT_BURST", 3)  # Shaxsiy chatga ketma-ket xabarlar
+BOT_GROUP_RATE = env.float("BOT_GROUP_RATE", 0.33)  # Guruhga soniyasiga xabarlar (~20/daqiqa)
+BOT_INTERACTIVE_RESERVE = env.float("BOT_INTERACTIVE_RESERVE", 5)  # Xabar tarqatish ishlata olmaydigan xabar/s (javoblar uchun)
+BOT_MAX_RETRIES = env.int("BOT_MAX_RETRIES", 3)  # RetryAfter dan keyin qayta urinishlar
+BOT_MAX_RETRY_DELAY = env.float("BOT_MAX_RETRY_DELAY", 30)  # Bundan uzoq kutish so'ralsa qayta urinilmaydi (soniya)
+
+# Prometheus metrikalari (lokal HTTP endpoint) sozlamalari
+METRICS_ENABLED = env.bool("METRICS_ENABLED", False)
+METRICS_HOST = env.str("METRICS_HOST", "127.0.0.1")  # Docker ichida 0.0.0.0
+METRICS_PORT = env.int("METRICS_PORT", 9108)
+METRICS_PATH = env.str("METRICS_PATH", "/metrics")
+LOOP_LAG_INTERVAL = env.float("LOOP_LAG_INTERVAL", 0.1)  # Event loop kechikishini o'lchash oralig'i (soniya, 0 - o'chirilgan)
+LOOP_BLOCK_THRESHOLD = env.float("LOOP_BLOCK_THRESHOLD", 0.1)  # Loop shundan uzoq bloklansa stek logga yoziladi (soniya, 0 - o'chirilgan)
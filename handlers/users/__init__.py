@@ -1,4 +1,5 @@
 from . import help
 from . import admin
 from . import start
+from . import inline
 from . import echo
\ No newline at end of file
@@ -6,13 +6,22 @@ from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ParseMode
 from loader import dp, bot
+from utils.db_api.pool import db_pool
+from utils.db_api.catalog import catalog
+from utils.db_api.backup import backup_job
+from utils.db_api.users import count_active_users
+from utils.db_api.broadcasts import create_broadcast, get_broadcast, set_broadcast_status_message
+from utils.db_api.export import EXPORTS, EXPORT_FORMATS, export_running, run_export
+from utils.misc.broadcast import broadcaster
+from utils.misc.metrics import metrics
 from utils.db_api.jurnallar import (
-    get_statistics, get_fanlar, get_bolimlar,
+    get_statistics,
     add_jurnal, update_jurnal, delete_jurnal, get_jurnal_by_id,
     get_jurnallar
 )
 import logging
 import asyncio
+import time
 
 # Admin ID larini env fayldan olish
 ADMINS = list(map(int, os.getenv("ADMINS", "").split(","))) if os.getenv("ADMINS") else []
@@ -34,6 +43,11 @@ class EditJurnalStates(StatesGroup):
     waiting_for_new_value = State()
 
 
+class BroadcastStates(StatesGroup):
+    waiting_for_message = State()
+    waiting_for_confirm = State()
+
+
 def is_admin(user_id: int) -> bool:
     """Foydalanuvchi admin ekanligini tekshirish"""
     return user_id in ADMINS
@@ -64,18 +78,20 @@ async def admin_panel(message: types.Message, state: FSMContext):
         await message.answer("❌ Sizda admin huquqlari yo'q!")
         return
 
-    stats = get_statistics()
+    stats = await db_pool.run(get_statistics)
 
     keyboard = InlineKeyboardMarkup(row_width=2)
     keyboard.add(
-        InlineKeyboardButton("📊 Statistika", callback_data="admin_stats")
+        InlineKeyboardButton("📊 Statistika", callback_data="admin_stats"),
+        InlineKeyboardButton("📢 Xabar yuborish", callback_data="admin_broadcast")
     )
     keyboard.add(
         InlineKeyboardButton("➕ Jurnal qo'shish", callback_data="admin_add_jurnal"),
         InlineKeyboardButton("✏️ Jurnal tahrirlash", callback_data="admin_edit_jurnal")
     )
     keyboard.add(
-        InlineKeyboardButton("🗑️ Jurnal o'chirish", callback_data="admin_delete_jurnal")
+        InlineKeyboardButton("🗑️ Jurnal o'chirish", callback_data="admin_delete_jurnal"),
+        InlineKeyboardButton("💾 Backup", callback_data="admin_backup")
     )
 
     # Xavfsiz tarzda users_count ni olish
@@ -106,7 +122,7 @@ async def show_statistics(callback_query: types.CallbackQuery, state: FSMContext
         return
 
     try:
-        stats = get_statistics()
+        stats = await db_pool.run(get_statistics)
 
         text = f"""
 📊 **BATAFSIL STATISTIKA**
@@ -135,6 +151,300 @@ async def show_statistics(callback_query: types.CallbackQuery, state: FSMContext
         await bot.answer_callback_query(callback_query.id, "❌ Xatolik yuz berdi!", show_alert=True)
 
 
+# Backup
+@dp.callback_query_handler(lambda c: c.data == "admin_backup", state="*")
+async def make_backup(callback_query: types.CallbackQuery, state: FSMContext):
+    await state.finish()
+
+    if not is_admin(callback_query.from_user.id):
+        await bot.answer_callback_query(callback_query.id, "❌ Ruxsat yo'q!", show_alert=True)
+        return
+
+    if backup_job.running:
+        await bot.answer_callback_query(callback_query.id, "⏳ Backup allaqachon olinmoqda...", show_alert=True)
+        return
+
+    await bot.answer_callback_query(callback_query.id, "⏳ Backup olinmoqda...")
+
+    result = await backup_job.run()
+    if not result:
+        await bot.send_message(callback_query.message.chat.id, "❌ Backup yaratishda xatolik yuz berdi!")
+        return
+
+    text = f"""✅ **Backup yaratildi**
+
+📁 `{os.path.basename(result['path'])}`
+📦 Hajmi: {result['size'] / 1024:.1f} KB
+⏱️ Vaqt: {result['elapsed']} s"""
+
+    try:
+        # Telegram 50 MB gacha fayllarni qabul qiladi
+        if result['size'] <= 50 * 1024 * 1024:
+            await bot.send_document(
+                callback_query.message.chat.id,
+                types.InputFile(result['path']),
+                caption=text,
+                parse_mode=ParseMode.MARKDOWN
+            )
+        else:
+            await bot.send_message(callback_query.message.chat.id, text, parse_mode=ParseMode.MARKDOWN)
+    except Exception as e:
+        logging.error(f"Backupni yuborishda xatolik: {e}")
+        await bot.send_message(callback_query.message.chat.id, text, parse_mode=ParseMode.MARKDOWN)
+
+
+# ================ EKSPORT ================
+
+async def send_export(chat_id: int, name: str, fmt: str):
+    """Jadvalni eksport qilib, fayl sifatida yuborish"""
+    if export_running():
+        await bot.send_message(chat_id, "⏳ Eksport allaqachon bajarilmoqda, biroz kuting...")
+        return
+
+    status_message = await bot.send_message(chat_id, f"⏳ {name}.{fmt} eksport qilinmoqda...")
+
+    result = await run_export(name, fmt)
+    if not result:
+        await status_message.edit_text("❌ Eksportda xatolik yuz berdi!")
+        return
+
+    text = f"""✅ **Eksport tayyor**
+
+📁 `{result['filename']}`
+📄 Qatorlar: {result['rows']}
+📦 Hajmi: {result['size'] / 1024:.1f} KB
+⏱️ Vaqt: {result['elapsed']} s"""
+
+    try:
+        # Telegram 50 MB gacha fayllarni qabul qiladi
+        if result['size'] <= 50 * 1024 * 1024:
+            await bot.send_document(
+                chat_id,
+                types.InputFile(result['path'], filename=result['filename']),
+                caption=text,
+                parse_mode=ParseMode.MARKDOWN
+            )
+            await status_message.delete()
+        else:
+            await status_message.edit_text(text + "\n\n❗️ Fayl 50 MB dan katta, Telegram orqali yuborib bo'lmaydi",
+                                           parse_mode=ParseMode.MARKDOWN)
+    except Exception as e:
+        logging.error(f"Eksportni yuborishda xatolik: {e}")
+        await bot.send_message(chat_id, "❌ Eksport faylini yuborishda xatolik yuz berdi!")
+    finally:
+        os.remove(result['path'])
+
+
+@dp.message_handler(commands=['export'], state="*")
+async def export_command(message: types.Message, state: FSMContext):
+    await state.finish()
+
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ Sizda admin huquqlari yo'q!")
+        return
+
+    # /export jurnallar csv
+    args = message.get_args().split()
+    if len(args) == 2 and args[0] in EXPORTS and args[1] in EXPORT_FORMATS:
+        await send_export(message.chat.id, args[0], args[1])
+        return
+
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    for name in EXPORTS:
+        keyboard.add(*[
+            InlineKeyboardButton(f"📤 {name}.{fmt}", callback_data=f"export_{name}_{fmt}")
+            for fmt in EXPORT_FORMATS
+        ])
+
+    await message.answer(
+        "📤 **Eksport**\n\nQaysi ma'lumotlarni yuklab olmoqchisiz?\n"
+        "Buyruq orqali: `/export jurnallar csv`",
+        reply_markup=keyboard,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+
+@dp.callback_query_handler(lambda c: c.data.startswith("export_"), state="*")
+async def export_callback(callback_query: types.CallbackQuery, state: FSMContext):
+    if not is_admin(callback_query.from_user.id):
+        await bot.answer_callback_query(callback_query.id, "❌ Ruxsat yo'q!", show_alert=True)
+        return
+
+    _, name, fmt = callback_query.data.split('_', 2)
+    if name not in EXPORTS or fmt not in EXPORT_FORMATS:
+        await bot.answer_callback_query(callback_query.id, "❌ Noto'g'ri eksport!", show_alert=True)
+        return
+
+    await bot.answer_callback_query(callback_query.id)
+    await send_export(callback_query.message.chat.id, name, fmt)
+
+
+# ================ PERFORMANCE ================
+
+PERF_TOP = 10
+
+
+def format_histograms(title: str, histograms: dict, label: str) -> str:
+    """Gistogrammalarni umumiy vaqt bo'yicha saralab, matnga aylantirish"""
+    if not histograms:
+        return ""
+
+    lines = [f"**{title}** (soni: p50/p95/max ms)"]
+    for labels, h in sorted(histograms.items(), key=lambda item: item[1].sum, reverse=True)[:PERF_TOP]:
+        name = dict(labels).get(label, 'hammasi')
+        lines.append(f"`{name}` {h.count}: {h.quantile(0.5):.1f}/{h.quantile(0.95):.1f}/{h.max:.1f}")
+    return "\n".join(lines) + "\n\n"
+
+
+def format_perf_report() -> str:
+    """Handlerlar, DB va Bot API vaqtlari bo'yicha hisobot"""
+    uptime = int(time.time() - metrics.started_at)
+    text = f"⏱️ **PERFORMANCE** (so'nggi {uptime // 60} daqiqa)\n\n"
+
+    handlers = metrics.get_histograms('handler_ms')
+    if handlers:
+        db_queries = metrics.get_counters('handler_db_queries_total')
+        db_ms = metrics.get_counters('handler_db_ms_total')
+        api_calls = metrics.get_counters('handler_api_calls_total')
+        api_ms = metrics.get_counters('handler_api_ms_total')
+
+        text += "**Handlerlar** (soni: p50/p95/max ms | update boshiga DB so'rov, ms | API chaqiruv, ms)\n"
+        for labels, h in sorted(handlers.items(), key=lambda item: item[1].sum, reverse=True)[:PERF_TOP]:
+            name = dict(labels)['handler']
+            text += (f"`{name}` {h.count}: {h.quantile(0.5):.1f}/{h.quantile(0.95):.1f}/{h.max:.1f} | "
+                     f"DB {db_queries.get(labels, 0) / h.count:.1f}, {db_ms.get(labels, 0) / h.count:.1f} | "
+                     f"API {api_calls.get(labels, 0) / h.count:.1f}, {api_ms.get(labels, 0) / h.count:.0f}\n")
+        text += "\n"
+
+    text += format_histograms("DB funksiyalar", metrics.get_histograms('db_func_ms'), 'func')
+    text += format_histograms("SQL so'rovlar", metrics.get_histograms('db_query_ms'), 'sql')
+    text += format_histograms("Bot API", metrics.get_histograms('bot_api_ms'), 'method')
+    text += format_histograms("Event loop kechikishi", metrics.get_histograms('loop_lag_ms'), 'loop')
+    text += format_histograms("Loopni bloklaganlar", metrics.get_histograms('loop_blocked_ms'), 'handler')
+
+    if not handlers:
+        text += "Hali ma'lumot yo'q."
+    return text
+
+
+@dp.message_handler(commands=['perf'], state="*")
+async def perf_command(message: types.Message, state: FSMContext):
+    if not is_admin(message.from_user.id):
+        await message.answer("❌ Sizda admin huquqlari yo'q!")
+        return
+
+    if message.get_args().strip() == 'reset':
+        metrics.reset()
+        await message.answer("🔄 Performance statistikasi tozalandi")
+        return
+
+    await message.answer(format_perf_report(), parse_mode=ParseMode.MARKDOWN)
+
+
+# ================ XABAR TARQATISH ================
+
+@dp.callback_query_handler(lambda c: c.data == "admin_broadcast", state="*")
+async def start_broadcast(callback_query: types.CallbackQuery, state: FSMContext):
+    await state.finish()
+
+    if not is_admin(callback_query.from_user.id):
+        await bot.answer_callback_query(callback_query.id, "❌ Ruxsat yo'q!", show_alert=True)
+        return
+
+    if broadcaster.active:
+        await bot.answer_callback_query(callback_query.id, "⏳ Xabar yuborish davom etmoqda...", show_alert=True)
+        return
+
+    await BroadcastStates.waiting_for_message.set()
+
+    keyboard = InlineKeyboardMarkup()
+    keyboard.add(InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_admin"))
+
+    await bot.edit_message_text(
+        text="📢 **Xabar yuborish**\n\nBarcha foydalanuvchilarga yuboriladigan xabarni yuboring "
+             "(matn, rasm, video, fayl...):",
+        chat_id=callback_query.message.chat.id,
+        message_id=callback_query.message.message_id,
+        reply_markup=keyboard,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+
+@dp.message_handler(content_types=types.ContentTypes.ANY, state=BroadcastStates.waiting_for_message)
+async def get_broadcast_message(message: types.Message, state: FSMContext):
+    if not is_admin(message.from_user.id):
+        return
+
+    await state.update_data(from_chat_id=message.chat.id, message_id=message.message_id)
+    await BroadcastStates.waiting_for_confirm.set()
+
+    users_count = await db_pool.run(count_active_users)
+
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    keyboard.add(
+        InlineKeyboardButton("✅ Yuborish", callback_data="broadcast_confirm"),
+        InlineKeyboardButton("❌ Bekor qilish", callback_data="back_to_admin")
+    )
+
+    await message.reply(
+        f"📢 Ushbu xabar **{users_count}** ta foydalanuvchiga yuboriladi. Tasdiqlaysizmi?",
+        reply_markup=keyboard,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+
+@dp.callback_query_handler(lambda c: c.data == "broadcast_confirm", state=BroadcastStates.waiting_for_confirm)
+async def confirm_broadcast(callback_query: types.CallbackQuery, state: FSMContext):
+    data = await state.get_data()
+    await state.finish()
+
+    if not is_admin(callback_query.from_user.id):
+        await bot.answer_callback_query(callback_query.id, "❌ Ruxsat yo'q!", show_alert=True)
+        return
+
+    if broadcaster.active:
+        await bot.answer_callback_query(callback_query.id, "⏳ Xabar yuborish davom etmoqda...", show_alert=True)
+        return
+
+    try:
+        users_count = await db_pool.run(count_active_users)
+        broadcast_id = await db_pool.run(
+            create_broadcast, callback_query.message.chat.id, data['from_chat_id'], data['message_id'], users_count
+        )
+        await db_pool.run(set_broadcast_status_message, broadcast_id, callback_query.message.message_id)
+        broadcast = await db_pool.run(get_broadcast, broadcast_id)
+
+        keyboard = InlineKeyboardMarkup()
+        keyboard.add(InlineKeyboardButton("⏹ To'xtatish", callback_data=f"broadcast_cancel_{broadcast_id}"))
+
+        await bot.edit_message_text(
+            text=f"📢 **Xabar yuborilmoqda...**\n\n📊 Jarayon: 0/{users_count}",
+            chat_id=callback_query.message.chat.id,
+            message_id=callback_query.message.message_id,
+            reply_markup=keyboard,
+            parse_mode=ParseMode.MARKDOWN
+        )
+
+        broadcaster.start(bot, [broadcast])
+        await bot.answer_callback_query(callback_query.id, "✅ Xabar yuborish boshlandi")
+    except Exception as e:
+        logging.error(f"Xabar yuborishni boshlashda xatolik: {e}")
+        await bot.answer_callback_query(callback_query.id, "❌ Xatolik yuz berdi!", show_alert=True)
+
+
+@dp.callback_query_handler(lambda c: c.data.startswith("broadcast_cancel_"), state="*")
+async def cancel_broadcast(callback_query: types.CallbackQuery, state: FSMContext):
+    if not is_admin(callback_query.from_user.id):
+        await bot.answer_callback_query(callback_query.id, "❌ Ruxsat yo'q!", show_alert=True)
+        return
+
+    broadcast_id = int(callback_query.data.split('_')[2])
+    if broadcaster.cancel(broadcast_id):
+        await bot.answer_callback_query(callback_query.id, "⏹ To'xtatilmoqda...")
+    else:
+        await bot.answer_callback_query(callback_query.id, "Xabar yuborish allaqachon tugagan", show_alert=True)
+
+
 # ================ JURNAL QO'SHISH ================
 
 @dp.callback_query_handler(lambda c: c.data == "admin_add_jurnal", state="*")
@@ -146,7 +456,7 @@ async def start_add_jurnal(callback_query: types.CallbackQuery, state: FSMContex
         return
 
     try:
-        fanlar = get_fanlar()
+        fanlar = catalog.get_fanlar()
 
         keyboard = InlineKeyboardMarkup(row_width=1)
         for fan in fanlar:
@@ -204,7 +514,7 @@ async def add_select_bolim(callback_query: types.CallbackQuery, state: FSMContex
         fan_id = int(callback_query.data.split('_')[3])
         await state.update_data(fan_id=fan_id)
 
-        bolimlar = get_bolimlar()
+        bolimlar = catalog.get_bolimlar()
 
         keyboard = InlineKeyboardMarkup(row_width=1)
         for bolim in bolimlar:
@@ -508,7 +818,8 @@ async def finish_add_jurnal(message_or_callback, state: FSMContext):
 
         data = await state.get_data()
 
-        jurnal_id = add_jurnal(
+        jurnal_id = await db_pool.run(
+            add_jurnal,
             fan_id=data['fan_id'],
             bolim_id=data['bolim_id'],
             nomi=data['nomi'],
@@ -518,6 +829,7 @@ async def finish_add_jurnal(message_or_callback, state: FSMContext):
             murojaat_link=data.get('murojaat_link'),
             talablar_link=data.get('talablar_link')
         )
+        await db_pool.run(catalog.refresh)
 
         # Ma'lumotlarni chiroyli ko'rsatish
         display_info = "✅ <b>Jurnal muvaffaqiyatli qo'shildi!</b>\n\n"
@@ -558,7 +870,7 @@ async def edit_select_fan(callback_query: types.CallbackQuery, state: FSMContext
         return
 
     try:
-        fanlar = get_fanlar()
+        fanlar = catalog.get_fanlar()
 
         keyboard = InlineKeyboardMarkup(row_width=1)
         for fan in fanlar:
@@ -613,7 +925,7 @@ async def edit_select_bolim(callback_query: types.CallbackQuery, state: FSMConte
     try:
         fan_id = int(callback_query.data.split('_')[3])
 
-        bolimlar = get_bolimlar()
+        bolimlar = catalog.get_bolimlar()
 
         keyboard = InlineKeyboardMarkup(row_width=1)
         for bolim in bolimlar:
@@ -655,7 +967,7 @@ async def edit_select_jurnal(callback_query: types.CallbackQuery, state: FSMCont
         fan_id = int(data_parts[3])
         bolim_id = int(data_parts[4])
 
-        jurnallar, _ = get_jurnallar(fan_id, bolim_id, 1, 50)
+        jurnallar, _ = await db_pool.run(get_jurnallar, fan_id, bolim_id, 1, 50)
 
         if not jurnallar:
             await bot.answer_callback_query(callback_query.id, "Bu bo'limda jurnallar mavjud emas!", show_alert=True)
@@ -687,7 +999,7 @@ async def edit_jurnal_fields(callback_query: types.CallbackQuery, state: FSMCont
 
     try:
         jurnal_id = int(callback_query.data.split('_')[2])
-        jurnal = get_jurnal_by_id(jurnal_id)
+        jurnal = await db_pool.run(get_jurnal_by_id, jurnal_id)
 
         if not jurnal:
             await bot.answer_callback_query(callback_query.id, "Jurnal topilmadi!", show_alert=True)
@@ -749,9 +1061,10 @@ async def update_jurnal_field(message: types.Message, state: FSMContext):
             await message.answer("❌ Noto'g'ri fayl turi!")
             return
 
-        success = update_jurnal(jurnal_id, **{field: new_value})
+        success = await db_pool.run(update_jurnal, jurnal_id, **{field: new_value})
 
         if success:
+            await db_pool.run(catalog.refresh)
             await message.answer("✅ Jurnal muvaffaqiyatli yangilandi!")
             logging.info(f"Jurnal yangilandi: ID {jurnal_id}, maydon: {field}")
         else:
@@ -775,7 +1088,7 @@ async def delete_select_fan(callback_query: types.CallbackQuery, state: FSMConte
         return
 
     try:
-        fanlar = get_fanlar()
+        fanlar = catalog.get_fanlar()
 
         keyboard = InlineKeyboardMarkup(row_width=1)
         for fan in fanlar:
@@ -830,7 +1143,7 @@ async def delete_select_bolim(callback_query: types.CallbackQuery, state: FSMCon
     try:
         fan_id = int(callback_query.data.split('_')[3])
 
-        bolimlar = get_bolimlar()
+        bolimlar = catalog.get_bolimlar()
 
         keyboard = InlineKeyboardMarkup(row_width=1)
         for bolim in bolimlar:
@@ -872,7 +1185,7 @@ async def delete_select_jurnal(callback_query: types.CallbackQuery, state: FSMCo
         fan_id = int(data_parts[3])
         bolim_id = int(data_parts[4])
 
-        jurnallar, _ = get_jurnallar(fan_id, bolim_id, 1, 50)
+        jurnallar, _ = await db_pool.run(get_jurnallar, fan_id, bolim_id, 1, 50)
 
         if not jurnallar:
             await bot.answer_callback_query(callback_query.id, "Bu bo'limda jurnallar mavjud emas!", show_alert=True)
@@ -902,7 +1215,7 @@ async def delete_select_jurnal(callback_query: types.CallbackQuery, state: FSMCo
 async def confirm_delete_jurnal(callback_query: types.CallbackQuery, state: FSMContext):
     try:
         jurnal_id = int(callback_query.data.split('_')[2])
-        jurnal = get_jurnal_by_id(jurnal_id)
+        jurnal = await db_pool.run(get_jurnal_by_id, jurnal_id)
 
         if not jurnal:
             await bot.answer_callback_query(callback_query.id, "Jurnal topilmadi!", show_alert=True)
@@ -942,15 +1255,16 @@ Bu amalni qaytarib bo'lmaydi!
 async def execute_delete_jurnal(callback_query: types.CallbackQuery, state: FSMContext):
     try:
         jurnal_id = int(callback_query.data.split('_')[2])
-        jurnal = get_jurnal_by_id(jurnal_id)
+        jurnal = await db_pool.run(get_jurnal_by_id, jurnal_id)
 
         if not jurnal:
             await bot.answer_callback_query(callback_query.id, "Jurnal topilmadi!", show_alert=True)
             return
 
-        success = delete_jurnal(jurnal_id)
+        success = await db_pool.run(delete_jurnal, jurnal_id)
 
         if success:
+            await db_pool.run(catalog.refresh)
             await bot.edit_message_text(
                 text=f"✅ Jurnal muvaffaqiyatli o'chirildi!\n\n📖 {jurnal['nomi']}",
                 chat_id=callback_query.message.chat.id,
@@ -1010,18 +1324,20 @@ async def back_to_admin_panel(callback_query: types.CallbackQuery, state: FSMCon
     await state.finish()
 
     try:
-        stats = get_statistics()
+        stats = await db_pool.run(get_statistics)
 
         keyboard = InlineKeyboardMarkup(row_width=2)
         keyboard.add(
-            InlineKeyboardButton("📊 Statistika", callback_data="admin_stats")
+            InlineKeyboardButton("📊 Statistika", callback_data="admin_stats"),
+            InlineKeyboardButton("📢 Xabar yuborish", callback_data="admin_broadcast")
         )
         keyboard.add(
             InlineKeyboardButton("➕ Jurnal qo'shish", callback_data="admin_add_jurnal"),
             InlineKeyboardButton("✏️ Jurnal tahrirlash", callback_data="admin_edit_jurnal")
         )
         keyboard.add(
-            InlineKeyboardButton("🗑️ Jurnal o'chirish", callback_data="admin_delete_jurnal")
+            InlineKeyboardButton("🗑️ Jurnal o'chirish", callback_data="admin_delete_jurnal"),
+            InlineKeyboardButton("💾 Backup", callback_data="admin_backup")
         )
 
         text = f"""
@@ -9,6 +9,7 @@ async def bot_help(message: types.Message):
     text = ("Qanday yordam kerak?",
             "Buyruqlar: ",
             "/start - Botni ishga tushirish",
+            "/search - Jurnal qidirish",
             "/help - Yordam")
     
     await message.answer("\n".join(text))
@@ -0,0 +1,119 @@
+from aiogram import types
+from aiogram.types import (InlineQueryResultArticle, InlineQueryResultCachedPhoto,
+                           InputTextMessageContent, ParseMode)
+from loader import dp
+from data import config
+from utils.db_api.pool import db_pool
+from utils.db_api.activity import activity_buffer
+from utils.db_api.catalog import catalog
+from utils.db_api.jurnallar import search_jurnallar, get_latest_jurnallar, normalize_search_text
+from utils.misc.cache import LRUCache
+from utils.misc.metrics import metrics
+from handlers.users.start import check_subscription, format_jurnal_text, create_jurnal_keyboard
+import logging
+
+INLINE_RESULTS_LIMIT = 20  # Telegram bir javobda 50 tagacha natija qabul qiladi
+
+# (so'rov, offset, katalog versiyasi) -> (natijalar, next_offset)
+inline_cache = LRUCache(maxsize=1024, ttl=config.INLINE_RESULTS_CACHE_TTL)
+metrics.register_cache('inline', inline_cache)
+
+
+def build_inline_result(jurnal: dict) -> types.InlineQueryResult:
+    """Jurnal uchun inline natija (rasmi bo'lsa saqlangan file_id bilan rasm)"""
+    text = format_jurnal_text(jurnal)
+    keyboard = create_jurnal_keyboard(jurnal, with_back=False)
+    reply_markup = keyboard if keyboard.inline_keyboard else None
+    description = f"{jurnal['fan_nomi']} • {jurnal['bolim_nomi']}"
+
+    if jurnal['rasmi']:
+        return InlineQueryResultCachedPhoto(
+            id=str(jurnal['id']),
+            photo_file_id=jurnal['rasmi'],
+            title=jurnal['nomi'],
+            description=description,
+            caption=text,
+            parse_mode=ParseMode.HTML,
+            reply_markup=reply_markup
+        )
+
+    return InlineQueryResultArticle(
+        id=str(jurnal['id']),
+        title=jurnal['nomi'],
+        description=description,
+        input_message_content=InputTextMessageContent(text, parse_mode=ParseMode.HTML),
+        reply_markup=reply_markup
+    )
+
+
+def get_inline_results(query: str, offset: int):
+    """Inline so'rov natijalarini bazadan olish (sinxron, db_pool.run orqali chaqiring)"""
+    if query:
+        jurnallar = search_jurnallar(query, limit=INLINE_RESULTS_LIMIT + 1, offset=offset)
+        has_next = len(jurnallar) > INLINE_RESULTS_LIMIT
+        jurnallar = jurnallar[:INLINE_RESULTS_LIMIT]
+    else:
+        # Bo'sh so'rovda oxirgi qo'shilgan jurnallar ko'rsatiladi
+        jurnallar = get_latest_jurnallar(INLINE_RESULTS_LIMIT)
+        has_next = False
+
+    results = [build_inline_result(jurnal) for jurnal in jurnallar]
+    next_offset = str(offset + INLINE_RESULTS_LIMIT) if has_next else ''
+    return results, next_offset
+
+
+@dp.inline_handler()
+async def inline_search(inline_query: types.InlineQuery):
+    """@bot orqali inline qidiruv"""
+    user_id = inline_query.from_user.id
+
+    # Obuna holatini tekshirish
+    is_subscribed, channel = await check_subscription(user_id)
+    if not is_subscribed:
+        await inline_query.answer(
+            results=[],
+            cache_time=0,
+            is_personal=True,
+            switch_pm_text="📢 Avval kanallarga obuna bo'ling",
+            switch_pm_parameter="subscribe"
+        )
+        return
+
+    activity_buffer.touch(user_id)
+
+    query = normalize_search_text(inline_query.query)
+    try:
+        offset = int(inline_query.offset or 0)
+    except ValueError:
+        offset = 0
+
+    # Kesh event loop'da tekshiriladi, ishchi oqimga faqat bazadan qidiruv yuboriladi
+    key = (query, offset, catalog.version)
+    cached = inline_cache.get(key)
+    if cached is not None:
+        results, next_offset = cached
+    else:
+        try:
+            results, next_offset = await db_pool.run(get_inline_results, query, offset)
+            inline_cache.set(key, (results, next_offset))
+        except Exception as e:
+            logging.error(f"Inline qidiruvda xatolik: {str(e)}")
+            results, next_offset = [], ''
+
+    if not results and offset == 0:
+        await inline_query.answer(
+            results=[],
+            cache_time=config.INLINE_CACHE_TIME,
+            is_personal=True,
+            switch_pm_text="😔 Jurnal topilmadi",
+            switch_pm_parameter="start"
+        )
+        return
+
+    # is_personal - natijalar obunasi tekshirilgan foydalanuvchi uchungina keshlanadi
+    await inline_query.answer(
+        results=results,
+        cache_time=config.INLINE_CACHE_TIME,
+        is_personal=True,
+        next_offset=next_offset
+    )
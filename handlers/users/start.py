@@ -1,12 +1,24 @@
+import asyncio
+import json
+import re
+import secrets
 from aiogram import types
+from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.builtin import CommandStart
+from aiogram.dispatcher.filters.state import State, StatesGroup
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ParseMode
+from aiogram.utils.exceptions import MessageNotModified
+from aiogram.utils.markdown import quote_html
 from loader import dp, bot
-from utils.db_api.users import get_user, add_user, update_user_activity
-from utils.db_api.jurnallar import (
-    get_fanlar, get_bolimlar, get_fan_by_id, get_bolim_by_id,
-    get_jurnallar_count_by_fan_bolim, get_jurnallar, get_jurnal_by_id
-)
+from data import config
+from utils.db_api.pool import db_pool
+from utils.db_api.activity import activity_buffer
+from utils.db_api.catalog import catalog
+from utils.db_api.jurnallar import get_jurnallar_page, get_jurnal_by_id, search_jurnallar, normalize_search_text
+from utils.misc.cache import LRUCache
+from utils.misc.metrics import metrics
+from utils.misc.throttling import rate_limit
+from keyboards.inline.menu_keyboards import fanlar_keyboard, bolimlar_keyboard, get_bolim_display
 import logging
 
 # Majburiy obuna sozlamalari
@@ -15,61 +27,64 @@ REQUIRED_CHANNELS = [
     {"name": "Guruh", "username": "@oakjurnallariuz", "url": "https://t.me/oakjurnallariuz"}
 ]
 
-# Emoji xaritalari
-FAN_EMOJI_MAP = {
-    "Fizika-matematika fanlari": ("🔬", "Fizika-matem..."),
-    "Kimyo fanlari": ("⚗️", "Kimyo fanlari"),
-    "Biologiya fanlari": ("🧬", "Biologiya fanlari"),
-    "Geologiya-mineralogiya fanlari": ("⛰️", "Geologiya-min..."),
-    "Texnika fanlari": ("⚙️", "Texnika fanlari"),
-    "Qishloq xo'jaligi fanlari": ("🌾", "Qishloq x..."),
-    "Tarix fanlari": ("📜", "Tarix fanlari"),
-    "Iqtisodiyot fanlari": ("💰", "Iqtisodiyot"),
-    "Falsafa fanlari": ("🤔", "Falsafa fanlari"),
-    "Filologiya fanlari": ("📚", "Filologiya"),
-    "Geografiya fanlari": ("🌍", "Geografiya"),
-    "Yuridik fanlar": ("⚖️", "Yuridik fanlar"),
-    "Pedagogika fanlari": ("👨‍🏫", "Pedagogika"),
-    "Tibbiyot fanlari": ("🏥", "Tibbiyot fanlari"),
-    "Farmatsevtika fanlari": ("💊", "Farmatsevtika"),
-    "Veterinariya fanlari": ("🐕‍🦺", "Veterinariya"),
-    "San'atshunoslik fanlari": ("🎨", "San'atshunoslik"),
-    "Arxitektura": ("🏗️", "Arxitektura"),
-    "Psixologiya fanlari": ("🧠", "Psixologiya"),
-    "Harbiy fanlar": ("🎖️", "Harbiy fanlar"),
-    "Sotsiologiya fanlari": ("👥", "Sotsiologiya"),
-    "Siyosiy fanlar": ("🗳️", "Siyosiy fanlar"),
-    "Islomshunoslik fanlari": ("☪️", "Islomshunoslik")
-}
-
-BOLIM_EMOJI_MAP = {
-    "Milliy nashrlar": ("🇺🇿", "Milliy nashrlar"),
-    "Mustaqil davlatlar hamdo'stligi mamlakatlari nashrlari": ("🤝", "MDH nashrlari"),
-    "Evropa mamlakatlari nashrlari": ("🇪🇺", "Evropa nashrlari"),
-    "Amerika mamlakatlari nashrlari": ("🌎", "Amerika nashrlari")
-}
-
-
-async def check_subscription(user_id):
-    """Foydalanuvchining obuna holatini tekshirish"""
-    unsubscribed_channels = []
-
-    for channel in REQUIRED_CHANNELS:
-        try:
-            member = await bot.get_chat_member(chat_id=channel['username'], user_id=user_id)
-            if member.status in ['left', 'kicked']:
-                unsubscribed_channels.append(channel)
-        except Exception as e:
-            logging.error(f"Obuna holatini tekshirishda xatolik {channel['name']}: {e}")
-            unsubscribed_channels.append(channel)
+# (user_id, kanal) -> obuna holati
+subscription_cache = LRUCache(maxsize=10000)
+
+# Jurnallar ro'yxati sahifalari: (fan, bo'lim, sahifa, kursor, hajm, katalog versiyasi) -> (matn, klaviatura)
+JURNALLAR_PER_PAGE = 8
+jurnallar_page_cache = LRUCache(maxsize=config.PAGE_CACHE_SIZE)
+
+metrics.register_cache('subscription', subscription_cache)
+metrics.register_cache('jurnallar_page', jurnallar_page_cache)
+
+# Qidiruv natijalari sahifasidagi jurnallar soni
+SEARCH_PER_PAGE = 8
+
+# Qidiruv ID si (search_{id}_{sahifa} callback'ida) -> so'rov (varaqlash uchun; FSM storage'ga yozilmaydi)
+search_query_cache = LRUCache(maxsize=10000, ttl=config.SEARCH_QUERY_TTL)
+metrics.register_cache('search_query', search_query_cache)
+
+
+class SearchStates(StatesGroup):
+    waiting_for_query = State()
+
+
+async def get_member_status(channel, user_id, use_cache=True):
+    """Bitta kanal bo'yicha obuna holati (natija qisqa muddatga keshlanadi)"""
+    key = (user_id, channel['username'])
+    if use_cache:
+        cached = subscription_cache.get(key)
+        if cached is not None:
+            return cached
+
+    try:
+        member = await bot.get_chat_member(chat_id=channel['username'], user_id=user_id)
+    except Exception as e:
+        logging.error(f"Obuna holatini tekshirishda xatolik {channel['name']}: {e}")
+        return False
+
+    is_member = member.status not in ['left', 'kicked']
+    # Obuna bo'lmaganlar tezroq qayta tekshiriladi
+    ttl = config.SUBSCRIPTION_CACHE_TTL if is_member else config.SUBSCRIPTION_NEGATIVE_TTL
+    subscription_cache.set(key, is_member, ttl=ttl)
+    return is_member
+
+
+async def check_subscription(user_id, use_cache=True):
+    """Foydalanuvchining obuna holatini tekshirish (barcha kanallar bir vaqtda)"""
+    statuses = await asyncio.gather(*(
+        get_member_status(channel, user_id, use_cache) for channel in REQUIRED_CHANNELS
+    ))
+
+    unsubscribed_channels = [
+        channel for channel, is_member in zip(REQUIRED_CHANNELS, statuses) if not is_member
+    ]
 
     if unsubscribed_channels:
         return False, unsubscribed_channels  # Barcha obuna bo‘lmagan kanallar
     return True, []
 
 
-
-
 def create_subscription_keyboard(channels=None):
     """Obuna tugmalarini yaratish"""
     keyboard = InlineKeyboardMarkup(row_width=1)
@@ -101,26 +116,24 @@ async def send_subscription_message(message_or_query, is_callback=False, channel
 
 
 
-def get_fan_display(fan_nomi, max_length=18):
-    """Fan nomini emoji bilan formatlash"""
-    if fan_nomi in FAN_EMOJI_MAP:
-        emoji, qisqa_nom = FAN_EMOJI_MAP[fan_nomi]
-        return f"{emoji} {qisqa_nom}"
-    else:
-        if len(fan_nomi) > max_length:
-            fan_nomi = fan_nomi[:max_length - 3] + "..."
-        return f"📖 {fan_nomi}"
+def parse_page_cursor(data_parts, index, version):
+    """Callback ma'lumotidagi keyset kursorini ajratish ('a12v5' -> (12, None), 'b7v5' -> (None, 7))
 
+    Kursor katalogning boshqa versiyasida yaratilgan bo'lsa (jurnallar qo'shilgan yoki
+    o'chirilgan - sahifa raqami va kursor bir-biriga mos emas) yoki versiyasiz bo'lsa
+    (eski xabarlar), (None, None) qaytariladi va sahifa OFFSET bo'yicha olinadi.
+    """
+    if len(data_parts) <= index:
+        return None, None
 
-def get_bolim_display(bolim_nomi, max_length=20):
-    """Bo'lim nomini emoji bilan formatlash"""
-    if bolim_nomi in BOLIM_EMOJI_MAP:
-        emoji, qisqa_nom = BOLIM_EMOJI_MAP[bolim_nomi]
-        return f"{emoji} {qisqa_nom}"
-    else:
-        if len(bolim_nomi) > max_length:
-            bolim_nomi = bolim_nomi[:max_length - 3] + "..."
-        return f"📄 {bolim_nomi}"
+    match = re.fullmatch(r'([ab])(\d+)v(\d+)', data_parts[index])
+    if not match or int(match.group(3)) != version:
+        return None, None
+
+    cursor_id = int(match.group(2))
+    if match.group(1) == 'a':
+        return cursor_id, None
+    return None, cursor_id
 
 
 async def safe_delete_message(chat_id, message_id):
@@ -131,11 +144,35 @@ async def safe_delete_message(chat_id, message_id):
         logging.error(f"Xabarni o'chirishda xatolik: {e}")
 
 
-async def safe_edit_message(message, text, keyboard=None, parse_mode=None):
-    """Xabarni xavfsiz tahrirlash"""
+async def send_screen(chat_id, text, keyboard=None, parse_mode=None, photo=None):
+    """Yangi xabar yuborish (rasm bo'lsa rasm bilan)"""
+    if photo:
+        try:
+            return await bot.send_photo(
+                chat_id=chat_id,
+                photo=photo,
+                caption=text,
+                reply_markup=keyboard,
+                parse_mode=parse_mode
+            )
+        except Exception as e:
+            logging.error(f"Rasm yuklashda xatolik: {e}")
+            text += "\n\n❗️ <i>Rasm yuklanmadi</i>"
+
+    return await bot.send_message(chat_id=chat_id, text=text, reply_markup=keyboard, parse_mode=parse_mode)
+
+
+async def safe_edit_message(message, text, keyboard=None, parse_mode=None, photo=None, keep_photo=True):
+    """Xabarni joyida tahrirlash
+
+    Matn -> matn va rasm -> rasm o'tishlari tahrirlanadi. Rasmli xabarda matnli
+    ekran rasm izohi (caption) sifatida ko'rsatiladi, keep_photo=False bo'lsa
+    (jurnal -> ro'yxat) rasm o'chiriladi. Telegram matnli xabarni rasmliga
+    aylantirishga ruxsat bermaydi, shuning uchun bunday o'tishda (yoki tahrirlash
+    imkoni bo'lmasa) xabar o'chirilib, yangisi yuboriladi.
+    """
     try:
-        if message.photo:
-            # Agar rasm bo'lsa, caption tahrirlash
+        if not photo and message.photo and keep_photo:
             await bot.edit_message_caption(
                 caption=text,
                 chat_id=message.chat.id,
@@ -143,8 +180,16 @@ async def safe_edit_message(message, text, keyboard=None, parse_mode=None):
                 reply_markup=keyboard,
                 parse_mode=parse_mode
             )
-        else:
-            # Oddiy matn bo'lsa
+            return
+        if photo and message.photo:
+            await bot.edit_message_media(
+                media=types.InputMediaPhoto(photo, caption=text, parse_mode=parse_mode),
+                chat_id=message.chat.id,
+                message_id=message.message_id,
+                reply_markup=keyboard
+            )
+            return
+        if not photo and not message.photo:
             await bot.edit_message_text(
                 text=text,
                 chat_id=message.chat.id,
@@ -152,10 +197,15 @@ async def safe_edit_message(message, text, keyboard=None, parse_mode=None):
                 reply_markup=keyboard,
                 parse_mode=parse_mode
             )
+            return
+    except MessageNotModified:
+        # Xabar allaqachon shu holatda (masalan, tugma ikki marta bosilgan)
+        return
     except Exception as e:
         logging.error(f"Xabarni tahrirlashda xatolik: {e}")
-        # Xatolik bo'lsa, yangi xabar yuborish
-        await message.answer(text=text, reply_markup=keyboard, parse_mode=parse_mode)
+
+    await safe_delete_message(message.chat.id, message.message_id)
+    await send_screen(message.chat.id, text, keyboard, parse_mode, photo)
 
 
 @dp.message_handler(CommandStart())
@@ -171,25 +221,10 @@ async def bot_start(message: types.Message):
         return
 
     # Foydalanuvchini bazaga qo'shish yoki yangilash
-    user = get_user(user_id)
-    if not user:
-        add_user(user_id, full_name, username)
-        logging.info(f"Yangi foydalanuvchi qo'shildi: {full_name} (@{username})")
-    else:
-        update_user_activity(user_id)
+    activity_buffer.register(user_id, full_name, username)
 
-    # Fanlar ro'yxatini olish
-    fanlar = get_fanlar()
-
-    # Inline keyboard yaratish
-    keyboard = InlineKeyboardMarkup(row_width=2)
-    for fan in fanlar:
-        btn_text = get_fan_display(fan['nomi'])
-        btn = InlineKeyboardButton(
-            text=btn_text,
-            callback_data=f"fan_{fan['id']}"
-        )
-        keyboard.insert(btn)
+    # Fanlar menyusi (katalog versiyasi bo'yicha keshlangan)
+    keyboard = fanlar_keyboard()
 
     welcome_text = f"""🎓 <b>Assalomu alaykum, {full_name}!</b>
 
@@ -203,12 +238,14 @@ Bu bot orqali turli fanlar bo'yicha ilmiy jurnallar haqida ma'lumot olishingiz m
 
 
 @dp.callback_query_handler(lambda c: c.data == 'check_subscription')
+@rate_limit(3)  # Har safar keshsiz getChatMember so'rovlari yuboriladi
 async def check_subscription_callback(callback_query: types.CallbackQuery):
     """Obunani tekshirish callback"""
     await bot.answer_callback_query(callback_query.id)
 
     user_id = callback_query.from_user.id
-    is_subscribed, unsubscribed_channels = await check_subscription(user_id)
+    # Foydalanuvchi hozirgina obuna bo'lgan bo'lishi mumkin - keshsiz tekshiramiz
+    is_subscribed, unsubscribed_channels = await check_subscription(user_id, use_cache=False)
 
     if not is_subscribed:
         await bot.answer_callback_query(
@@ -226,25 +263,10 @@ async def check_subscription_callback(callback_query: types.CallbackQuery):
     full_name = callback_query.from_user.full_name
     username = callback_query.from_user.username
 
-    user = get_user(user_id)
-    if not user:
-        add_user(user_id, full_name, username)
-        logging.info(f"Yangi foydalanuvchi qo'shildi: {full_name} (@{username})")
-    else:
-        update_user_activity(user_id)
-
-    # Fanlar ro'yxatini olish
-    fanlar = get_fanlar()
+    activity_buffer.register(user_id, full_name, username)
 
-    # Inline keyboard yaratish
-    keyboard = InlineKeyboardMarkup(row_width=2)
-    for fan in fanlar:
-        btn_text = get_fan_display(fan['nomi'])
-        btn = InlineKeyboardButton(
-            text=btn_text,
-            callback_data=f"fan_{fan['id']}"
-        )
-        keyboard.insert(btn)
+    # Fanlar menyusi (katalog versiyasi bo'yicha keshlangan)
+    keyboard = fanlar_keyboard()
 
     welcome_text = f"""🎓 <b>Assalomu alaykum, {full_name}!</b>
 
@@ -268,30 +290,17 @@ async def show_bolimlar(callback_query: types.CallbackQuery):
         await send_subscription_message(callback_query, is_callback=True)
         return
 
-    update_user_activity(callback_query.from_user.id)
+    activity_buffer.touch(callback_query.from_user.id)
 
     fan_id = int(callback_query.data.split('_')[1])
-    fan = get_fan_by_id(fan_id)
-    bolimlar = get_bolimlar()
+    fan = catalog.get_fan_by_id(fan_id)
 
     if not fan:
         await bot.answer_callback_query(callback_query.id, "Fan topilmadi!", show_alert=True)
         return
 
-    keyboard = InlineKeyboardMarkup(row_width=1)
-
-    for bolim in bolimlar:
-        count = get_jurnallar_count_by_fan_bolim(fan_id, bolim['id'])
-        btn_text = f"{get_bolim_display(bolim['nomi'])} ({count})"
-
-        btn = InlineKeyboardButton(
-            text=btn_text,
-            callback_data=f"bolim_{fan_id}_{bolim['id']}_1"
-        )
-        keyboard.add(btn)
-
-    # Orqaga qaytish tugmasi
-    keyboard.add(InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_fanlar"))
+    # Bo'limlar menyusi (jurnallar soni bilan, katalog versiyasi bo'yicha keshlangan)
+    keyboard = bolimlar_keyboard(fan_id)
 
     # Fan nomini qisqartirish
     fan_nomi = fan['nomi']
@@ -303,34 +312,17 @@ async def show_bolimlar(callback_query: types.CallbackQuery):
     await safe_edit_message(callback_query.message, text, keyboard, ParseMode.HTML)
 
 
-@dp.callback_query_handler(lambda c: c.data.startswith('bolim_'))
-async def show_jurnallar(callback_query: types.CallbackQuery):
-    await bot.answer_callback_query(callback_query.id)
+def build_jurnallar_page(fan: dict, bolim: dict, page: int, version: int, after_id=None, before_id=None):
+    """Jurnallar sahifasining matni va klaviaturasi (sinxron, db_pool.run orqali chaqiring)
 
-    # Obuna holatini tekshirish
-    user_id = callback_query.from_user.id
-    is_subscribed, channel = await check_subscription(user_id)
-    if not is_subscribed:
-        await send_subscription_message(callback_query, is_callback=True)
-        return
-
-    update_user_activity(callback_query.from_user.id)
-
-    data_parts = callback_query.data.split('_')
-    fan_id = int(data_parts[1])
-    bolim_id = int(data_parts[2])
-    page = int(data_parts[3])
-
-    fan = get_fan_by_id(fan_id)
-    bolim = get_bolim_by_id(bolim_id)
-
-    if not fan or not bolim:
-        await bot.answer_callback_query(callback_query.id, "Ma'lumot topilmadi!", show_alert=True)
-        return
+    version - sahifa qaysi katalog versiyasi bo'yicha yasalgani (kursorlarga yoziladi)
+    """
+    fan_id, bolim_id = fan['id'], bolim['id']
 
-    # Jurnallar ro'yxatini olish
-    jurnallar, total_count = get_jurnallar(fan_id, bolim_id, page, 8)
-    total_pages = (total_count + 7) // 8
+    # Jurnallar ro'yxatini olish (umumiy son katalogdan, sahifa keyset bo'yicha)
+    total_count = catalog.get_count(fan_id, bolim_id)
+    total_pages = (total_count + JURNALLAR_PER_PAGE - 1) // JURNALLAR_PER_PAGE
+    jurnallar = get_jurnallar_page(fan_id, bolim_id, page, JURNALLAR_PER_PAGE, after_id, before_id)
 
     # Fan va bo'lim nomlarini formatlash
     fan_display = fan['nomi'][:20] + "..." if len(fan['nomi']) > 20 else fan['nomi']
@@ -341,8 +333,7 @@ async def show_jurnallar(callback_query: types.CallbackQuery):
         keyboard.add(InlineKeyboardButton("🔙 Orqaga", callback_data=f"fan_{fan_id}"))
 
         text = f"📚 <b>{fan_display}</b>\n{bolim_display}\n\n❌ Jurnallar mavjud emas."
-        await safe_edit_message(callback_query.message, text, keyboard, ParseMode.HTML)
-        return
+        return text, keyboard
 
     # Jurnallar ro'yxati uchun keyboard
     keyboard = InlineKeyboardMarkup(row_width=1)
@@ -352,7 +343,7 @@ async def show_jurnallar(callback_query: types.CallbackQuery):
         if len(jurnal_nomi) > 35:
             jurnal_nomi = jurnal_nomi[:32] + "..."
 
-        btn_text = f"{(page - 1) * 8 + i}. {jurnal_nomi}"
+        btn_text = f"{(page - 1) * JURNALLAR_PER_PAGE + i}. {jurnal_nomi}"
         btn = InlineKeyboardButton(
             text=btn_text,
             callback_data=f"jurnal_{jurnal['id']}"
@@ -364,12 +355,14 @@ async def show_jurnallar(callback_query: types.CallbackQuery):
         nav_buttons = []
 
         if page > 1:
-            nav_buttons.append(InlineKeyboardButton("⬅️", callback_data=f"bolim_{fan_id}_{bolim_id}_{page - 1}"))
+            nav_buttons.append(InlineKeyboardButton(
+                "⬅️", callback_data=f"bolim_{fan_id}_{bolim_id}_{page - 1}_b{jurnallar[0]['id']}v{version}"))
 
         nav_buttons.append(InlineKeyboardButton(f"{page}/{total_pages}", callback_data="current_page"))
 
         if page < total_pages:
-            nav_buttons.append(InlineKeyboardButton("➡️", callback_data=f"bolim_{fan_id}_{bolim_id}_{page + 1}"))
+            nav_buttons.append(InlineKeyboardButton(
+                "➡️", callback_data=f"bolim_{fan_id}_{bolim_id}_{page + 1}_a{jurnallar[-1]['id']}v{version}"))
 
         keyboard.row(*nav_buttons)
 
@@ -380,11 +373,34 @@ async def show_jurnallar(callback_query: types.CallbackQuery):
     bolim_short = get_bolim_display(bolim['nomi'], 10)
     text = f"📚 <b>{fan_display}</b>\n{bolim_short}\n\n📖 Jurnallar ({total_count})\n📄 {page}/{total_pages}:"
 
-    await safe_edit_message(callback_query.message, text, keyboard, ParseMode.HTML)
+    return text, keyboard
 
 
-@dp.callback_query_handler(lambda c: c.data.startswith('jurnal_'))
-async def show_jurnal_detail(callback_query: types.CallbackQuery):
+async def render_jurnallar_page(fan_id: int, bolim_id: int, page: int, after_id=None, before_id=None):
+    """Jurnallar sahifasini keshdan yoki bazadan olish -> (matn, reply_markup JSON)
+
+    Sahifa barcha foydalanuvchilar uchun bir xil, shuning uchun tayyor natija
+    katalog versiyasi bilan keshlanadi (admin o'zgarishlari versiyani oshiradi).
+    Kursor ham kalitga kiradi: kursor bo'yicha yasalgan sahifa sahifa raqami
+    bo'yicha yasalganidan farq qilsa, u boshqa foydalanuvchilarga berilmaydi.
+    """
+    version = catalog.version
+    key = (fan_id, bolim_id, page, after_id, before_id, JURNALLAR_PER_PAGE, version)
+    cached = jurnallar_page_cache.get(key)
+    if cached is not None:
+        return cached
+
+    fan = catalog.get_fan_by_id(fan_id)
+    bolim = catalog.get_bolim_by_id(bolim_id)
+    text, keyboard = await db_pool.run(build_jurnallar_page, fan, bolim, page, version, after_id, before_id)
+
+    rendered = (text, json.dumps(keyboard.to_python(), ensure_ascii=False))
+    jurnallar_page_cache.set(key, rendered)
+    return rendered
+
+
+@dp.callback_query_handler(lambda c: c.data.startswith('bolim_') or c.data.startswith('back_to_jurnallar_'))
+async def show_jurnallar(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
 
     # Obuna holatini tekshirish
@@ -394,16 +410,30 @@ async def show_jurnal_detail(callback_query: types.CallbackQuery):
         await send_subscription_message(callback_query, is_callback=True)
         return
 
-    update_user_activity(callback_query.from_user.id)
+    activity_buffer.touch(callback_query.from_user.id)
 
-    jurnal_id = int(callback_query.data.split('_')[1])
-    jurnal = get_jurnal_by_id(jurnal_id)
+    # bolim_{fan}_{bolim}_{sahifa} yoki eski xabarlardagi back_to_jurnallar_{fan}_{bolim}_{sahifa}
+    data_parts = callback_query.data.split('_')
+    start = 3 if callback_query.data.startswith('back_to_jurnallar_') else 1
+    fan_id = int(data_parts[start])
+    bolim_id = int(data_parts[start + 1])
+    page = int(data_parts[start + 2])
+    after_id, before_id = parse_page_cursor(data_parts, start + 3, catalog.version)
 
-    if not jurnal:
-        await bot.answer_callback_query(callback_query.id, "Jurnal topilmadi!", show_alert=True)
+    fan = catalog.get_fan_by_id(fan_id)
+    bolim = catalog.get_bolim_by_id(bolim_id)
+
+    if not fan or not bolim:
+        await bot.answer_callback_query(callback_query.id, "Ma'lumot topilmadi!", show_alert=True)
         return
 
-    # Jurnal ma'lumotlarini formatlash
+    text, keyboard = await render_jurnallar_page(fan_id, bolim_id, page, after_id, before_id)
+    # Jurnal rasmidan ro'yxatga qaytishda rasm qoldirilmaydi
+    await safe_edit_message(callback_query.message, text, keyboard, ParseMode.HTML, keep_photo=False)
+
+
+def format_jurnal_text(jurnal: dict) -> str:
+    """Jurnal ma'lumotlarini formatlash"""
     text = f"📖 <b>{jurnal['nomi']}</b>\n\n"
     text += f"🎓 <b>Fan:</b> {jurnal['fan_nomi']}\n"
     text += f"🏛️ <b>Bo'lim:</b> {jurnal['bolim_nomi']}\n"
@@ -411,7 +441,11 @@ async def show_jurnal_detail(callback_query: types.CallbackQuery):
     if jurnal['nashr_chastotasi']:
         text += f"📅 <b>Nashr chastotasi:</b> {jurnal['nashr_chastotasi']}\n"
 
-    # Havolalar tugmalari
+    return text
+
+
+def create_jurnal_keyboard(jurnal: dict, with_back: bool = True) -> InlineKeyboardMarkup:
+    """Jurnal havolalari tugmalari (inline rejim uchun with_back=False - faqat URL tugmalar)"""
     keyboard = InlineKeyboardMarkup()
 
     # Jurnal saytiga o'tish
@@ -432,43 +466,17 @@ async def show_jurnal_detail(callback_query: types.CallbackQuery):
         keyboard.add(row_buttons[0])
 
     # Orqaga qaytish tugmasi
-    keyboard.add(InlineKeyboardButton(
-        "🔙 Orqaga",
-        callback_data=f"back_to_jurnallar_{jurnal['fan_id']}_{jurnal['bolim_id']}_1"
-    ))
-
-    # Eski xabarni o'chirish
-    await safe_delete_message(callback_query.message.chat.id, callback_query.message.message_id)
+    if with_back:
+        keyboard.add(InlineKeyboardButton(
+            "🔙 Orqaga",
+            callback_data=f"bolim_{jurnal['fan_id']}_{jurnal['bolim_id']}_1"
+        ))
 
-    # Jurnal ma'lumotlarini yuborish
-    if jurnal['rasmi']:
-        try:
-            await bot.send_photo(
-                chat_id=callback_query.message.chat.id,
-                photo=jurnal['rasmi'],
-                caption=text,
-                reply_markup=keyboard,
-                parse_mode=ParseMode.HTML
-            )
-        except Exception as e:
-            logging.error(f"Rasm yuklashda xatolik: {e}")
-            await bot.send_message(
-                chat_id=callback_query.message.chat.id,
-                text=text + "\n\n❗️ <i>Rasm yuklanmadi</i>",
-                reply_markup=keyboard,
-                parse_mode=ParseMode.HTML
-            )
-    else:
-        await bot.send_message(
-            chat_id=callback_query.message.chat.id,
-            text=text,
-            reply_markup=keyboard,
-            parse_mode=ParseMode.HTML
-        )
+    return keyboard
 
 
-@dp.callback_query_handler(lambda c: c.data.startswith('back_to_jurnallar_'))
-async def back_to_jurnallar(callback_query: types.CallbackQuery):
+@dp.callback_query_handler(lambda c: c.data.startswith('jurnal_'))
+async def show_jurnal_detail(callback_query: types.CallbackQuery):
     await bot.answer_callback_query(callback_query.id)
 
     # Obuna holatini tekshirish
@@ -478,94 +486,19 @@ async def back_to_jurnallar(callback_query: types.CallbackQuery):
         await send_subscription_message(callback_query, is_callback=True)
         return
 
-    update_user_activity(callback_query.from_user.id)
-
-    data_parts = callback_query.data.split('_')
-    fan_id = int(data_parts[3])
-    bolim_id = int(data_parts[4])
-    page = int(data_parts[5])
-
-    # Eski xabarni o'chirish
-    await safe_delete_message(callback_query.message.chat.id, callback_query.message.message_id)
+    activity_buffer.touch(callback_query.from_user.id)
 
-    # To'g'ridan-to'g'ri jurnallar ro'yxatini ko'rsatish
-    fan = get_fan_by_id(fan_id)
-    bolim = get_bolim_by_id(bolim_id)
-
-    if not fan or not bolim:
-        await bot.send_message(
-            chat_id=callback_query.message.chat.id,
-            text="❌ Ma'lumot topilmadi!",
-            parse_mode=ParseMode.HTML
-        )
-        return
-
-    # Jurnallar ro'yxatini olish
-    jurnallar, total_count = get_jurnallar(fan_id, bolim_id, page, 8)
-    total_pages = (total_count + 7) // 8
-
-    # Fan va bo'lim nomlarini formatlash
-    fan_display = fan['nomi'][:20] + "..." if len(fan['nomi']) > 20 else fan['nomi']
-    bolim_display = get_bolim_display(bolim['nomi'], 15)
-
-    if not jurnallar:
-        keyboard = InlineKeyboardMarkup()
-        keyboard.add(InlineKeyboardButton("🔙 Orqaga", callback_data=f"fan_{fan_id}"))
-
-        text = f"📚 <b>{fan_display}</b>\n{bolim_display}\n\n❌ Jurnallar mavjud emas."
+    jurnal_id = int(callback_query.data.split('_')[1])
+    jurnal = await db_pool.run(get_jurnal_by_id, jurnal_id)
 
-        await bot.send_message(
-            chat_id=callback_query.message.chat.id,
-            text=text,
-            reply_markup=keyboard,
-            parse_mode=ParseMode.HTML
-        )
+    if not jurnal:
+        await bot.answer_callback_query(callback_query.id, "Jurnal topilmadi!", show_alert=True)
         return
 
-    # Jurnallar ro'yxati uchun keyboard
-    keyboard = InlineKeyboardMarkup(row_width=1)
-
-    for i, jurnal in enumerate(jurnallar, 1):
-        jurnal_nomi = jurnal['nomi']
-        if len(jurnal_nomi) > 35:
-            jurnal_nomi = jurnal_nomi[:32] + "..."
-
-        btn_text = f"{(page - 1) * 8 + i}. {jurnal_nomi}"
-        btn = InlineKeyboardButton(
-            text=btn_text,
-            callback_data=f"jurnal_{jurnal['id']}"
-        )
-        keyboard.add(btn)
-
-    # Pagination tugmalari
-    if total_pages > 1:
-        nav_buttons = []
-
-        if page > 1:
-            nav_buttons.append(
-                InlineKeyboardButton("⬅️", callback_data=f"back_to_jurnallar_{fan_id}_{bolim_id}_{page - 1}"))
-
-        nav_buttons.append(InlineKeyboardButton(f"{page}/{total_pages}", callback_data="current_page"))
+    text = format_jurnal_text(jurnal)
+    keyboard = create_jurnal_keyboard(jurnal)
 
-        if page < total_pages:
-            nav_buttons.append(
-                InlineKeyboardButton("➡️", callback_data=f"back_to_jurnallar_{fan_id}_{bolim_id}_{page + 1}"))
-
-        keyboard.row(*nav_buttons)
-
-    # Orqaga qaytish tugmasi
-    keyboard.add(InlineKeyboardButton("🔙 Orqaga", callback_data=f"fan_{fan_id}"))
-
-    # Bo'lim nomini qisqartirish
-    bolim_short = get_bolim_display(bolim['nomi'], 10)
-    text = f"📚 <b>{fan_display}</b>\n{bolim_short}\n\n📖 Jurnallar ({total_count})\n📄 {page}/{total_pages}:"
-
-    await bot.send_message(
-        chat_id=callback_query.message.chat.id,
-        text=text,
-        reply_markup=keyboard,
-        parse_mode=ParseMode.HTML
-    )
+    await safe_edit_message(callback_query.message, text, keyboard, ParseMode.HTML, photo=jurnal['rasmi'])
 
 
 @dp.callback_query_handler(lambda c: c.data == 'back_to_fanlar')
@@ -579,18 +512,9 @@ async def back_to_fanlar(callback_query: types.CallbackQuery):
         await send_subscription_message(callback_query, is_callback=True)
         return
 
-    update_user_activity(callback_query.from_user.id)
-
-    fanlar = get_fanlar()
-    keyboard = InlineKeyboardMarkup(row_width=2)
+    activity_buffer.touch(callback_query.from_user.id)
 
-    for fan in fanlar:
-        btn_text = get_fan_display(fan['nomi'])
-        btn = InlineKeyboardButton(
-            text=btn_text,
-            callback_data=f"fan_{fan['id']}"
-        )
-        keyboard.insert(btn)
+    keyboard = fanlar_keyboard()
 
     welcome_text = """🎓 <b>Ilmiy jurnallar</b>
 
@@ -603,14 +527,14 @@ async def back_to_fanlar(callback_query: types.CallbackQuery):
 async def current_page(callback_query: types.CallbackQuery):
     # Obuna holatini tekshirish
     user_id = callback_query.from_user.id
-    is_subscribed, channel = await check_subscription(user_id)
+    is_subscribed, unsubscribed_channels = await check_subscription(user_id)
     if not is_subscribed:
         await bot.answer_callback_query(
             callback_query.id,
-            f"❌ Avval {channel['name']} ga obuna bo'ling!",
+            f"❌ Avval {', '.join([ch['name'] for ch in unsubscribed_channels])} ga obuna bo'ling!",
             show_alert=True
         )
-        await send_subscription_message(callback_query, is_callback=True)
+        await send_subscription_message(callback_query, is_callback=True, channels=unsubscribed_channels)
         return
 
     await bot.answer_callback_query(callback_query.id, "Joriy sahifa")
@@ -624,7 +548,7 @@ async def help_command(message: types.Message):
         await send_subscription_message(message)
         return
 
-    update_user_activity(message.from_user.id)
+    activity_buffer.touch(message.from_user.id)
 
     help_text = """🤖 <b>Bot haqida ma'lumot:</b>
 
@@ -632,6 +556,7 @@ Bu bot O'zbekiston Respublikasi Vazirlar Mahkamasining ilmiy jurnallar ro'yxatin
 
 📋 <b>Buyruqlar:</b>
 /start - Botni ishga tushirish
+/search - Jurnal qidirish
 /help - Yordam
 
 🎯 <b>Imkoniyatlar:</b>
@@ -639,6 +564,7 @@ Bu bot O'zbekiston Respublikasi Vazirlar Mahkamasining ilmiy jurnallar ro'yxatin
 • 4 ta bo'lim 
 • Har jurnal haqida to'liq ma'lumot
 • Jurnal sayti va talablariga o'tish
+• /search buyrug'i bilan jurnal nomi bo'yicha qidirish
 
 📞 <b>Qo'llab-quvvatlash:</b>
 Muammo bo'lsa, admin bilan bog'laning."""
@@ -646,6 +572,143 @@ Muammo bo'lsa, admin bilan bog'laning."""
     await message.answer(help_text, parse_mode=ParseMode.HTML)
 
 
+async def render_search_results(query_id, query, page):
+    """Qidiruv natijalari sahifasi uchun matn va tugmalar"""
+    jurnallar = await db_pool.run(
+        search_jurnallar, query,
+        limit=SEARCH_PER_PAGE + 1,
+        offset=(page - 1) * SEARCH_PER_PAGE
+    )
+    has_next = len(jurnallar) > SEARCH_PER_PAGE
+    jurnallar = jurnallar[:SEARCH_PER_PAGE]
+
+    keyboard = InlineKeyboardMarkup(row_width=1)
+
+    if not jurnallar:
+        keyboard.add(InlineKeyboardButton("🔙 Fanlar ro'yxati", callback_data="back_to_fanlar"))
+        text = f"🔍 <b>Qidiruv:</b> {quote_html(query)}\n\n❌ Hech narsa topilmadi."
+        return text, keyboard
+
+    for i, jurnal in enumerate(jurnallar, 1):
+        jurnal_nomi = jurnal['nomi']
+        if len(jurnal_nomi) > 35:
+            jurnal_nomi = jurnal_nomi[:32] + "..."
+
+        keyboard.add(InlineKeyboardButton(
+            text=f"{(page - 1) * SEARCH_PER_PAGE + i}. {jurnal_nomi}",
+            callback_data=f"jurnal_{jurnal['id']}"
+        ))
+
+    # Pagination tugmalari
+    if page > 1 or has_next:
+        nav_buttons = []
+
+        if page > 1:
+            nav_buttons.append(InlineKeyboardButton("⬅️", callback_data=f"search_{query_id}_{page - 1}"))
+
+        nav_buttons.append(InlineKeyboardButton(f"📄 {page}", callback_data="current_page"))
+
+        if has_next:
+            nav_buttons.append(InlineKeyboardButton("➡️", callback_data=f"search_{query_id}_{page + 1}"))
+
+        keyboard.row(*nav_buttons)
+
+    keyboard.add(InlineKeyboardButton("🔙 Fanlar ro'yxati", callback_data="back_to_fanlar"))
+
+    text = f"🔍 <b>Qidiruv:</b> {quote_html(query)}\n\n📖 Topilgan jurnallar ({page}-sahifa):"
+    return text, keyboard
+
+
+async def send_search_results(message: types.Message, query: str):
+    """Yangi qidiruvni bajarish va natijalarni yuborish"""
+    query = query.strip()[:100]
+
+    if len(normalize_search_text(query).strip()) < 2:
+        await message.answer("🔍 Qidirish uchun jurnal nomidan kamida 2 ta harf yozing.\n\nMisol: /search tibbiyot")
+        return
+
+    # Keyingi sahifalar uchun so'rovni xotirada saqlab qo'yamiz (har bir qidiruv o'z ID si bilan,
+    # shuning uchun eski natijalar xabarini varaqlash ham o'sha so'rov bo'yicha ishlaydi)
+    query_id = secrets.token_hex(4)
+    search_query_cache.set(query_id, query)
+
+    text, keyboard = await render_search_results(query_id, query, 1)
+    await message.answer(text, reply_markup=keyboard, parse_mode=ParseMode.HTML)
+
+
+@dp.message_handler(commands=['search'])
+@rate_limit(1, 'search')
+async def search_command(message: types.Message):
+    user_id = message.from_user.id
+    is_subscribed, channel = await check_subscription(user_id)
+    if not is_subscribed:
+        await send_subscription_message(message)
+        return
+
+    activity_buffer.touch(message.from_user.id)
+
+    query = message.get_args() or ""
+    if not query.strip():
+        # So'rov keyingi xabarda kutiladi
+        await SearchStates.waiting_for_query.set()
+        await message.answer("🔍 Jurnal nomini yozib yuboring:")
+        return
+
+    await send_search_results(message, query)
+
+
+@dp.callback_query_handler(lambda c: c.data.startswith('search_'))
+@rate_limit(1, 'search')
+async def search_page(callback_query: types.CallbackQuery):
+    await bot.answer_callback_query(callback_query.id)
+
+    # Obuna holatini tekshirish
+    user_id = callback_query.from_user.id
+    is_subscribed, channel = await check_subscription(user_id)
+    if not is_subscribed:
+        await send_subscription_message(callback_query, is_callback=True)
+        return
+
+    activity_buffer.touch(callback_query.from_user.id)
+
+    # search_{id}_{sahifa}; eski xabarlardagi search_{sahifa} eskirgan hisoblanadi
+    data_parts = callback_query.data.split('_')
+    query_id = data_parts[1] if len(data_parts) == 3 else None
+    query = search_query_cache.get(query_id) if query_id else None
+
+    if not query:
+        await bot.answer_callback_query(
+            callback_query.id,
+            "Qidiruv eskirgan. /search bilan qaytadan qidiring.",
+            show_alert=True
+        )
+        return
+
+    text, keyboard = await render_search_results(query_id, query, int(data_parts[2]))
+    await safe_edit_message(callback_query.message, text, keyboard, ParseMode.HTML)
+
+
+@dp.message_handler(content_types=types.ContentTypes.ANY, state=SearchStates.waiting_for_query)
+@rate_limit(1, 'search')
+async def search_text(message: types.Message, state: FSMContext):
+    """/search dan keyin yuborilgan matn jurnal nomi bo'yicha qidiruv sifatida qabul qilinadi"""
+    await state.finish()
+
+    if not message.text or message.text.startswith('/'):
+        await message.answer("🔍 Qidiruv bekor qilindi. Buyruqni qaytadan yuboring.")
+        return
+
+    user_id = message.from_user.id
+    is_subscribed, channel = await check_subscription(user_id)
+    if not is_subscribed:
+        await send_subscription_message(message)
+        return
+
+    activity_buffer.touch(message.from_user.id)
+
+    await send_search_results(message, message.text)
+
+
 @dp.message_handler()
 async def unknown_message(message: types.Message):
     user_id = message.from_user.id
@@ -654,7 +717,7 @@ async def unknown_message(message: types.Message):
         await send_subscription_message(message)
         return
 
-    update_user_activity(message.from_user.id)
+    activity_buffer.touch(message.from_user.id)
 
     response_text = """❓ Kechirasiz, bu buyruqni tushunmadim.
 
@@ -0,0 +1,152 @@
+import json
+import threading
+from typing import Dict, Hashable
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from utils.db_api.catalog import catalog
+from utils.misc.metrics import metrics
+
+# Emoji xaritalari
+FAN_EMOJI_MAP = {
+    "Fizika-matematika fanlari": ("🔬", "Fizika-matem..."),
+    "Kimyo fanlari": ("⚗️", "Kimyo fanlari"),
+    "Biologiya fanlari": ("🧬", "Biologiya fanlari"),
+    "Geologiya-mineralogiya fanlari": ("⛰️", "Geologiya-min..."),
+    "Texnika fanlari": ("⚙️", "Texnika fanlari"),
+    "Qishloq xo'jaligi fanlari": ("🌾", "Qishloq x..."),
+    "Tarix fanlari": ("📜", "Tarix fanlari"),
+    "Iqtisodiyot fanlari": ("💰", "Iqtisodiyot"),
+    "Falsafa fanlari": ("🤔", "Falsafa fanlari"),
+    "Filologiya fanlari": ("📚", "Filologiya"),
+    "Geografiya fanlari": ("🌍", "Geografiya"),
+    "Yuridik fanlar": ("⚖️", "Yuridik fanlar"),
+    "Pedagogika fanlari": ("👨‍🏫", "Pedagogika"),
+    "Tibbiyot fanlari": ("🏥", "Tibbiyot fanlari"),
+    "Farmatsevtika fanlari": ("💊", "Farmatsevtika"),
+    "Veterinariya fanlari": ("🐕‍🦺", "Veterinariya"),
+    "San'atshunoslik fanlari": ("🎨", "San'atshunoslik"),
+    "Arxitektura": ("🏗️", "Arxitektura"),
+    "Psixologiya fanlari": ("🧠", "Psixologiya"),
+    "Harbiy fanlar": ("🎖️", "Harbiy fanlar"),
+    "Sotsiologiya fanlari": ("👥", "Sotsiologiya"),
+    "Siyosiy fanlar": ("🗳️", "Siyosiy fanlar"),
+    "Islomshunoslik fanlari": ("☪️", "Islomshunoslik")
+}
+
+BOLIM_EMOJI_MAP = {
+    "Milliy nashrlar": ("🇺🇿", "Milliy nashrlar"),
+    "Mustaqil davlatlar hamdo'stligi mamlakatlari nashrlari": ("🤝", "MDH nashrlari"),
+    "Evropa mamlakatlari nashrlari": ("🇪🇺", "Evropa nashrlari"),
+    "Amerika mamlakatlari nashrlari": ("🌎", "Amerika nashrlari")
+}
+
+
+def get_fan_display(fan_nomi, max_length=18):
+    """Fan nomini emoji bilan formatlash"""
+    if fan_nomi in FAN_EMOJI_MAP:
+        emoji, qisqa_nom = FAN_EMOJI_MAP[fan_nomi]
+        return f"{emoji} {qisqa_nom}"
+    else:
+        if len(fan_nomi) > max_length:
+            fan_nomi = fan_nomi[:max_length - 3] + "..."
+        return f"📖 {fan_nomi}"
+
+
+def get_bolim_display(bolim_nomi, max_length=20):
+    """Bo'lim nomini emoji bilan formatlash"""
+    if bolim_nomi in BOLIM_EMOJI_MAP:
+        emoji, qisqa_nom = BOLIM_EMOJI_MAP[bolim_nomi]
+        return f"{emoji} {qisqa_nom}"
+    else:
+        if len(bolim_nomi) > max_length:
+            bolim_nomi = bolim_nomi[:max_length - 3] + "..."
+        return f"📄 {bolim_nomi}"
+
+
+class KeyboardCache:
+    """Katalog versiyasi bo'yicha bir marta quriladigan klaviaturalar keshi
+
+    Klaviaturalar tayyor reply_markup JSON satri sifatida saqlanadi va
+    har bir so'rovda qayta qurilmaydi. Katalog versiyasi o'zgarsa kesh tozalanadi.
+    """
+
+    def __init__(self):
+        self._version = None
+        self._markups: Dict[Hashable, str] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, builder) -> str:
+        version = catalog.version
+        with self._lock:
+            if self._version != version:
+                self._markups = {}
+                self._version = version
+
+            markup = self._markups.get(key)
+            if markup is not None:
+                self.hits += 1
+                return markup
+
+        self.misses += 1
+        markup = json.dumps(builder().to_python(), ensure_ascii=False)
+
+        with self._lock:
+            if self._version == version:
+                self._markups[key] = markup
+        return markup
+
+    def get_stats(self) -> Dict:
+        """Kesh statistikasi"""
+        total = self.hits + self.misses
+        return {
+            'version': self._version,
+            'size': len(self._markups),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 3) if total else 0.0
+        }
+
+
+keyboard_cache = KeyboardCache()
+metrics.register_cache('keyboard', keyboard_cache)
+
+
+def build_fanlar_keyboard() -> InlineKeyboardMarkup:
+    """Fanlar menyusi"""
+    keyboard = InlineKeyboardMarkup(row_width=2)
+    for fan in catalog.get_fanlar():
+        keyboard.insert(InlineKeyboardButton(
+            text=get_fan_display(fan['nomi']),
+            callback_data=f"fan_{fan['id']}"
+        ))
+    return keyboard
+
+
+def build_bolimlar_keyboard(fan_id: int) -> InlineKeyboardMarkup:
+    """Fan bo'limlari menyusi (har bir bo'limdagi jurnallar soni bilan)"""
+    keyboard = InlineKeyboardMarkup(row_width=1)
+    counts = catalog.get_counts_by_fan(fan_id)
+
+    for bolim in catalog.get_bolimlar():
+        count = counts.get(bolim['id'], 0)
+        keyboard.add(InlineKeyboardButton(
+            text=f"{get_bolim_display(bolim['nomi'])} ({count})",
+            callback_data=f"bolim_{fan_id}_{bolim['id']}_1"
+        ))
+
+    # Orqaga qaytish tugmasi
+    keyboard.add(InlineKeyboardButton("🔙 Orqaga", callback_data="back_to_fanlar"))
+    return keyboard
+
+
+def fanlar_keyboard() -> str:
+    """Fanlar menyusi (tayyor reply_markup)"""
+    return keyboard_cache.get('fanlar', build_fanlar_keyboard)
+
+
+def bolimlar_keyboard(fan_id: int) -> str:
+    """Fan bo'limlari menyusi (tayyor reply_markup)"""
+    return keyboard_cache.get(('bolimlar', fan_id), lambda: build_bolimlar_keyboard(fan_id))
@@ -1,8 +1,43 @@
-from aiogram import Bot, Dispatcher, types
+from aiogram import Dispatcher, types
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 
 from data import config
+from utils.misc.rate_limiter import RateLimitedBot
 
-bot = Bot(token=config.BOT_TOKEN, parse_mode=types.ParseMode.HTML)
-storage = MemoryStorage()
+
+def create_storage():
+    """Sozlamalarga ko'ra FSM storage yaratish"""
+    if config.FSM_STORAGE == 'sqlite':
+        from utils.db_api.pool import db_pool
+        from utils.db_api.fsm_storage import SQLiteStorage
+        return SQLiteStorage(db_pool, state_ttl=config.FSM_STATE_TTL)
+
+    if config.FSM_STORAGE == 'redis':
+        # redis paketi faqat shu rejimda kerak
+        from aiogram.contrib.fsm_storage.redis import RedisStorage2
+        return RedisStorage2(
+            host=config.REDIS_HOST,
+            port=config.REDIS_PORT,
+            db=config.REDIS_DB,
+            password=config.REDIS_PASSWORD or None,
+            state_ttl=config.FSM_STATE_TTL,
+            data_ttl=config.FSM_STATE_TTL,
+            bucket_ttl=config.FSM_STATE_TTL
+        )
+
+    return MemoryStorage()
+
+
+bot = RateLimitedBot(
+    token=config.BOT_TOKEN,
+    parse_mode=types.ParseMode.HTML,
+    global_rate=config.BOT_GLOBAL_RATE,
+    chat_rate=config.BOT_CHAT_RATE,
+    chat_burst=config.BOT_CHAT_BURST,
+    group_rate=config.BOT_GROUP_RATE,
+    interactive_reserve=config.BOT_INTERACTIVE_RESERVE,
+    max_retries=config.BOT_MAX_RETRIES,
+    max_retry_delay=config.BOT_MAX_RETRY_DELAY
+)
+storage = create_storage()
 dp = Dispatcher(bot, storage=storage)
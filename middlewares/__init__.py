@@ -1,8 +1,20 @@
 from aiogram import Dispatcher
 
-from loader import dp
+from data import config
+from utils.misc.metrics import metrics
+from .perf import PerfMiddleware
 from .throttling import ThrottlingMiddleware
 
 
-if __name__ == "middlewares":
-    dp.middleware.setup(ThrottlingMiddleware())
+def setup(dispatcher: Dispatcher):
+    """Middleware'larni ro'yxatdan o'tkazish (app.py dan chaqiriladi)"""
+    throttling = ThrottlingMiddleware(
+        limit=config.THROTTLE_RATE_LIMIT,
+        burst=config.THROTTLE_BURST,
+        idle_ttl=config.THROTTLE_IDLE_TTL,
+        max_buckets=config.THROTTLE_MAX_BUCKETS
+    )
+    dispatcher.middleware.setup(throttling)
+    metrics.add_collector(lambda: metrics.set_counter('throttled_total', throttling.throttled_count))
+    # Throttling to'xtatgan update'lar handler vaqtiga qo'shilmasligi uchun keyin ulanadi
+    dispatcher.middleware.setup(PerfMiddleware())
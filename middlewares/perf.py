@@ -0,0 +1,57 @@
+import time
+
+from aiogram import types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+from utils.misc.metrics import UpdateStats, current_update, metrics
+
+
+class PerfMiddleware(BaseMiddleware):
+    """
+    Har bir update uchun handler vaqti, SQL va Bot API chaqiruvlarini o'lchash
+
+    Natijalar handler nomi bo'yicha metrics registriga yoziladi va admin
+    /perf buyrug'ida ko'rsatiladi.
+    """
+
+    @staticmethod
+    def _set_handler():
+        stats = current_update.get()
+        handler = current_handler.get(None)
+        if stats is not None and handler is not None:
+            stats.handler = handler.__name__
+
+    async def on_pre_process_update(self, update: types.Update, data: dict):
+        current_update.set(UpdateStats())
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        self._set_handler()
+
+    async def on_process_edited_message(self, message: types.Message, data: dict):
+        self._set_handler()
+
+    async def on_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        self._set_handler()
+
+    async def on_process_inline_query(self, inline_query: types.InlineQuery, data: dict):
+        self._set_handler()
+
+    async def on_post_process_update(self, update: types.Update, results, data: dict):
+        stats = current_update.get()
+        if stats is None:
+            return
+        current_update.set(None)
+
+        elapsed = time.perf_counter() - stats.started
+        update_type = next((name for name in ('message', 'edited_message', 'callback_query', 'inline_query',
+                                              'my_chat_member', 'chat_member') if getattr(update, name)), 'other')
+        # Handler topilmagan yoki throttling to'xtatgan update'lar turi bo'yicha guruhlanadi
+        handler = stats.handler or f"{update_type}:none"
+
+        metrics.inc('updates_total', type=update_type)
+        metrics.observe('handler_ms', elapsed * 1000, handler=handler)
+        metrics.inc('handler_db_queries_total', stats.db_count, handler=handler)
+        metrics.inc('handler_db_ms_total', stats.db_time * 1000, handler=handler)
+        metrics.inc('handler_api_calls_total', stats.api_count, handler=handler)
+        metrics.inc('handler_api_ms_total', stats.api_time * 1000, handler=handler)
@@ -1,37 +1,93 @@
-import asyncio
+import time
+from typing import Optional
 
-from aiogram import types, Dispatcher
+from aiogram import types
 from aiogram.dispatcher import DEFAULT_RATE_LIMIT
 from aiogram.dispatcher.handler import CancelHandler, current_handler
 from aiogram.dispatcher.middlewares import BaseMiddleware
-from aiogram.utils.exceptions import Throttled
+
+from utils.misc.token_bucket import BucketMap, TokenBucket
+
+
+class UserBucket(TokenBucket):
+    """Foydalanuvchi + handler uchun token bucket (ogohlantirish yuborilganini ham eslab qoladi)"""
+
+    __slots__ = ('warned',)
+
+    def __init__(self, rate: float, capacity: float):
+        super().__init__(rate, capacity)
+        self.warned = False
 
 
 class ThrottlingMiddleware(BaseMiddleware):
     """
-    Simple middleware
+    Foydalanuvchi va handler bo'yicha token bucket limiter
+
+    Har bir (user_id, handler) juftligi uchun xotirada alohida chelak
+    saqlanadi: handler o'rtacha limit soniyada bir marta va ketma-ket
+    burst martagacha chaqirilishi mumkin. Limit utils.misc.throttling.rate_limit
+    dekoratori bilan handler uchun alohida belgilanadi (0 - cheklanmaydi);
+    bunday handlerning burst'i ham dekoratordan olinadi (standart 1), global
+    burst faqat standart limitdagi handlerlarga qo'llanadi.
+    Chelaklar bazaga yoki storage'ga yozilmaydi; idle_ttl soniya
+    ishlatilmaganlari (va max_buckets dan oshganlari) eng eskisidan
+    boshlab o'chiriladi.
     """
 
-    def __init__(self, limit=DEFAULT_RATE_LIMIT, key_prefix='antiflood_'):
+    def __init__(self, limit: float = DEFAULT_RATE_LIMIT, burst: int = 3,
+                 idle_ttl: float = 600, max_buckets: int = 100000):
         self.rate_limit = limit
-        self.prefix = key_prefix
+        self.burst = burst
+
+        # (user_id, handler kaliti) -> UserBucket
+        self._buckets = BucketMap(idle_ttl=idle_ttl, max_size=max_buckets)
+        self.throttled_count = 0
         super(ThrottlingMiddleware, self).__init__()
 
-    async def on_process_message(self, message: types.Message, data: dict):
-        handler = current_handler.get()
-        dispatcher = Dispatcher.get_current()
+    def __len__(self):
+        return len(self._buckets)
+
+    def _handler_limit(self):
+        handler = current_handler.get(None)
+        limit, burst, key = self.rate_limit, self.burst, "default"
         if handler:
-            limit = getattr(handler, "throttling_rate_limit", self.rate_limit)
-            key = getattr(handler, "throttling_key", f"{self.prefix}_{handler.__name__}")
-        else:
-            limit = self.rate_limit
-            key = f"{self.prefix}_message"
-        try:
-            await dispatcher.throttle(key, rate=limit)
-        except Throttled as t:
-            await self.message_throttled(message, t)
-            raise CancelHandler()
-
-    async def message_throttled(self, message: types.Message, throttled: Throttled):
-        if throttled.exceeded_count <= 2:
-            await message.reply("Too many requests!")
+            key = getattr(handler, "throttling_key", handler.__name__)
+            if hasattr(handler, "throttling_rate_limit"):
+                limit = handler.throttling_rate_limit
+                burst = getattr(handler, "throttling_burst", 1)
+        return limit, burst, key
+
+    def hit(self, user_id: int) -> Optional[UserBucket]:
+        """So'rovni hisobga olish; limitdan oshgan bo'lsa chelak, aks holda None qaytariladi"""
+        limit, burst, handler_key = self._handler_limit()
+        if not limit:
+            return None
+
+        now = time.monotonic()
+        bucket = self._buckets.get((user_id, handler_key), lambda: UserBucket(1 / limit, burst), now)
+        if bucket.consume(now=now):
+            self.throttled_count += 1
+            return bucket
+
+        bucket.warned = False
+        return None
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        bucket = self.hit(message.from_user.id)
+        if bucket is None:
+            return
+
+        # Ketma-ket cheklangan xabarlarga faqat bir marta javob beriladi
+        if not bucket.warned:
+            bucket.warned = True
+            await message.reply("⏳ Juda ko'p so'rov! Iltimos, biroz kuting.")
+        raise CancelHandler()
+
+    async def on_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        bucket = self.hit(callback_query.from_user.id)
+        if bucket is None:
+            return
+
+        # Tugmadagi soat belgisi yo'qolishi uchun callback'ga har doim javob beriladi (bazaga murojaatsiz)
+        await callback_query.answer("⏳ Juda tez! Biroz kuting.")
+        raise CancelHandler()
@@ -0,0 +1,39 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+# data.config import paytida o'qiladi, shuning uchun sozlamalar modullardan oldin beriladi.
+# Testlar vaqtinchalik bazada ishlaydi (bot_database.db ga tegilmaydi)
+TEST_DIR = tempfile.mkdtemp(prefix='library_bot_tests_')
+os.environ.update({
+    'BOT_TOKEN': '123456:TEST-token',
+    'ADMINS': '1',
+    'ip': 'localhost',
+    'DB_NAME': os.path.join(TEST_DIR, 'test.db'),
+})
+
+
+@pytest.fixture(scope='session')
+def migrated():
+    """Bo'sh test bazasiga barcha migratsiyalarni qo'llash"""
+    from utils.db_api.migrations import migrate
+    return migrate()
+
+
+@pytest.fixture
+def db(migrated):
+    """Har bir test uchun jurnallar va foydalanuvchilarsiz toza baza"""
+    from utils.db_api.pool import db_pool
+    with db_pool.transaction('tests_cleanup') as conn:
+        conn.execute('DELETE FROM jurnallar')
+        conn.execute('DELETE FROM users')
+        conn.execute('DELETE FROM fsm_storage')
+    return db_pool
+
+
+def pytest_sessionfinish(session, exitstatus):
+    from utils.db_api.pool import db_pool
+    db_pool.close()
+    shutil.rmtree(TEST_DIR, ignore_errors=True)
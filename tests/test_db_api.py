@@ -0,0 +1,128 @@
+import sqlite3
+
+from data import config
+from utils.db_api.catalog import Catalog
+from utils.db_api.jurnallar import (add_jurnal, build_fts_query, get_catalog_version, normalize_search_text,
+                                    search_jurnallar)
+from utils.db_api.migrations import MIGRATIONS, _enable_incremental_vacuum, get_schema_version, migrate
+from utils.db_api.pool import sql_label
+from utils.db_api.users import USER_COLUMNS, flush_user_activity, get_users_chunk, iter_users
+from utils.misc.metrics import metrics
+
+
+def test_migrations_reach_latest_version(migrated):
+    assert migrated == MIGRATIONS[-1][0]
+    assert get_schema_version() == migrated
+
+
+def test_migrations_are_idempotent(db):
+    assert migrate() == MIGRATIONS[-1][0]
+
+
+def test_missing_fts_index_is_recreated(db):
+    # FTS5 bo'lmagan SQLite'da migratsiya 4 jadvalsiz bajarilgan baza
+    with db.transaction('drop_fts') as conn:
+        conn.execute('DROP TABLE jurnallar_fts')
+        for event in ('insert', 'delete', 'update'):
+            conn.execute(f'DROP TRIGGER jurnallar_fts_{event}')
+    jurnal_id = add_jurnal(1, 1, "Kimyo jurnali")
+
+    migrate()
+    assert db.fetchone("SELECT 1 FROM sqlite_master WHERE name = 'jurnallar_fts'")
+    assert [j['id'] for j in search_jurnallar("kimyo")] == [jurnal_id]
+    assert add_jurnal(1, 1, "Kimyo xabarlari") in [j['id'] for j in search_jurnallar("kimyo")]
+
+
+def test_migration_versions_are_unique():
+    versions = [m[0] for m in MIGRATIONS]
+    assert versions == sorted(set(versions))
+
+
+def test_vacuum_migration_respects_size_limit(tmp_path, monkeypatch):
+    conn = sqlite3.connect(tmp_path / 'vacuum.db', isolation_level=None)
+    conn.execute('PRAGMA auto_vacuum = NONE')
+    conn.execute('CREATE TABLE t (x)')
+
+    monkeypatch.setattr(config, 'DB_VACUUM_MIGRATION_MAX_MB', 0)
+    _enable_incremental_vacuum(conn)
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 0
+
+    monkeypatch.setattr(config, 'DB_VACUUM_MIGRATION_MAX_MB', 10)
+    _enable_incremental_vacuum(conn)
+    assert conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2
+    conn.close()
+
+
+def test_normalize_search_text():
+    assert normalize_search_text("Oʻzbekiston O'ZBEK tili") == "ozbekiston ozbek tili"
+    assert build_fts_query("fan, ta'lim!") == '"fan"* "talim"*'
+    assert build_fts_query("  ,.  ") == ''
+
+
+def test_search_jurnallar(db):
+    first = add_jurnal(1, 1, "Oʻzbekiston tibbiyot jurnali")
+    second = add_jurnal(2, 1, "Tibbiyot va ta'lim")
+    add_jurnal(1, 2, "Fizika xabarlari")
+
+    # Apostrof varianti va prefiks bo'yicha qidiruv
+    assert [j['id'] for j in search_jurnallar("o'zbek")] == [first]
+    assert {j['id'] for j in search_jurnallar("tibb")} == {first, second}
+    assert [j['id'] for j in search_jurnallar("tibb", fan_id=2)] == [second]
+    assert search_jurnallar("kimyo") == []
+    assert search_jurnallar("!!") == []
+
+    # Pagination
+    assert len(search_jurnallar("tibb", limit=1)) == 1
+    assert len(search_jurnallar("tibb", limit=1, offset=1)) == 1
+
+
+def _add_users(count):
+    # Bir xil last_active qiymatlari - (last_active, id) kaliti tengliklarni ham to'g'ri o'tishi kerak
+    profiles = [(i, f"User {i}", None, f"2024-01-{i % 3 + 1:02d} 00:00:00") for i in range(1, count + 1)]
+    flush_user_activity(profiles, [])
+
+
+def test_keyset_pagination_matches_full_query(db):
+    _add_users(25)
+
+    expected = db.fetchall(f'SELECT {USER_COLUMNS} FROM users ORDER BY last_active DESC, id DESC')
+    assert [tuple(row) for row in iter_users(chunk_size=4)] == [tuple(row) for row in expected]
+    assert [row.id for row in iter_users(chunk_size=7, order='id')] == list(range(1, 26))
+
+
+def test_keyset_pagination_active_only(db):
+    _add_users(10)
+    db.execute('UPDATE users SET is_active = 0 WHERE id % 2 = 0')
+
+    assert [row.id for row in iter_users(chunk_size=3, order='id', active_only=True)] == [1, 3, 5, 7, 9]
+    assert get_users_chunk(after=(9,), order='id', active_only=True) == []
+
+
+def test_sql_label():
+    assert sql_label("SELECT j.id FROM jurnallar j JOIN fanlar f ON f.id = j.fan_id") == 'SELECT jurnallar'
+    assert sql_label("INSERT OR IGNORE INTO fanlar (nomi) VALUES (?)") == 'INSERT fanlar'
+    assert sql_label("\n  UPDATE users SET is_active = 0") == 'UPDATE users'
+    assert sql_label("PRAGMA user_version = 8") == 'PRAGMA user_version'
+
+
+def test_db_queries_are_labelled(db):
+    db.fetchone('SELECT COUNT(*) FROM users')
+    assert (('sql', 'SELECT users'),) in metrics.get_histograms('db_query_ms')
+
+
+def test_catalog_follows_version_from_other_connections(db):
+    catalog = Catalog()
+    catalog.refresh()
+    assert catalog.check() is False
+    assert catalog.get_count(1, 1) == 0
+
+    # Boshqa bot nusxasidagi o'zgarish - shu jarayon refresh() chaqirmaydi
+    other = sqlite3.connect(config.DB_NAME)
+    other.execute("INSERT INTO jurnallar (fan_id, bolim_id, nomi) VALUES (1, 1, 'Boshqa nusxa')")
+    other.commit()
+    other.close()
+
+    assert get_catalog_version() > catalog.version
+    assert catalog.check() is True
+    assert catalog.version == get_catalog_version()
+    assert catalog.get_count(1, 1) == 1
@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+from aiogram.dispatcher.handler import current_handler
+from aiogram.utils.exceptions import RetryAfter
+
+from middlewares.throttling import ThrottlingMiddleware
+from utils.misc.broadcast import FAILED, SENT, Broadcaster
+from utils.misc.cache import LRUCache
+from utils.misc.metrics import Histogram, MetricsRegistry
+from utils.misc.throttling import rate_limit
+from utils.misc.token_bucket import BucketMap, TokenBucket
+
+
+def test_token_bucket_burst_and_refill():
+    bucket = TokenBucket(rate=2, capacity=3)
+    now = bucket.updated_at
+
+    assert [bucket.consume(now=now) for _ in range(3)] == [0, 0, 0]
+    assert bucket.consume(now=now) == 0.5
+    assert bucket.consume(now=now + 0.5) == 0
+    # Sig'imdan ortiq to'planmaydi
+    assert bucket.consume(now=now + 100) == 0
+    assert bucket.tokens == 2
+
+
+def test_token_bucket_pause():
+    bucket = TokenBucket(rate=10, capacity=10)
+    bucket.pause(5)
+    assert bucket.consume() > 4
+    assert bucket.tokens == 0
+
+
+def test_token_bucket_acquire_is_fifo():
+    bucket = TokenBucket(rate=100, capacity=1)
+    order = []
+
+    async def worker(n):
+        await bucket.acquire()
+        order.append(n)
+
+    async def main():
+        await asyncio.gather(*(worker(n) for n in range(5)))
+
+    asyncio.run(main())
+    assert order == [0, 1, 2, 3, 4]
+
+
+def test_bucket_map_evicts_idle_and_oldest():
+    buckets = BucketMap(idle_ttl=10, max_size=2)
+    now = time.monotonic()
+    buckets.get('a', lambda: TokenBucket(1), now)
+    buckets.get('b', lambda: TokenBucket(1), now)
+    buckets.get('a', lambda: TokenBucket(1), now)  # 'a' yana ishlatildi
+
+    buckets.get('c', lambda: TokenBucket(1), now)  # max_size - eng eskisi ('b') o'chadi
+    assert list(buckets) == ['a', 'c']
+
+    for key in list(buckets):
+        buckets.get(key, None).updated_at -= 60
+    buckets.get('d', lambda: TokenBucket(1))  # idle_ttl - qolganlari ham o'chadi
+    assert list(buckets) == ['d']
+
+
+def test_lru_cache_eviction_and_stats():
+    cache = LRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1
+    cache.set('c', 3)  # 'b' eng kam ishlatilgan
+
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+    assert cache.get_stats() == {'size': 2, 'maxsize': 2, 'hits': 2, 'misses': 1, 'hit_rate': 0.667}
+
+
+def test_lru_cache_ttl():
+    cache = LRUCache(maxsize=10, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get('a') == 1
+    assert cache.get('b', 'yoq') == 'yoq'
+    assert len(cache) == 1
+    assert cache.pop('a') == 1
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(1, 10, 100))
+    for value in (0.5, 5, 5, 50):
+        histogram.observe(value)
+
+    assert histogram.count == 4
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(1) == 50  # max dan oshmaydi
+    assert histogram.avg == 15.125
+
+
+def test_render_prometheus():
+    registry = MetricsRegistry()
+    registry.inc('updates_total', type='message')
+    registry.observe('handler_ms', 5, handler='say "hi"')
+    registry.add_collector(lambda: registry.set_gauge('queue', 3))
+
+    lines = registry.render_prometheus('bot_').splitlines()
+    assert '# TYPE bot_updates_total counter' in lines
+    assert 'bot_updates_total{type="message"} 1' in lines
+    assert 'bot_queue 3' in lines
+    assert 'bot_handler_ms_bucket{handler="say \\"hi\\"",le="5"} 1' in lines
+    assert 'bot_handler_ms_bucket{handler="say \\"hi\\"",le="+Inf"} 1' in lines
+    assert 'bot_handler_ms_count{handler="say \\"hi\\""} 1' in lines
+
+
+class FloodBot:
+    """copy_message birinchi failures marta RetryAfter qaytaradigan bot"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    async def copy_message(self, *args):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RetryAfter(0)
+
+
+def test_broadcast_send_retries_are_capped():
+    broadcaster = Broadcaster(max_retries=2)
+    broadcast = {'from_chat_id': 1, 'message_id': 2}
+
+    bot = FloodBot(failures=2)
+    assert asyncio.run(broadcaster._send(bot, 5, broadcast)) == SENT
+    assert bot.calls == 3
+
+    bot = FloodBot(failures=100)
+    assert asyncio.run(broadcaster._send(bot, 5, broadcast)) == FAILED
+    assert bot.calls == 3
+
+
+def test_throttling_burst_per_handler():
+    middleware = ThrottlingMiddleware(limit=0.5, burst=5)
+
+    async def default_handler():
+        pass
+
+    @rate_limit(3)
+    async def limited_handler():
+        pass
+
+    @rate_limit(3, burst=2)
+    async def burst_handler():
+        pass
+
+    def allowed(handler, calls=10):
+        token = current_handler.set(handler)
+        try:
+            return sum(middleware.hit(1) is None for _ in range(calls))
+        finally:
+            current_handler.reset(token)
+
+    # Global burst faqat standart limitdagi handlerlarga qo'llanadi
+    assert allowed(default_handler) == 5
+    assert allowed(limited_handler) == 1
+    assert allowed(burst_handler) == 2
@@ -0,0 +1,32 @@
+import asyncio
+
+from handlers.users.start import jurnallar_page_cache, parse_page_cursor, render_jurnallar_page
+from utils.db_api.catalog import catalog
+from utils.db_api.jurnallar import add_jurnal
+
+
+def test_parse_page_cursor():
+    assert parse_page_cursor(['bolim', '1', '1', '3', 'a16v5'], 4, 5) == (16, None)
+    assert parse_page_cursor(['bolim', '1', '1', '2', 'b9v5'], 4, 5) == (None, 9)
+    # Boshqa katalog versiyasi, versiyasiz eski kursor va kursorsiz callback - OFFSET
+    assert parse_page_cursor(['bolim', '1', '1', '3', 'a16v4'], 4, 5) == (None, None)
+    assert parse_page_cursor(['bolim', '1', '1', '3', 'a16'], 4, 5) == (None, None)
+    assert parse_page_cursor(['bolim', '1', '1', '3'], 4, 5) == (None, None)
+
+
+def test_page_cache_is_keyed_by_cursor(db):
+    ids = [add_jurnal(1, 1, f"J{i:02d}") for i in range(1, 31)]
+    catalog.refresh()
+    jurnallar_page_cache.clear()
+
+    async def scenario():
+        plain = await render_jurnallar_page(1, 1, 3)
+        # Sahifa boshiga mos kelmaydigan kursor (masalan, o'zgarishdan oldingi xabardan)
+        shifted = await render_jurnallar_page(1, 1, 3, after_id=ids[9])
+        again = await render_jurnallar_page(1, 1, 3)
+        return plain, shifted, again
+
+    plain, shifted, again = asyncio.run(scenario())
+    assert 'jurnal_{}"'.format(ids[16]) in plain[1]
+    assert shifted != plain
+    assert again == plain
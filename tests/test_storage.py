@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+import pytest
+
+from data import config
+from utils.db_api.fsm_storage import SQLiteStorage
+from utils.db_api.pool import db_pool
+
+CHAT, USER = 1001, 2002
+
+
+def make_redis_storage(server):
+    """fakeredis serveriga ulangan RedisStorage2 (bitta server - bitta Redis, nusxalar umumiy)"""
+    from aiogram.contrib.fsm_storage.redis import RedisStorage2
+    from fakeredis.aioredis import FakeAsyncRedisConnection
+    from redis.asyncio import ConnectionPool
+
+    pool = ConnectionPool(connection_class=FakeAsyncRedisConnection, server=server, decode_responses=True)
+    return RedisStorage2(prefix='fsm_test', connection_pool=pool)
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def make_storage(request, db):
+    """Storage yaratuvchi funksiya (Redis - lokal server o'rniga fakeredis)"""
+    if request.param == 'sqlite':
+        return lambda: SQLiteStorage(db_pool, state_ttl=3600)
+
+    fakeredis = pytest.importorskip('fakeredis')
+    server = fakeredis.FakeServer()
+    return lambda: make_redis_storage(server)
+
+
+def run_with_storage(make_storage, scenario):
+    async def runner():
+        storage = make_storage()
+        try:
+            await storage.reset_state(chat=CHAT, user=USER)
+            await storage.reset_bucket(chat=CHAT, user=USER)
+            await scenario(storage)
+        finally:
+            await storage.reset_state(chat=CHAT, user=USER)
+            await storage.reset_bucket(chat=CHAT, user=USER)
+            await storage.close()
+            await storage.wait_closed()
+
+    asyncio.run(runner())
+
+
+def test_state_and_data(make_storage):
+    async def scenario(storage):
+        assert await storage.get_state(chat=CHAT, user=USER) is None
+        assert await storage.get_data(chat=CHAT, user=USER) == {}
+
+        await storage.set_state(chat=CHAT, user=USER, state='Search:waiting')
+        await storage.update_data(chat=CHAT, user=USER, data={'a': 1})
+        await storage.update_data(chat=CHAT, user=USER, b='ikki')
+
+        assert await storage.get_state(chat=CHAT, user=USER) == 'Search:waiting'
+        assert await storage.get_data(chat=CHAT, user=USER) == {'a': 1, 'b': 'ikki'}
+
+        await storage.reset_state(chat=CHAT, user=USER, with_data=False)
+        assert await storage.get_state(chat=CHAT, user=USER) is None
+        assert await storage.get_data(chat=CHAT, user=USER) == {'a': 1, 'b': 'ikki'}
+
+        await storage.finish(chat=CHAT, user=USER)
+        assert await storage.get_data(chat=CHAT, user=USER) == {}
+
+    run_with_storage(make_storage, scenario)
+
+
+def test_bucket(make_storage):
+    async def scenario(storage):
+        await storage.set_bucket(chat=CHAT, user=USER, bucket={'x': 1})
+        await storage.update_bucket(chat=CHAT, user=USER, y=2)
+        assert await storage.get_bucket(chat=CHAT, user=USER) == {'x': 1, 'y': 2}
+
+    run_with_storage(make_storage, scenario)
+
+
+def test_state_survives_new_instance(make_storage):
+    async def scenario(storage):
+        await storage.set_state(chat=CHAT, user=USER, state='Admin:name')
+        other = make_storage()
+        try:
+            assert await other.get_state(chat=CHAT, user=USER) == 'Admin:name'
+        finally:
+            await other.close()
+            await other.wait_closed()
+
+    run_with_storage(make_storage, scenario)
+
+
+def test_sqlite_empty_record_is_deleted(db):
+    storage = SQLiteStorage(db_pool)
+
+    async def scenario():
+        await storage.set_state(chat=CHAT, user=USER, state='S:1')
+        await storage.reset_state(chat=CHAT, user=USER)
+
+    asyncio.run(scenario())
+    assert db_pool.fetchone('SELECT COUNT(*) FROM fsm_storage')[0] == 0
+
+
+def test_sqlite_expired_state_is_ignored_and_purged(db):
+    storage = SQLiteStorage(db_pool, state_ttl=60)
+    asyncio.run(storage.set_state(chat=CHAT, user=USER, state='S:1'))
+    db_pool.execute('UPDATE fsm_storage SET updated_at = ?', (time.time() - 120,))
+
+    assert asyncio.run(storage.get_state(chat=CHAT, user=USER)) is None
+    assert storage.purge_expired() == 1
+    assert db_pool.fetchone('SELECT COUNT(*) FROM fsm_storage')[0] == 0
+
+
+def test_create_storage(monkeypatch):
+    from aiogram.contrib.fsm_storage.memory import MemoryStorage
+    from loader import create_storage
+
+    monkeypatch.setattr(config, 'FSM_STORAGE', 'memory')
+    assert isinstance(create_storage(), MemoryStorage)
+
+    monkeypatch.setattr(config, 'FSM_STORAGE', 'sqlite')
+    assert isinstance(create_storage(), SQLiteStorage)
+
+    # Ulanish birinchi so'rovda ochiladi, shuning uchun server shart emas
+    from aiogram.contrib.fsm_storage.redis import RedisStorage2
+    monkeypatch.setattr(config, 'FSM_STORAGE', 'redis')
+    assert isinstance(create_storage(), RedisStorage2)
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from data import config
+from utils.db_api.pool import db_pool
+from utils.db_api.users import flush_user_activity
+
+
+def _utc_now() -> str:
+    """CURRENT_TIMESTAMP bilan bir xil formatdagi joriy vaqt"""
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ActivityBuffer:
+    """Foydalanuvchilar faolligini xotirada yig'ib, bazaga to'plab yozish"""
+
+    def __init__(self, flush_interval: int = 30, flush_size: int = 500):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+
+        # user_id -> last_active
+        self._activity: Dict[int, str] = {}
+        # user_id -> (full_name, username)
+        self._profiles: Dict[int, Tuple[str, Optional[str]]] = {}
+
+        self._task: Optional[asyncio.Task] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._activity)
+
+    def touch(self, user_id: int) -> None:
+        """Foydalanuvchi faolligini belgilash (bazaga keyinroq yoziladi)"""
+        self._activity[user_id] = _utc_now()
+        self._maybe_flush()
+
+    def register(self, user_id: int, full_name: str, username: str = None) -> None:
+        """Foydalanuvchini qo'shish yoki ma'lumotlarini yangilash (bazaga keyinroq yoziladi)"""
+        self._profiles[user_id] = (full_name, username)
+        self.touch(user_id)
+
+    def _maybe_flush(self) -> None:
+        if len(self._activity) < self.flush_size:
+            return
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self) -> int:
+        """Yig'ilgan yozuvlarni bitta tranzaksiyada bazaga yozish"""
+        async with self._lock:
+            if not self._activity:
+                return 0
+
+            activity, self._activity = self._activity, {}
+            profiles, self._profiles = self._profiles, {}
+
+            profile_rows = []
+            activity_rows = []
+            for user_id, last_active in activity.items():
+                if user_id in profiles:
+                    full_name, username = profiles[user_id]
+                    profile_rows.append((user_id, full_name, username, last_active))
+                else:
+                    activity_rows.append((last_active, user_id))
+
+            try:
+                written = await db_pool.run(flush_user_activity, profile_rows, activity_rows)
+            except Exception as e:
+                logging.error(f"Foydalanuvchilar faolligini yozishda xatolik: {str(e)}")
+                # Yozilmagan yozuvlarni qaytarish (yangiroqlari ustun)
+                for user_id, last_active in activity.items():
+                    self._activity.setdefault(user_id, last_active)
+                for user_id, profile in profiles.items():
+                    self._profiles.setdefault(user_id, profile)
+                return 0
+
+            logging.debug(f"Foydalanuvchilar faolligi yozildi: {written} ta "
+                          f"({len(profile_rows)} ta yangi/yangilangan)")
+            return written
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Davriy yozishni boshlash"""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Davriy yozishni to'xtatish va qolgan yozuvlarni bazaga yozish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        await self.flush()
+
+
+activity_buffer = ActivityBuffer(
+    flush_interval=config.ACTIVITY_FLUSH_INTERVAL,
+    flush_size=config.ACTIVITY_FLUSH_SIZE
+)
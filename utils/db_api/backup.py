@@ -0,0 +1,187 @@
+import asyncio
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from functools import partial
+from typing import Dict, Optional
+
+from data import config
+from utils.db_api.pool import connect, DB_NAME
+
+BACKUP_PREFIX = 'bot_database_'
+
+
+class _TooManyRestarts(Exception):
+    pass
+
+
+def _copy_database(target_path: str) -> Dict:
+    """Bazani target_path ga sqlite3 backup API bilan ko'chirish
+
+    Nusxa BACKUP_PAGES sahifadan bo'lib olinadi. Qadamlar orasida boshqa
+    ulanish bazaga yozsa, SQLite nusxani boshidan boshlaydi; bu
+    BACKUP_MAX_RESTARTS martadan oshsa, qolgani bitta qadamda (o'qish
+    tranzaksiyasi ichida, WAL'da yozuvlarni bloklamasdan) ko'chiriladi.
+    """
+    stats = {'steps': 0, 'restarts': 0}
+    last_remaining = None
+
+    def progress(status, remaining, total):
+        nonlocal last_remaining
+        stats['steps'] += 1
+        if last_remaining is not None and remaining > last_remaining:
+            stats['restarts'] += 1
+            logging.warning(f"Backup qayta boshlandi - baza o'zgardi "
+                            f"({stats['restarts']}/{config.BACKUP_MAX_RESTARTS})")
+            if stats['restarts'] >= config.BACKUP_MAX_RESTARTS:
+                raise _TooManyRestarts()
+        last_remaining = remaining
+        if remaining:
+            time.sleep(config.BACKUP_STEP_SLEEP)
+
+    source = connect(DB_NAME)
+    target = sqlite3.connect(target_path)
+    try:
+        try:
+            source.backup(target, pages=config.BACKUP_PAGES, progress=progress)
+        except _TooManyRestarts:
+            logging.warning("Baza tez-tez o'zgarmoqda - backup bitta qadamda olinadi")
+            source.backup(target)
+            stats['steps'] += 1
+        stats['pages'] = target.execute('PRAGMA page_count').fetchone()[0]
+    finally:
+        target.close()
+        source.close()
+    return stats
+
+
+def backup_database(backup_path: str = None, compress: bool = None) -> Dict:
+    """Ishlab turgan bazadan izchil nusxa olish (sinxron, ishchi oqimda chaqiring)
+
+    sqlite3 backup API nusxani BACKUP_PAGES sahifadan bo'lib ko'chiradi va
+    qadamlar orasida BACKUP_STEP_SLEEP soniya kutadi, shuning uchun bot
+    yozuvlari uzoq bloklanmaydi. Siqish nusxa tayyor bo'lgandan keyin
+    alohida o'tishda bajariladi (backup API faqat SQLite fayliga yoza oladi),
+    shuning uchun vaqtincha siqilmagan nusxa uchun ham diskda joy kerak.
+    Tugallanmagan fayllar .part nomi bilan yoziladi va xatolikda o'chiriladi.
+    """
+    if compress is None:
+        # Aniq yo'l berilsa, siqish fayl kengaytmasiga qarab aniqlanadi
+        compress = backup_path.endswith('.gz') if backup_path else config.BACKUP_COMPRESS
+    started = time.perf_counter()
+
+    if not backup_path:
+        os.makedirs(config.BACKUP_DIR, exist_ok=True)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        backup_path = os.path.join(config.BACKUP_DIR, f'{BACKUP_PREFIX}{timestamp}.db')
+
+    db_path = backup_path[:-3] if backup_path.endswith('.gz') else backup_path
+    backup_path = db_path + '.gz' if compress else db_path
+    copy_path = db_path + '.part'
+    gz_part_path = backup_path + '.part'
+
+    try:
+        stats = _copy_database(copy_path)
+
+        if compress:
+            # Tayyor nusxani bo'laklab siqish (ikkinchi o'tish) va siqilmagan nusxani o'chirish
+            with open(copy_path, 'rb') as src, gzip.open(gz_part_path, 'wb', compresslevel=6) as dst:
+                shutil.copyfileobj(src, dst, 1024 * 1024)
+            os.remove(copy_path)
+            os.replace(gz_part_path, backup_path)
+        else:
+            os.replace(copy_path, backup_path)
+    except Exception:
+        for path in (copy_path, gz_part_path):
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+    result = {
+        'path': backup_path,
+        'size': os.path.getsize(backup_path),
+        'pages': stats['pages'],
+        'steps': stats['steps'],
+        'restarts': stats['restarts'],
+        'elapsed': round(time.perf_counter() - started, 2)
+    }
+    logging.info(f"Database backup yaratildi: {backup_path} ({result['size'] / 1024:.1f} KB, "
+                 f"{result['pages']} sahifa, {result['steps']} qadam, {result['restarts']} qayta boshlash, "
+                 f"{result['elapsed']} s)")
+
+    rotate_backups()
+    return result
+
+
+def rotate_backups(keep: int = None) -> int:
+    """Eng yangi keep ta nusxadan tashqari eski nusxalarni o'chirish"""
+    keep = config.BACKUP_KEEP if keep is None else keep
+    if keep <= 0 or not os.path.isdir(config.BACKUP_DIR):
+        return 0
+
+    backups = sorted(
+        (name for name in os.listdir(config.BACKUP_DIR)
+         if name.startswith(BACKUP_PREFIX) and (name.endswith('.db') or name.endswith('.db.gz'))),
+        reverse=True
+    )
+
+    removed = 0
+    for name in backups[keep:]:
+        try:
+            os.remove(os.path.join(config.BACKUP_DIR, name))
+            removed += 1
+        except OSError as e:
+            logging.error(f"Eski backupni o'chirishda xatolik {name}: {str(e)}")
+
+    if removed:
+        logging.info(f"{removed} ta eski backup o'chirildi")
+    return removed
+
+
+class BackupJob:
+    """Backupni event loop'ni bloklamasdan bajarish va jadval bo'yicha ishga tushirish"""
+
+    def __init__(self, interval: int = 0):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self, compress: bool = None) -> Optional[Dict]:
+        """Backup olish (bir vaqtda faqat bittasi bajariladi)"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(None, partial(backup_database, compress=compress))
+            except Exception as e:
+                logging.error(f"Backup yaratishda xatolik: {str(e)}")
+                return None
+
+    async def _run_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run()
+
+    def start(self) -> None:
+        """Jadval bo'yicha backupni boshlash (interval 0 bo'lsa o'chirilgan)"""
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.ensure_future(self._run_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+backup_job = BackupJob(interval=config.BACKUP_INTERVAL)
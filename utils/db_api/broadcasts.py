@@ -0,0 +1,61 @@
+import logging
+from typing import Dict, List, Optional
+
+from utils.db_api.pool import db_pool
+
+BROADCAST_COLUMNS = ('id', 'admin_chat_id', 'status_message_id', 'from_chat_id', 'message_id', 'status',
+                     'last_user_id', 'total', 'sent', 'failed', 'blocked', 'elapsed')
+
+
+def _row_to_dict(row) -> Dict:
+    return dict(zip(BROADCAST_COLUMNS, row))
+
+
+def create_broadcast(admin_chat_id: int, from_chat_id: int, message_id: int, total: int) -> int:
+    """Yangi xabar tarqatishni yaratish va ID sini qaytarish"""
+    with db_pool.transaction('create_broadcast') as conn:
+        cursor = conn.execute('''
+            INSERT INTO broadcasts (admin_chat_id, from_chat_id, message_id, total)
+            VALUES (?, ?, ?, ?)
+        ''', (admin_chat_id, from_chat_id, message_id, total))
+        broadcast_id = cursor.lastrowid
+
+    logging.info(f"Xabar tarqatish #{broadcast_id} yaratildi ({total} ta foydalanuvchi)")
+    return broadcast_id
+
+
+def get_broadcast(broadcast_id: int) -> Optional[Dict]:
+    """Xabar tarqatish ma'lumotlarini olish"""
+    row = db_pool.fetchone(f'SELECT {", ".join(BROADCAST_COLUMNS)} FROM broadcasts WHERE id = ?',
+                           (broadcast_id,))
+    return _row_to_dict(row) if row else None
+
+
+def get_running_broadcasts() -> List[Dict]:
+    """Tugallanmagan (bot to'xtaganda uzilib qolgan) xabar tarqatishlar"""
+    rows = db_pool.fetchall(f'''
+        SELECT {", ".join(BROADCAST_COLUMNS)} FROM broadcasts WHERE status = 'running' ORDER BY id
+    ''')
+    return [_row_to_dict(row) for row in rows]
+
+
+def set_broadcast_status_message(broadcast_id: int, status_message_id: int) -> None:
+    """Jarayon ko'rsatiladigan admin xabarini saqlash"""
+    db_pool.execute('UPDATE broadcasts SET status_message_id = ? WHERE id = ?',
+                    (status_message_id, broadcast_id))
+
+
+def save_broadcast_progress(broadcast: Dict) -> None:
+    """Yuborish jarayonini saqlash (qayta ishga tushganda shu joydan davom etiladi)"""
+    db_pool.execute('''
+        UPDATE broadcasts SET last_user_id = ?, sent = ?, failed = ?, blocked = ?, elapsed = ?
+        WHERE id = ?
+    ''', (broadcast['last_user_id'], broadcast['sent'], broadcast['failed'], broadcast['blocked'],
+          broadcast['elapsed'], broadcast['id']))
+
+
+def finish_broadcast(broadcast_id: int, status: str = 'done') -> None:
+    """Xabar tarqatishni yakunlangan (done) yoki bekor qilingan (cancelled) deb belgilash"""
+    db_pool.execute('''
+        UPDATE broadcasts SET status = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?
+    ''', (status, broadcast_id))
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from data import config
+from utils.db_api.pool import db_pool
+from utils.db_api.jurnallar import get_fanlar, get_bolimlar, get_jurnallar_counts, get_catalog_version
+from utils.misc.metrics import timed
+
+
+class CatalogSnapshot:
+    """Fanlar, bo'limlar va jurnallar sonlarining o'zgarmas nusxasi"""
+
+    __slots__ = ('version', 'fanlar', 'bolimlar', 'fanlar_by_id', 'bolimlar_by_id', 'counts')
+
+    def __init__(self, version: int, fanlar: List[Dict], bolimlar: List[Dict],
+                 counts: Dict[int, Dict[int, int]] = None):
+        self.version = version
+        self.fanlar = fanlar
+        self.bolimlar = bolimlar
+        self.counts = counts or {}
+        self.fanlar_by_id = {fan['id']: fan for fan in fanlar}
+        self.bolimlar_by_id = {bolim['id']: bolim for bolim in bolimlar}
+
+
+class Catalog:
+    """Fanlar, bo'limlar va jurnallar sonlari uchun xotiradagi katalog
+
+    Navigatsiya handlerlari nomlar va sonlarni bazaga murojaat qilmasdan shu yerdan oladi.
+    Versiya bazadagi catalog_version qiymati (o'zgarishlarda triggerlar oshiradi): shu
+    nusxadagi admin o'zgarishlaridan keyin refresh() chaqiriladi, boshqa bot nusxalaridagi
+    o'zgarishlar esa har check_interval soniyada versiyani solishtirib aniqlanadi.
+    Katalog ishga tushishda db_pool.run(catalog.refresh) bilan yuklanadi.
+    """
+
+    def __init__(self, check_interval: float = 5):
+        self.check_interval = check_interval
+        self._snapshot = CatalogSnapshot(0, [], [])
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot.version > 0
+
+    @timed('catalog.refresh')
+    def refresh(self) -> int:
+        """Katalogni bazadan qayta yuklash (sinxron, db_pool.run orqali chaqiring)"""
+        with self._lock:
+            # Versiya ma'lumotlardan oldin o'qiladi: oraliqdagi o'zgarish keyingi tekshiruvda yana yuklanadi
+            version = get_catalog_version()
+            fanlar = get_fanlar()
+            bolimlar = get_bolimlar()
+            counts = get_jurnallar_counts()
+
+            self._snapshot = CatalogSnapshot(version, fanlar, bolimlar, counts)
+
+        logging.info(f"Katalog yangilandi: {len(fanlar)} ta fan, {len(bolimlar)} ta bo'lim, "
+                     f"{sum(sum(c.values()) for c in counts.values())} ta jurnal "
+                     f"(versiya {self._snapshot.version})")
+        return self._snapshot.version
+
+    def check(self) -> bool:
+        """Bazadagi versiya o'zgargan bo'lsa katalogni qayta yuklash (sinxron, db_pool.run orqali chaqiring)"""
+        if get_catalog_version() == self._snapshot.version:
+            return False
+        self.refresh()
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            try:
+                await db_pool.run(self.check)
+            except Exception as e:
+                logging.error(f"Katalog versiyasini tekshirishda xatolik: {str(e)}")
+
+    def start(self) -> None:
+        """Versiyani davriy tekshirishni boshlash"""
+        if self._task is None and self.check_interval > 0:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Davriy tekshirishni to'xtatish"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _current(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def get_fanlar(self) -> List[Dict]:
+        """Barcha fanlar (nomi bo'yicha tartiblangan)"""
+        return self._current().fanlar
+
+    def get_bolimlar(self) -> List[Dict]:
+        """Barcha bo'limlar (ID bo'yicha tartiblangan)"""
+        return self._current().bolimlar
+
+    def get_fan_by_id(self, fan_id: int) -> Optional[Dict]:
+        """ID bo'yicha fanni olish"""
+        return self._current().fanlar_by_id.get(fan_id)
+
+    def get_bolim_by_id(self, bolim_id: int) -> Optional[Dict]:
+        """ID bo'yicha bo'limni olish"""
+        return self._current().bolimlar_by_id.get(bolim_id)
+
+    def get_counts_by_fan(self, fan_id: int) -> Dict[int, int]:
+        """Fan bo'yicha har bir bo'limdagi jurnallar soni ({bolim_id: soni})"""
+        return self._current().counts.get(fan_id, {})
+
+    def get_count(self, fan_id: int, bolim_id: int) -> int:
+        """Fan va bo'lim kombinatsiyasidagi jurnallar soni"""
+        return self.get_counts_by_fan(fan_id).get(bolim_id, 0)
+
+
+catalog = Catalog(check_interval=config.CATALOG_CHECK_INTERVAL)
@@ -0,0 +1,88 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import datetime
+from functools import partial
+from typing import Dict, Optional
+
+from data import config
+from utils.db_api.jurnallar import JURNAL_EXPORT_COLUMNS, iter_jurnallar_export
+from utils.db_api.users import UserRow, iter_users
+
+# Eksport qilinadigan jadvallar: nomi -> (ustunlar, qatorlar iteratori)
+EXPORTS = {
+    'jurnallar': (JURNAL_EXPORT_COLUMNS, iter_jurnallar_export),
+    'users': (UserRow._fields, partial(iter_users, order='id')),
+}
+EXPORT_FORMATS = ('csv', 'jsonl')
+
+
+def export_table(name: str, fmt: str = 'csv', chunk_size: int = None) -> Dict:
+    """Jadvalni vaqtinchalik CSV/JSONL faylga yozish (sinxron, ishchi oqimda chaqiring)
+
+    Qatorlar bazadan chunk_size tadan o'qilib darhol faylga yoziladi, shuning
+    uchun xotirada bir vaqtda faqat bitta sahifa turadi. Faylni yuborib
+    bo'lgach uni o'chirish chaqiruvchining vazifasi.
+    """
+    if name not in EXPORTS:
+        raise ValueError(f"Noma'lum eksport: {name}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Noma'lum format: {fmt}")
+
+    chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+    columns, rows = EXPORTS[name]
+    started = time.perf_counter()
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    # Excel o'zbekcha harflarni to'g'ri ochishi uchun CSV BOM bilan yoziladi
+    encoding = 'utf-8-sig' if fmt == 'csv' else 'utf-8'
+    fd, path = tempfile.mkstemp(prefix=f'{name}_{timestamp}_', suffix=f'.{fmt}')
+    count = 0
+    try:
+        with open(fd, 'w', encoding=encoding, newline='') as f:
+            if fmt == 'csv':
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                for row in rows(chunk_size):
+                    writer.writerow(row)
+                    count += 1
+            else:
+                for row in rows(chunk_size):
+                    f.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False))
+                    f.write('\n')
+                    count += 1
+    except Exception:
+        os.remove(path)
+        raise
+
+    result = {
+        'path': path,
+        'filename': f'{name}_{timestamp}.{fmt}',
+        'rows': count,
+        'size': os.path.getsize(path),
+        'elapsed': round(time.perf_counter() - started, 2)
+    }
+    logging.info(f"Eksport {name}.{fmt}: {count} qator, {result['size'] / 1024:.1f} KB, {result['elapsed']} s")
+    return result
+
+
+_export_lock = asyncio.Lock()
+
+
+def export_running() -> bool:
+    return _export_lock.locked()
+
+
+async def run_export(name: str, fmt: str = 'csv') -> Optional[Dict]:
+    """Eksportni event loop'ni bloklamasdan bajarish (bir vaqtda faqat bittasi)"""
+    async with _export_lock:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, partial(export_table, name, fmt))
+        except Exception as e:
+            logging.error(f"Eksportda xatolik: {str(e)}")
+            return None
@@ -0,0 +1,186 @@
+import copy
+import json
+import logging
+import time
+import typing
+
+from aiogram.dispatcher.storage import BaseStorage
+
+from utils.db_api.pool import ConnectionPool
+
+
+class SQLiteStorage(BaseStorage):
+    """bot_database.db ichida saqlanadigan FSM storage
+
+    Holatlar bazada turgani uchun bot qayta ishga tushganda yo'qolmaydi va
+    bir nechta bot nusxasi bitta bazadan foydalanishi mumkin. state_ttl
+    soniyadan beri o'zgarmagan (tashlab ketilgan) holatlar muddati o'tgan
+    hisoblanadi va vaqti-vaqti bilan bazadan o'chiriladi.
+    Jadval migratsiyalar orqali yaratiladi.
+    """
+
+    def __init__(self, pool: ConnectionPool, state_ttl: typing.Optional[int] = None,
+                 purge_interval: int = 600):
+        self._pool = pool
+        self.state_ttl = state_ttl
+        self.purge_interval = purge_interval
+
+        self._last_purge = time.monotonic()
+
+    async def close(self):
+        pass
+
+    async def wait_closed(self):
+        pass
+
+    def _is_expired(self, updated_at: float) -> bool:
+        return bool(self.state_ttl) and updated_at < time.time() - self.state_ttl
+
+    def _load(self, chat: str, user: str) -> typing.Tuple[typing.Optional[str], typing.Dict, typing.Dict]:
+        """Manzil bo'yicha (state, data, bucket) ni olish (sinxron)"""
+        with self._pool.connection() as conn:
+            row = conn.execute('''
+                SELECT state, data, bucket, updated_at FROM fsm_storage WHERE chat = ? AND user = ?
+            ''', (chat, user)).fetchone()
+
+        if row is None or self._is_expired(row[3]):
+            return None, {}, {}
+        return row[0], json.loads(row[1]), json.loads(row[2])
+
+    def _save(self, chat: str, user: str, **changes) -> None:
+        """Manzil yozuvini o'zgartirish (sinxron, bir nechta nusxa uchun BEGIN IMMEDIATE bilan)
+
+        changes: state, data, bucket, merge_data, merge_bucket
+        """
+        with self._pool.transaction('fsm_storage_save') as conn:
+            conn.execute('BEGIN IMMEDIATE')
+
+            row = conn.execute('''
+                SELECT state, data, bucket, updated_at FROM fsm_storage WHERE chat = ? AND user = ?
+            ''', (chat, user)).fetchone()
+
+            if row is None or self._is_expired(row[3]):
+                state, data, bucket = None, {}, {}
+            else:
+                state, data, bucket = row[0], json.loads(row[1]), json.loads(row[2])
+
+            if 'state' in changes:
+                state = changes['state']
+            if 'data' in changes:
+                data = changes['data']
+            if 'bucket' in changes:
+                bucket = changes['bucket']
+            data.update(changes.get('merge_data', {}))
+            bucket.update(changes.get('merge_bucket', {}))
+
+            if state is None and not data and not bucket:
+                # Bo'sh yozuvlar saqlanmaydi
+                conn.execute('DELETE FROM fsm_storage WHERE chat = ? AND user = ?', (chat, user))
+            else:
+                conn.execute('''
+                    INSERT INTO fsm_storage (chat, user, state, data, bucket, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(chat, user) DO UPDATE SET
+                        state = excluded.state,
+                        data = excluded.data,
+                        bucket = excluded.bucket,
+                        updated_at = excluded.updated_at
+                ''', (chat, user, state, json.dumps(data, ensure_ascii=False),
+                      json.dumps(bucket, ensure_ascii=False), time.time()))
+
+        self._maybe_purge()
+
+    def _maybe_purge(self) -> None:
+        if not self.state_ttl or time.monotonic() - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = time.monotonic()
+        self.purge_expired()
+
+    def purge_expired(self) -> int:
+        """Muddati o'tgan holatlarni o'chirish (sinxron)"""
+        if not self.state_ttl:
+            return 0
+
+        try:
+            with self._pool.transaction('fsm_storage_purge') as conn:
+                cursor = conn.execute('DELETE FROM fsm_storage WHERE updated_at < ?',
+                                      (time.time() - self.state_ttl,))
+                purged = cursor.rowcount
+
+            if purged:
+                logging.info(f"FSM storage: {purged} ta eskirgan holat o'chirildi")
+            return purged
+        except Exception as e:
+            logging.error(f"FSM holatlarini tozalashda xatolik: {str(e)}")
+            return 0
+
+    def _address(self, chat, user) -> typing.Tuple[str, str]:
+        chat, user = self.check_address(chat=chat, user=user)
+        return str(chat), str(user)
+
+    async def get_state(self, *,
+                        chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        default: typing.Optional[str] = None) -> typing.Optional[str]:
+        state, _, _ = await self._pool.run(self._load, *self._address(chat, user))
+        return state if state is not None else self.resolve_state(default)
+
+    async def get_data(self, *,
+                       chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       default: typing.Optional[typing.Dict] = None) -> typing.Dict:
+        _, data, _ = await self._pool.run(self._load, *self._address(chat, user))
+        return data or copy.deepcopy(default or {})
+
+    async def set_state(self, *,
+                        chat: typing.Union[str, int, None] = None,
+                        user: typing.Union[str, int, None] = None,
+                        state: typing.Optional[typing.AnyStr] = None):
+        await self._pool.run(self._save, *self._address(chat, user), state=self.resolve_state(state))
+
+    async def set_data(self, *,
+                       chat: typing.Union[str, int, None] = None,
+                       user: typing.Union[str, int, None] = None,
+                       data: typing.Dict = None):
+        await self._pool.run(self._save, *self._address(chat, user), data=copy.deepcopy(data or {}))
+
+    async def update_data(self, *,
+                          chat: typing.Union[str, int, None] = None,
+                          user: typing.Union[str, int, None] = None,
+                          data: typing.Dict = None,
+                          **kwargs):
+        merge = dict(data or {}, **kwargs)
+        await self._pool.run(self._save, *self._address(chat, user), merge_data=merge)
+
+    async def reset_state(self, *,
+                          chat: typing.Union[str, int, None] = None,
+                          user: typing.Union[str, int, None] = None,
+                          with_data: typing.Optional[bool] = True):
+        changes = {'state': None}
+        if with_data:
+            changes['data'] = {}
+        await self._pool.run(self._save, *self._address(chat, user), **changes)
+
+    def has_bucket(self):
+        return True
+
+    async def get_bucket(self, *,
+                         chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         default: typing.Optional[dict] = None) -> typing.Dict:
+        _, _, bucket = await self._pool.run(self._load, *self._address(chat, user))
+        return bucket or copy.deepcopy(default or {})
+
+    async def set_bucket(self, *,
+                         chat: typing.Union[str, int, None] = None,
+                         user: typing.Union[str, int, None] = None,
+                         bucket: typing.Dict = None):
+        await self._pool.run(self._save, *self._address(chat, user), bucket=copy.deepcopy(bucket or {}))
+
+    async def update_bucket(self, *,
+                            chat: typing.Union[str, int, None] = None,
+                            user: typing.Union[str, int, None] = None,
+                            bucket: typing.Dict = None,
+                            **kwargs):
+        merge = dict(bucket or {}, **kwargs)
+        await self._pool.run(self._save, *self._address(chat, user), merge_bucket=merge)
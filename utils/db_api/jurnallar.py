@@ -1,123 +1,47 @@
+import re
 import sqlite3
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 import os
 
-DB_NAME = 'bot_database.db'
+from utils.db_api.pool import db_pool, DB_NAME
+from utils.misc.metrics import timed
+
+# O'zbekcha apostrof variantlari (o', oʻ, o’, o`) qidiruvda bir xil bo'lishi uchun olib tashlanadi
+APOSTROPHES = ("'", "ʻ", "ʼ", "’", "‘", "`")
+
+def normalize_search_text(text: str) -> str:
+    """Qidiruv matnini normallashtirish (apostroflarsiz, kichik harflarda)"""
+    for apostrophe in APOSTROPHES:
+        text = text.replace(apostrophe, '')
+    return text.lower()
+
+def _normalize_sql(column: str) -> str:
+    """normalize_search_text ning SQL ekvivalenti (triggerlar uchun)"""
+    expression = column
+    for apostrophe in APOSTROPHES:
+        escaped = apostrophe.replace("'", "''")
+        expression = f"replace({expression}, '{escaped}', '')"
+    return expression
+
+def build_fts_query(query: str) -> str:
+    """Foydalanuvchi so'rovidan FTS5 MATCH ifodasini yasash (har bir so'z prefiks bo'yicha)"""
+    tokens = re.findall(r'\w+', normalize_search_text(query))
+    return ' '.join(f'"{token}"*' for token in tokens)
 
 def init_journals_db():
-    """Jurnallar uchun ma'lumotlar bazasini yaratish va dastlabki ma'lumotlarni yuklash"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Jadvallarni yaratish
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS fanlar (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nomi TEXT UNIQUE NOT NULL
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS bolimlar (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nomi TEXT UNIQUE NOT NULL
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS jurnallar (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            fan_id INTEGER NOT NULL,
-            bolim_id INTEGER NOT NULL,
-            nomi TEXT NOT NULL,
-            rasmi TEXT,
-            nashr_chastotasi TEXT,
-            murojaat_link TEXT,
-            jurnal_sayti TEXT,
-            talablar_link TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (fan_id) REFERENCES fanlar (id),
-            FOREIGN KEY (bolim_id) REFERENCES bolimlar (id)
-        )
-    ''')
-
-    # Indekslarni qo'shish tezlik uchun
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jurnallar_fan_id ON jurnallar(fan_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jurnallar_bolim_id ON jurnallar(bolim_id)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jurnallar_nomi ON jurnallar(nomi)')
-
-    conn.commit()
-
-    # Dastlabki ma'lumotlarni yuklash
-    populate_initial_data(cursor, conn)
-
-    conn.close()
-    logging.info("Jurnallar bazasi muvaffaqiyatli yaratildi")
+    """Jurnallar uchun ma'lumotlar bazasini yaratish (migratsiyalar orqali)"""
+    from utils.db_api.migrations import migrate
 
-def populate_initial_data(cursor, conn):
-    """Dastlabki fanlar va bo'limlarni yuklash"""
-
-    # Fanlar ro'yxati
-    fanlar = [
-        "Fizika-matematika fanlari",
-        "Kimyo fanlari",
-        "Biologiya fanlari",
-        "Geologiya-mineralogiya fanlari",
-        "Texnika fanlari",
-        "Qishloq xo'jaligi fanlari",
-        "Tarix fanlari",
-        "Iqtisodiyot fanlari",
-        "Falsafa fanlari",
-        "Filologiya fanlari",
-        "Geografiya fanlari",
-        "Yuridik fanlar",
-        "Pedagogika fanlari",
-        "Tibbiyot fanlari",
-        "Farmatsevtika fanlari",
-        "Veterinariya fanlari",
-        "San'atshunoslik fanlari",
-        "Arxitektura",
-        "Psixologiya fanlari",
-        "Harbiy fanlar",
-        "Sotsiologiya fanlari",
-        "Siyosiy fanlar",
-        "Islomshunoslik fanlari"
-    ]
-
-    # Bo'limlar ro'yxati
-    bolimlar = [
-        "Milliy nashrlar",
-        "Mustaqil davlatlar hamdo'stligi mamlakatlari nashrlari",
-        "Evropa mamlakatlari nashrlari",
-        "Amerika mamlakatlari nashrlari"
-    ]
-
-    # Fanlarni qo'shish
-    for fan_nomi in fanlar:
-        cursor.execute('''
-            INSERT OR IGNORE INTO fanlar (nomi) VALUES (?)
-        ''', (fan_nomi,))
-
-    # Bo'limlarni qo'shish
-    for bolim_nomi in bolimlar:
-        cursor.execute('''
-            INSERT OR IGNORE INTO bolimlar (nomi) VALUES (?)
-        ''', (bolim_nomi,))
-
-    conn.commit()
+    migrate()
+    logging.info("Jurnallar bazasi muvaffaqiyatli yaratildi")
 
 # Fan operatsiyalari
+@timed()
 def get_fanlar() -> List[Dict]:
     """Barcha fanlarni olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT id, nomi FROM fanlar ORDER BY nomi')
-        results = cursor.fetchall()
-
-        conn.close()
+        results = db_pool.fetchall('SELECT id, nomi FROM fanlar ORDER BY nomi')
 
         fanlar = []
         for result in results:
@@ -131,16 +55,11 @@ def get_fanlar() -> List[Dict]:
         logging.error(f"Fanlarni olishda xatolik: {str(e)}")
         return []
 
+@timed()
 def get_fan_by_id(fan_id: int) -> Optional[Dict]:
     """ID bo'yicha fanni olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT id, nomi FROM fanlar WHERE id = ?', (fan_id,))
-        result = cursor.fetchone()
-
-        conn.close()
+        result = db_pool.fetchone('SELECT id, nomi FROM fanlar WHERE id = ?', (fan_id,))
 
         if result:
             return {
@@ -153,16 +72,11 @@ def get_fan_by_id(fan_id: int) -> Optional[Dict]:
         return None
 
 # Bo'lim operatsiyalari
+@timed()
 def get_bolimlar() -> List[Dict]:
     """Barcha bo'limlarni olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT id, nomi FROM bolimlar ORDER BY id')
-        results = cursor.fetchall()
-
-        conn.close()
+        results = db_pool.fetchall('SELECT id, nomi FROM bolimlar ORDER BY id')
 
         bolimlar = []
         for result in results:
@@ -176,16 +90,11 @@ def get_bolimlar() -> List[Dict]:
         logging.error(f"Bo'limlarni olishda xatolik: {str(e)}")
         return []
 
+@timed()
 def get_bolim_by_id(bolim_id: int) -> Optional[Dict]:
     """ID bo'yicha bo'limni olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT id, nomi FROM bolimlar WHERE id = ?', (bolim_id,))
-        result = cursor.fetchone()
-
-        conn.close()
+        result = db_pool.fetchone('SELECT id, nomi FROM bolimlar WHERE id = ?', (bolim_id,))
 
         if result:
             return {
@@ -198,25 +107,21 @@ def get_bolim_by_id(bolim_id: int) -> Optional[Dict]:
         return None
 
 # Jurnal operatsiyalari
+@timed()
 def get_jurnallar(fan_id: int, bolim_id: int, page: int = 1, per_page: int = 15) -> Tuple[List[Dict], int]:
     """Pagination bilan jurnallar ro'yxatini olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
         # Umumiy soni
-        cursor.execute('''
+        total_count = db_pool.fetchone('''
             SELECT COUNT(*) FROM jurnallar 
             WHERE fan_id = ? AND bolim_id = ?
-        ''', (fan_id, bolim_id))
-
-        total_count = cursor.fetchone()[0]
+        ''', (fan_id, bolim_id))[0]
 
         # Offset hisoblash
         offset = (page - 1) * per_page
 
         # Jurnallarni olish
-        cursor.execute('''
+        results = db_pool.fetchall('''
             SELECT j.id, j.nomi, j.rasmi, j.nashr_chastotasi,
                    j.murojaat_link, j.jurnal_sayti, j.talablar_link,
                    f.nomi as fan_nomi, b.nomi as bolim_nomi
@@ -224,13 +129,10 @@ def get_jurnallar(fan_id: int, bolim_id: int, page: int = 1, per_page: int = 15)
             JOIN fanlar f ON j.fan_id = f.id
             JOIN bolimlar b ON j.bolim_id = b.id
             WHERE j.fan_id = ? AND j.bolim_id = ?
-            ORDER BY j.nomi
+            ORDER BY j.nomi, j.id
             LIMIT ? OFFSET ?
         ''', (fan_id, bolim_id, per_page, offset))
 
-        results = cursor.fetchall()
-        conn.close()
-
         jurnallar = []
         for result in results:
             jurnallar.append({
@@ -250,13 +152,68 @@ def get_jurnallar(fan_id: int, bolim_id: int, page: int = 1, per_page: int = 15)
         logging.error(f"Jurnallarni olishda xatolik: {str(e)}")
         return [], 0
 
+@timed()
+def get_jurnallar_page(fan_id: int, bolim_id: int, page: int = 1, per_page: int = 15,
+                       after_id: int = None, before_id: int = None) -> List[Dict]:
+    """Ro'yxat sahifasi uchun jurnallar (id, nomi) - keyset sahifalash bilan
+
+    after_id - oldingi sahifaning oxirgi jurnali (keyingi sahifa uchun)
+    before_id - keyingi sahifaning birinchi jurnali (oldingi sahifa uchun)
+    Kursor jurnali topilmasa (masalan, o'chirilgan bo'lsa) OFFSET ishlatiladi.
+    Kursor page sahifasining boshiga mos kelishini chaqiruvchi tekshiradi (katalog
+    versiyasi o'zgargan bo'lsa kursor berilmaydi).
+    """
+    try:
+        cursor_id = after_id or before_id
+        cursor_row = None
+
+        if cursor_id:
+            cursor_row = db_pool.fetchone('''
+                SELECT nomi, id FROM jurnallar
+                WHERE id = ? AND fan_id = ? AND bolim_id = ?
+            ''', (cursor_id, fan_id, bolim_id))
+
+        if cursor_row and after_id:
+            results = db_pool.fetchall('''
+                SELECT id, nomi FROM jurnallar
+                WHERE fan_id = ? AND bolim_id = ? AND (nomi, id) > (?, ?)
+                ORDER BY nomi, id
+                LIMIT ?
+            ''', (fan_id, bolim_id, cursor_row[0], cursor_row[1], per_page))
+        elif cursor_row and before_id:
+            results = db_pool.fetchall('''
+                SELECT id, nomi FROM jurnallar
+                WHERE fan_id = ? AND bolim_id = ? AND (nomi, id) < (?, ?)
+                ORDER BY nomi DESC, id DESC
+                LIMIT ?
+            ''', (fan_id, bolim_id, cursor_row[0], cursor_row[1], per_page))
+            results.reverse()
+        else:
+            offset = (page - 1) * per_page
+            results = db_pool.fetchall('''
+                SELECT id, nomi FROM jurnallar
+                WHERE fan_id = ? AND bolim_id = ?
+                ORDER BY nomi, id
+                LIMIT ? OFFSET ?
+            ''', (fan_id, bolim_id, per_page, offset))
+
+        jurnallar = []
+        for result in results:
+            jurnallar.append({
+                'id': result[0],
+                'nomi': result[1]
+            })
+
+        return jurnallar
+    except Exception as e:
+        logging.error(f"Jurnallar sahifasini olishda xatolik: {str(e)}")
+        return []
+
+@timed()
 def get_jurnal_by_id(jurnal_id: int) -> Optional[Dict]:
     """ID bo'yicha jurnalni olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('''
+        result = db_pool.fetchone('''
             SELECT j.id, j.fan_id, j.bolim_id, j.nomi, j.rasmi, 
                    j.nashr_chastotasi, j.murojaat_link, j.jurnal_sayti, 
                    j.talablar_link, f.nomi as fan_nomi, b.nomi as bolim_nomi
@@ -266,9 +223,6 @@ def get_jurnal_by_id(jurnal_id: int) -> Optional[Dict]:
             WHERE j.id = ?
         ''', (jurnal_id,))
 
-        result = cursor.fetchone()
-        conn.close()
-
         if result:
             return {
                 'id': result[0],
@@ -288,13 +242,11 @@ def get_jurnal_by_id(jurnal_id: int) -> Optional[Dict]:
         logging.error(f"Jurnalni olishda xatolik: {str(e)}")
         return None
 
+@timed()
 def add_jurnal(fan_id: int, bolim_id: int, nomi: str, **kwargs) -> int:
     """Yangi jurnal qo'shish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('''
+        cursor = db_pool.execute('''
             INSERT INTO jurnallar (fan_id, bolim_id, nomi, rasmi, nashr_chastotasi,
                                   murojaat_link, jurnal_sayti, talablar_link)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
@@ -308,8 +260,6 @@ def add_jurnal(fan_id: int, bolim_id: int, nomi: str, **kwargs) -> int:
         ))
 
         jurnal_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
 
         logging.info(f"Yangi jurnal qo'shildi: {nomi} (ID: {jurnal_id})")
         return jurnal_id
@@ -317,12 +267,10 @@ def add_jurnal(fan_id: int, bolim_id: int, nomi: str, **kwargs) -> int:
         logging.error(f"Jurnal qo'shishda xatolik: {str(e)}")
         raise
 
+@timed()
 def update_jurnal(jurnal_id: int, **kwargs) -> bool:
     """Jurnalni yangilash"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
         # Dinamik UPDATE query yaratish
         updates = []
         values = []
@@ -335,17 +283,14 @@ def update_jurnal(jurnal_id: int, **kwargs) -> bool:
                 values.append(kwargs[field])
 
         if not updates:
-            conn.close()
             return False
 
         values.append(jurnal_id)
         query = f"UPDATE jurnallar SET {', '.join(updates)} WHERE id = ?"
 
-        cursor.execute(query, values)
-        conn.commit()
+        cursor = db_pool.execute(query, values)
 
         success = cursor.rowcount > 0
-        conn.close()
 
         if success:
             logging.info(f"Jurnal yangilandi: ID {jurnal_id}")
@@ -355,17 +300,13 @@ def update_jurnal(jurnal_id: int, **kwargs) -> bool:
         logging.error(f"Jurnal yangilashda xatolik: {str(e)}")
         return False
 
+@timed()
 def delete_jurnal(jurnal_id: int) -> bool:
     """Jurnalni o'chirish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('DELETE FROM jurnallar WHERE id = ?', (jurnal_id,))
-        conn.commit()
+        cursor = db_pool.execute('DELETE FROM jurnallar WHERE id = ?', (jurnal_id,))
 
         success = cursor.rowcount > 0
-        conn.close()
 
         if success:
             logging.info(f"Jurnal o'chirildi: ID {jurnal_id}")
@@ -375,37 +316,58 @@ def delete_jurnal(jurnal_id: int) -> bool:
         logging.error(f"Jurnal o'chirishda xatolik: {str(e)}")
         return False
 
-def search_jurnallar(query: str, fan_id: int = None, bolim_id: int = None) -> List[Dict]:
-    """Jurnallar ichida qidirish"""
+@timed()
+def search_jurnallar(query: str, fan_id: int = None, bolim_id: int = None,
+                     limit: int = None, offset: int = 0) -> List[Dict]:
+    """Jurnallar ichida qidirish (FTS5 indeksi bo'yicha, mosligi bo'yicha tartiblangan)"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
+        match_query = build_fts_query(query)
+        if not match_query:
+            return []
 
-        sql = '''
-            SELECT j.id, j.nomi, j.rasmi, j.nashr_chastotasi,
-                   j.murojaat_link, j.jurnal_sayti, j.talablar_link,
-                   f.nomi as fan_nomi, b.nomi as bolim_nomi
-            FROM jurnallar j
-            JOIN fanlar f ON j.fan_id = f.id
-            JOIN bolimlar b ON j.bolim_id = b.id
-            WHERE j.nomi LIKE ?
-        '''
-
-        params = [f'%{query}%']
+        filters = ''
+        params = [match_query]
 
         if fan_id:
-            sql += ' AND j.fan_id = ?'
+            filters += ' AND j.fan_id = ?'
             params.append(fan_id)
 
         if bolim_id:
-            sql += ' AND j.bolim_id = ?'
+            filters += ' AND j.bolim_id = ?'
             params.append(bolim_id)
 
-        sql += ' ORDER BY j.nomi'
+        params.extend([limit if limit else -1, offset])
 
-        cursor.execute(sql, params)
-        results = cursor.fetchall()
-        conn.close()
+        try:
+            results = db_pool.fetchall(f'''
+                SELECT j.id, j.nomi, j.rasmi, j.nashr_chastotasi,
+                       j.murojaat_link, j.jurnal_sayti, j.talablar_link,
+                       f.nomi as fan_nomi, b.nomi as bolim_nomi,
+                       j.fan_id, j.bolim_id
+                FROM jurnallar_fts
+                JOIN jurnallar j ON j.id = jurnallar_fts.rowid
+                JOIN fanlar f ON j.fan_id = f.id
+                JOIN bolimlar b ON j.bolim_id = b.id
+                WHERE jurnallar_fts MATCH ?{filters}
+                ORDER BY bm25(jurnallar_fts), j.nomi
+                LIMIT ? OFFSET ?
+            ''', params)
+        except sqlite3.OperationalError as e:
+            # FTS5 mavjud bo'lmasa oddiy LIKE qidiruviga qaytamiz
+            logging.warning(f"FTS qidiruv ishlamadi, LIKE ishlatiladi: {str(e)}")
+            params[0] = f'%{normalize_search_text(query)}%'
+            results = db_pool.fetchall(f'''
+                SELECT j.id, j.nomi, j.rasmi, j.nashr_chastotasi,
+                       j.murojaat_link, j.jurnal_sayti, j.talablar_link,
+                       f.nomi as fan_nomi, b.nomi as bolim_nomi,
+                       j.fan_id, j.bolim_id
+                FROM jurnallar j
+                JOIN fanlar f ON j.fan_id = f.id
+                JOIN bolimlar b ON j.bolim_id = b.id
+                WHERE {_normalize_sql('j.nomi')} LIKE ?{filters}
+                ORDER BY j.nomi
+                LIMIT ? OFFSET ?
+            ''', params)
 
         jurnallar = []
         for result in results:
@@ -418,7 +380,9 @@ def search_jurnallar(query: str, fan_id: int = None, bolim_id: int = None) -> Li
                 'jurnal_sayti': result[5],
                 'talablar_link': result[6],
                 'fan_nomi': result[7],
-                'bolim_nomi': result[8]
+                'bolim_nomi': result[8],
+                'fan_id': result[9],
+                'bolim_id': result[10]
             })
 
         return jurnallar
@@ -428,34 +392,28 @@ def search_jurnallar(query: str, fan_id: int = None, bolim_id: int = None) -> Li
 
 # Statistika funksiyalari
 # Statistika funksiyalari
+@timed()
 def get_statistics() -> Dict:
     """Umumiy statistikalar"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
         # Fanlar soni
-        cursor.execute('SELECT COUNT(*) FROM fanlar')
-        fanlar_count = cursor.fetchone()[0]
+        fanlar_count = db_pool.fetchone('SELECT COUNT(*) FROM fanlar')[0]
 
         # Bo'limlar soni
-        cursor.execute('SELECT COUNT(*) FROM bolimlar')
-        bolimlar_count = cursor.fetchone()[0]
+        bolimlar_count = db_pool.fetchone('SELECT COUNT(*) FROM bolimlar')[0]
 
         # Jurnallar soni
-        cursor.execute('SELECT COUNT(*) FROM jurnallar')
-        jurnallar_count = cursor.fetchone()[0]
+        jurnallar_count = db_pool.fetchone('SELECT COUNT(*) FROM jurnallar')[0]
 
         # Foydalanuvchilar soni (users jadvalini tekshirish)
         try:
-            cursor.execute('SELECT COUNT(*) FROM users')
-            users_count = cursor.fetchone()[0]
+            users_count = db_pool.fetchone('SELECT COUNT(*) FROM users')[0]
         except sqlite3.OperationalError:
             # Agar users jadvali mavjud bo'lmasa
             users_count = 0
 
         # Eng ko'p jurnali bo'lgan fan
-        cursor.execute('''
+        top_fan = db_pool.fetchone('''
             SELECT f.nomi, COUNT(*) as count
             FROM jurnallar j
             JOIN fanlar f ON j.fan_id = f.id
@@ -463,9 +421,6 @@ def get_statistics() -> Dict:
             ORDER BY count DESC
             LIMIT 1
         ''')
-        top_fan = cursor.fetchone()
-
-        conn.close()
 
         return {
             'fanlar_count': fanlar_count,
@@ -490,58 +445,67 @@ def get_statistics() -> Dict:
             }
         }
 
+@timed()
 def get_jurnallar_count_by_fan(fan_id: int) -> int:
     """Fan bo'yicha jurnallar sonini olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT COUNT(*) FROM jurnallar WHERE fan_id = ?', (fan_id,))
-        count = cursor.fetchone()[0]
+        count = db_pool.fetchone('SELECT COUNT(*) FROM jurnallar WHERE fan_id = ?', (fan_id,))[0]
 
-        conn.close()
         return count
     except Exception as e:
         logging.error(f"Fan bo'yicha jurnallar sonini olishda xatolik: {str(e)}")
         return 0
 
+@timed()
 def get_jurnallar_count_by_bolim(bolim_id: int) -> int:
     """Bo'lim bo'yicha jurnallar sonini olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
+        count = db_pool.fetchone('SELECT COUNT(*) FROM jurnallar WHERE bolim_id = ?', (bolim_id,))[0]
 
-        cursor.execute('SELECT COUNT(*) FROM jurnallar WHERE bolim_id = ?', (bolim_id,))
-        count = cursor.fetchone()[0]
-
-        conn.close()
         return count
     except Exception as e:
         logging.error(f"Bo'lim bo'yicha jurnallar sonini olishda xatolik: {str(e)}")
         return 0
 
+@timed()
 def get_jurnallar_count_by_fan_bolim(fan_id: int, bolim_id: int) -> int:
     """Fan va bo'lim kombinatsiyasi bo'yicha jurnallar sonini olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT COUNT(*) FROM jurnallar WHERE fan_id = ? AND bolim_id = ?', (fan_id, bolim_id))
-        count = cursor.fetchone()[0]
+        count = db_pool.fetchone('SELECT COUNT(*) FROM jurnallar WHERE fan_id = ? AND bolim_id = ?', (fan_id, bolim_id))[0]
 
-        conn.close()
         return count
     except Exception as e:
         logging.error(f"Fan va bo'lim bo'yicha jurnallar sonini olishda xatolik: {str(e)}")
         return 0
 
+@timed()
+def get_jurnallar_counts() -> Dict[int, Dict[int, int]]:
+    """Barcha fan va bo'limlar bo'yicha jurnallar soni bitta so'rovda ({fan_id: {bolim_id: soni}})"""
+    try:
+        results = db_pool.fetchall('''
+            SELECT fan_id, bolim_id, COUNT(*) FROM jurnallar
+            GROUP BY fan_id, bolim_id
+        ''')
+
+        counts = {}
+        for fan_id, bolim_id, count in results:
+            counts.setdefault(fan_id, {})[bolim_id] = count
+
+        return counts
+    except Exception as e:
+        logging.error(f"Jurnallar sonlarini olishda xatolik: {str(e)}")
+        return {}
+
+@timed()
+def get_catalog_version() -> int:
+    """Katalog versiyasi (fanlar, bo'limlar yoki jurnallar o'zgarganda triggerlar oshiradi)"""
+    return db_pool.fetchone('SELECT version FROM catalog_version WHERE id = 1')[0]
+
+@timed()
 def get_latest_jurnallar(limit: int = 10) -> List[Dict]:
     """Oxirgi qo'shilgan jurnallarni olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('''
+        results = db_pool.fetchall('''
             SELECT j.id, j.nomi, j.rasmi, j.nashr_chastotasi,
                    j.murojaat_link, j.jurnal_sayti, j.talablar_link,
                    f.nomi as fan_nomi, b.nomi as bolim_nomi, j.created_at
@@ -552,9 +516,6 @@ def get_latest_jurnallar(limit: int = 10) -> List[Dict]:
             LIMIT ?
         ''', (limit,))
 
-        results = cursor.fetchall()
-        conn.close()
-
         jurnallar = []
         for result in results:
             jurnallar.append({
@@ -575,13 +536,11 @@ def get_latest_jurnallar(limit: int = 10) -> List[Dict]:
         logging.error(f"Oxirgi jurnallarni olishda xatolik: {str(e)}")
         return []
 
+@timed()
 def get_all_jurnallar_admin() -> List[Dict]:
     """Barcha jurnallarni olish (admin uchun)"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('''
+        results = db_pool.fetchall('''
             SELECT j.id, j.nomi, j.rasmi, j.nashr_chastotasi,
                    j.murojaat_link, j.jurnal_sayti, j.talablar_link,
                    f.nomi as fan_nomi, b.nomi as bolim_nomi, j.created_at
@@ -591,9 +550,6 @@ def get_all_jurnallar_admin() -> List[Dict]:
             ORDER BY j.created_at DESC
         ''')
 
-        results = cursor.fetchall()
-        conn.close()
-
         jurnallar = []
         for result in results:
             jurnallar.append({
@@ -614,6 +570,31 @@ def get_all_jurnallar_admin() -> List[Dict]:
         logging.error(f"Barcha jurnallarni olishda xatolik: {str(e)}")
         return []
 
+# Eksport ustunlari (fan va bo'lim nomlari bilan)
+JURNAL_EXPORT_COLUMNS = ('id', 'fan_nomi', 'bolim_nomi', 'nomi', 'rasmi', 'nashr_chastotasi',
+                         'murojaat_link', 'jurnal_sayti', 'talablar_link', 'created_at')
+
+
+def iter_jurnallar_export(chunk_size: int = 500) -> Iterator[Tuple]:
+    """Barcha jurnallarni id bo'yicha sahifalab o'qish (JURNAL_EXPORT_COLUMNS tartibidagi tuple'lar)"""
+    last_id = 0
+    while True:
+        rows = db_pool.fetchall('''
+            SELECT j.id, f.nomi, b.nomi, j.nomi, j.rasmi, j.nashr_chastotasi,
+                   j.murojaat_link, j.jurnal_sayti, j.talablar_link, j.created_at
+            FROM jurnallar j
+            JOIN fanlar f ON j.fan_id = f.id
+            JOIN bolimlar b ON j.bolim_id = b.id
+            WHERE j.id > ?
+            ORDER BY j.id
+            LIMIT ?
+        ''', (last_id, chunk_size))
+
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        last_id = rows[-1][0]
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     init_journals_db()
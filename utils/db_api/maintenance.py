@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from data import config
+from utils.db_api.pool import db_pool
+
+
+def _pragma(conn, name: str):
+    return conn.execute(f'PRAGMA {name}').fetchone()[0]
+
+
+def run_maintenance(vacuum_pages: int = None) -> Dict:
+    """Bazaga xizmat ko'rsatish (sinxron, ishchi oqimda chaqiring)
+
+    To'liq VACUUM/ANALYZE o'rniga bazani uzoq bloklamaydigan amallar bajariladi:
+    PRAGMA optimize (kerakli jadvallar uchungina ANALYZE), incremental_vacuum
+    (bo'sh sahifalarni vacuum_pages tadan bo'lib qaytarish) va
+    wal_checkpoint(TRUNCATE) (WAL faylini qisqartirish).
+    """
+    vacuum_pages = config.MAINTENANCE_VACUUM_PAGES if vacuum_pages is None else vacuum_pages
+    result = {}
+
+    with db_pool.connection() as conn:
+        started = time.perf_counter()
+        conn.execute('PRAGMA optimize')
+        conn.commit()
+        result['optimize_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+        started = time.perf_counter()
+        freelist_before = _pragma(conn, 'freelist_count')
+        if _pragma(conn, 'auto_vacuum') == 2:
+            # Har bir bo'lak alohida qisqa tranzaksiyada - yozuvlar orasida navbat kutadi
+            while _pragma(conn, 'freelist_count') > 0:
+                before = _pragma(conn, 'freelist_count')
+                conn.execute(f'PRAGMA incremental_vacuum({vacuum_pages})').fetchall()
+                conn.commit()
+                if _pragma(conn, 'freelist_count') >= before:
+                    break
+        else:
+            logging.warning("auto_vacuum INCREMENTAL emas, incremental_vacuum o'tkazib yuborildi")
+        freelist_after = _pragma(conn, 'freelist_count')
+        result['vacuum_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        result['freed_pages'] = freelist_before - freelist_after
+        result['page_size'] = _pragma(conn, 'page_size')
+
+        started = time.perf_counter()
+        busy, wal_pages, checkpointed = conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchone()
+        result['checkpoint_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        result['checkpoint_busy'] = bool(busy)
+        result['checkpointed_pages'] = checkpointed
+
+        result['page_count'] = _pragma(conn, 'page_count')
+
+    logging.info(
+        f"Baza xizmati bajarildi: optimize {result['optimize_ms']} ms, "
+        f"incremental_vacuum {result['vacuum_ms']} ms ({result['freed_pages']} sahifa, "
+        f"{result['freed_pages'] * result['page_size'] / 1024:.1f} KB bo'shatildi), "
+        f"wal_checkpoint {result['checkpoint_ms']} ms ({result['checkpointed_pages']} sahifa"
+        f"{', band' if result['checkpoint_busy'] else ''})"
+    )
+    return result
+
+
+def seconds_until(hour: int, now: datetime = None) -> float:
+    """Keyingi hour:00 gacha qolgan soniyalar (mahalliy vaqt)"""
+    now = now or datetime.now()
+    target = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class MaintenanceJob:
+    """Baza xizmatini har kuni kam yuklamali soatda event loop'ni bloklamasdan bajarish"""
+
+    def __init__(self, hour: int = -1):
+        self.hour = hour
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    async def run(self) -> Optional[Dict]:
+        """Xizmatni bajarish (bir vaqtda faqat bittasi)"""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(None, run_maintenance)
+            except Exception as e:
+                logging.error(f"Baza xizmatida xatolik: {str(e)}")
+                return None
+
+    async def _run_daily(self) -> None:
+        while True:
+            await asyncio.sleep(seconds_until(self.hour))
+            await self.run()
+
+    def start(self) -> None:
+        """Jadvalni boshlash (hour 0..23 bo'lmasa o'chirilgan)"""
+        if 0 <= self.hour <= 23 and self._task is None:
+            self._task = asyncio.ensure_future(self._run_daily())
+            logging.info(f"Baza xizmati har kuni soat {self.hour:02d}:00 da bajariladi")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+maintenance_job = MaintenanceJob(hour=config.MAINTENANCE_HOUR)
@@ -0,0 +1,335 @@
+import logging
+import sqlite3
+import time
+from typing import Callable, List, Tuple
+
+from data import config
+from utils.db_api.pool import db_pool
+from utils.db_api.jurnallar import _normalize_sql
+
+# (versiya, nomi, funksiya, tranzaksiyada) - PRAGMA user_version bo'yicha tartib bilan bajariladi
+MIGRATIONS: List[Tuple[int, str, Callable, bool]] = []
+
+
+def migration(version: int, name: str, transactional: bool = True):
+    """Migratsiyani ro'yxatga olish dekoratori
+
+    transactional=False - tranzaksiya ichida bajarib bo'lmaydigan amallar uchun (masalan, VACUUM)
+    """
+
+    def decorator(func):
+        MIGRATIONS.append((version, name, func, transactional))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+
+    return decorator
+
+
+def get_schema_version() -> int:
+    """Bazaning joriy sxema versiyasi"""
+    return db_pool.fetchone('PRAGMA user_version')[0]
+
+
+def migrate() -> int:
+    """Bajarilmagan migratsiyalarni ketma-ket bajarish (sinxron)
+
+    Har bir migratsiya alohida tranzaksiyada bajariladi va muvaffaqiyatli
+    bo'lsa user_version oshiriladi (transactional=False migratsiyalar bundan mustasno). Bir nechta bot nusxasi bir vaqtda ishga
+    tushsa, BEGIN IMMEDIATE tufayli har bir migratsiya faqat bir marta bajariladi.
+    """
+    started_total = time.perf_counter()
+    applied = 0
+
+    with db_pool.connection() as conn:
+        for version, name, func, transactional in MIGRATIONS:
+            if transactional:
+                conn.execute('BEGIN IMMEDIATE')
+            current = conn.execute('PRAGMA user_version').fetchone()[0]
+            if current >= version:
+                if transactional:
+                    conn.rollback()
+                continue
+
+            started = time.perf_counter()
+            try:
+                func(conn)
+                conn.execute(f'PRAGMA user_version = {version}')
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                logging.error(f"Migratsiya {version:03d} ({name}) bajarilmadi: {str(e)}")
+                raise
+
+            applied += 1
+            logging.info(f"Migratsiya {version:03d} ({name}) bajarildi: "
+                         f"{(time.perf_counter() - started) * 1000:.1f} ms")
+
+        _ensure_journals_search(conn)
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+
+    if applied:
+        logging.info(f"{applied} ta migratsiya bajarildi, sxema versiyasi {version} "
+                     f"({(time.perf_counter() - started_total) * 1000:.1f} ms)")
+    else:
+        logging.info(f"Baza sxemasi yangi (versiya {version})")
+    return version
+
+
+def _ensure_journals_search(conn) -> None:
+    """FTS5 qidiruv indeksi yo'q bo'lsa yaratishga urinish (har ishga tushishda)
+
+    Migratsiya 4 FTS5 qo'llab-quvvatlanmagan SQLite'da jadvalsiz bajarilgan bo'lishi mumkin -
+    keyingi migratsiyalar versiyani oshirgani uchun u qayta bajarilmaydi.
+    """
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'jurnallar_fts'"
+    ).fetchone()
+    if exists:
+        return
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        created = _create_journals_search(conn)
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logging.error(f"FTS5 qidiruv indeksini yaratishda xatolik: {str(e)}")
+        return
+
+    if created:
+        logging.info("FTS5 qidiruv indeksi yaratildi")
+
+
+# Migratsiyalar. Mavjud bazalarda ham xavfsiz bajarilishi uchun IF NOT EXISTS ishlatiladi.
+
+@migration(1, "asosiy jadvallar")
+def _create_base_tables(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY,
+            full_name TEXT NOT NULL,
+            username TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fanlar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nomi TEXT UNIQUE NOT NULL
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS bolimlar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nomi TEXT UNIQUE NOT NULL
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS jurnallar (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fan_id INTEGER NOT NULL,
+            bolim_id INTEGER NOT NULL,
+            nomi TEXT NOT NULL,
+            rasmi TEXT,
+            nashr_chastotasi TEXT,
+            murojaat_link TEXT,
+            jurnal_sayti TEXT,
+            talablar_link TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (fan_id) REFERENCES fanlar (id),
+            FOREIGN KEY (bolim_id) REFERENCES bolimlar (id)
+        )
+    ''')
+
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jurnallar_bolim_id ON jurnallar(bolim_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_jurnallar_nomi ON jurnallar(nomi)')
+
+
+@migration(2, "dastlabki fanlar va bo'limlar")
+def _populate_initial_data(conn):
+    fanlar = [
+        "Fizika-matematika fanlari",
+        "Kimyo fanlari",
+        "Biologiya fanlari",
+        "Geologiya-mineralogiya fanlari",
+        "Texnika fanlari",
+        "Qishloq xo'jaligi fanlari",
+        "Tarix fanlari",
+        "Iqtisodiyot fanlari",
+        "Falsafa fanlari",
+        "Filologiya fanlari",
+        "Geografiya fanlari",
+        "Yuridik fanlar",
+        "Pedagogika fanlari",
+        "Tibbiyot fanlari",
+        "Farmatsevtika fanlari",
+        "Veterinariya fanlari",
+        "San'atshunoslik fanlari",
+        "Arxitektura",
+        "Psixologiya fanlari",
+        "Harbiy fanlar",
+        "Sotsiologiya fanlari",
+        "Siyosiy fanlar",
+        "Islomshunoslik fanlari"
+    ]
+
+    bolimlar = [
+        "Milliy nashrlar",
+        "Mustaqil davlatlar hamdo'stligi mamlakatlari nashrlari",
+        "Evropa mamlakatlari nashrlari",
+        "Amerika mamlakatlari nashrlari"
+    ]
+
+    conn.executemany('INSERT OR IGNORE INTO fanlar (nomi) VALUES (?)', [(nomi,) for nomi in fanlar])
+    conn.executemany('INSERT OR IGNORE INTO bolimlar (nomi) VALUES (?)', [(nomi,) for nomi in bolimlar])
+
+
+@migration(3, "fan + bo'lim + nom qoplovchi indeksi")
+def _create_fan_bolim_index(conn):
+    # Sahifalash, sonlarni hisoblash va keyset sahifalash shu indeksdan foydalanadi
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_jurnallar_fan_bolim_nomi
+        ON jurnallar(fan_id, bolim_id, nomi, id)
+    ''')
+    # fan_id indeksi qoplovchi indeksning prefiksi bo'lgani uchun ortiqcha
+    conn.execute('DROP INDEX IF EXISTS idx_jurnallar_fan_id')
+
+
+@migration(4, "jurnallar FTS5 qidiruv indeksi")
+def _create_journals_search(conn):
+    try:
+        conn.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS jurnallar_fts USING fts5(
+                nomi,
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        logging.warning(f"FTS5 qo'llab-quvvatlanmaydi, qidiruv LIKE orqali ishlaydi: {str(e)}")
+        return False
+
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS jurnallar_fts_insert AFTER INSERT ON jurnallar BEGIN
+            INSERT INTO jurnallar_fts (rowid, nomi) VALUES (new.id, {_normalize_sql('new.nomi')});
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS jurnallar_fts_delete AFTER DELETE ON jurnallar BEGIN
+            DELETE FROM jurnallar_fts WHERE rowid = old.id;
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS jurnallar_fts_update AFTER UPDATE OF nomi ON jurnallar BEGIN
+            UPDATE jurnallar_fts SET nomi = {_normalize_sql('new.nomi')} WHERE rowid = new.id;
+        END
+    ''')
+
+    # Indeksga tushmagan (triggerlardan oldin qo'shilgan) jurnallarni qo'shish
+    conn.execute(f'''
+        INSERT INTO jurnallar_fts (rowid, nomi)
+        SELECT id, {_normalize_sql('nomi')} FROM jurnallar
+        WHERE id NOT IN (SELECT rowid FROM jurnallar_fts)
+    ''')
+    return True
+
+
+@migration(5, "FSM storage jadvali")
+def _create_fsm_storage(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS fsm_storage (
+            chat TEXT NOT NULL,
+            user TEXT NOT NULL,
+            state TEXT,
+            data TEXT NOT NULL DEFAULT '{}',
+            bucket TEXT NOT NULL DEFAULT '{}',
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (chat, user)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated_at ON fsm_storage(updated_at)')
+
+
+@migration(6, "auto_vacuum = INCREMENTAL", transactional=False)
+def _enable_incremental_vacuum(conn):
+    # Mavjud bazada auto_vacuum rejimi faqat VACUUM dan keyin o'zgaradi (bir martalik).
+    # VACUUM butun bazani qayta yozadi va shu vaqt davomida uni bloklaydi, shuning uchun
+    # katta bazalarda o'tkazib yuboriladi va uni kam yuklamali vaqtda qo'lda bajarish kerak.
+    if conn.execute('PRAGMA auto_vacuum').fetchone()[0] == 2:
+        return
+
+    page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+    page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+    size_mb = page_count * page_size / 1024 / 1024
+    max_mb = config.DB_VACUUM_MIGRATION_MAX_MB
+    if size_mb > max_mb:
+        logging.warning(f"Baza hajmi {size_mb:.1f} MB (chegara {max_mb} MB) - auto_vacuum migratsiyasi o'tkazib "
+                        f"yuborildi. Botni to'xtatib qo'lda bajaring: PRAGMA auto_vacuum = INCREMENTAL; VACUUM;")
+        return
+
+    logging.info(f"VACUUM boshlandi ({size_mb:.1f} MB) - baza shu vaqtda bloklanadi")
+    started = time.perf_counter()
+    conn.execute('PRAGMA auto_vacuum = INCREMENTAL')
+    conn.execute('VACUUM')
+    logging.info(f"VACUUM tugadi: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+@migration(7, "users.is_active va broadcasts jadvali")
+def _create_broadcasts(conn):
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(users)')]
+    if 'is_active' not in columns:
+        # Botni bloklagan foydalanuvchilar 0 bilan belgilanadi va xabar yuborishda o'tkazib yuboriladi
+        conn.execute('ALTER TABLE users ADD COLUMN is_active INTEGER NOT NULL DEFAULT 1')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS broadcasts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            admin_chat_id INTEGER NOT NULL,
+            status_message_id INTEGER,
+            from_chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'running',
+            last_user_id INTEGER NOT NULL DEFAULT 0,
+            total INTEGER NOT NULL DEFAULT 0,
+            sent INTEGER NOT NULL DEFAULT 0,
+            failed INTEGER NOT NULL DEFAULT 0,
+            blocked INTEGER NOT NULL DEFAULT 0,
+            elapsed REAL NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+
+
+@migration(8, "users(last_active, id) indeksi")
+def _create_users_last_active_index(conn):
+    # Keyset sahifalash (last_active, id) juftligi bo'yicha ishlaydi, NULL qiymatlar uni buzadi
+    conn.execute('''
+        UPDATE users SET last_active = COALESCE(created_at, CURRENT_TIMESTAMP) WHERE last_active IS NULL
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_users_last_active ON users(last_active, id)')
+
+
+@migration(9, "katalog versiyasi")
+def _create_catalog_version(conn):
+    # Fanlar, bo'limlar yoki jurnallar o'zgarganda versiya triggerlar orqali oshadi -
+    # bir nechta bot nusxasi bo'lsa, har biri katalogni shu qiymat bo'yicha yangilaydi
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS catalog_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO catalog_version (id, version) VALUES (1, 1)')
+
+    for table in ('fanlar', 'bolimlar', 'jurnallar'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_catalog_{event.lower()} AFTER {event} ON {table} BEGIN
+                    UPDATE catalog_version SET version = version + 1 WHERE id = 1;
+                END
+            ''')
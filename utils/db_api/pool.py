@@ -0,0 +1,225 @@
+import asyncio
+import contextvars
+import logging
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from data import config
+from utils.misc.metrics import metrics, record_db_query
+
+DB_NAME = config.DB_NAME
+
+# So'rovdagi birinchi jadval nomi (metrikalar yorlig'i uchun)
+_SQL_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+(\w+)', re.IGNORECASE)
+
+# Har bir ulanishga qo'llaniladigan sozlamalar
+PRAGMAS = (
+    ('journal_mode', config.DB_JOURNAL_MODE),
+    ('synchronous', config.DB_SYNCHRONOUS),
+    ('cache_size', config.DB_CACHE_SIZE),
+    ('mmap_size', config.DB_MMAP_SIZE),
+    ('busy_timeout', config.DB_BUSY_TIMEOUT),
+)
+
+
+def connect(db_name: str = DB_NAME) -> sqlite3.Connection:
+    """Sozlangan sqlite3 ulanishini ochish (barcha ulanishlar shu yerdan ochiladi)"""
+    conn = sqlite3.connect(db_name, timeout=config.DB_BUSY_TIMEOUT / 1000, check_same_thread=False)
+
+    for name, value in PRAGMAS:
+        try:
+            conn.execute(f'PRAGMA {name} = {value}')
+        except sqlite3.DatabaseError as e:
+            logging.warning(f"PRAGMA {name} o'rnatilmadi: {str(e)}")
+
+    return conn
+
+
+@lru_cache(maxsize=1024)
+def sql_label(sql: str) -> str:
+    """Metrikalar uchun so'rov nomi: kalit so'z va jadval ("SELECT jurnallar", "PRAGMA user_version")
+
+    Parametrlar va ustunlar tashlab yuboriladi, shuning uchun yorliqlar soni cheklangan bo'ladi.
+    """
+    words = sql.split(None, 2)
+    if not words:
+        return '?'
+    keyword = words[0].upper()
+    if keyword == 'PRAGMA' and len(words) > 1:
+        return 'PRAGMA ' + re.split(r'[=(]', words[1])[0]
+    match = _SQL_TABLE.search(sql)
+    return f"{keyword} {match.group(1)}" if match else keyword
+
+
+class ConnectionPool:
+    """Uzoq yashovchi sqlite3 ulanishlari puli va so'rovlar uchun ishchi oqimlar"""
+
+    def __init__(self, db_name: str, size: int = 4, slow_query_ms: int = 100):
+        self.db_name = db_name
+        self.size = max(1, size)
+        self.slow_query_ms = slow_query_ms
+
+        self._connections = queue.LifoQueue(maxsize=self.size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # So'rovlar statistikasi
+        self._stats_lock = threading.Lock()
+        self.queries_count = 0
+        self.queries_time = 0.0
+        self.slow_queries_count = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Yangi ulanish ochish (faqat pul ichida ishlatiladi)"""
+        return connect(self.db_name)
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._connections.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        # Barcha ulanishlar band - bittasi bo'shashini kutamiz
+        return self._connections.get()
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        self._connections.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Puldan ulanish olish; xatolik bo'lsa tranzaksiya bekor qilinadi"""
+        conn = self._acquire()
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._release(conn)
+
+    def _record(self, sql: str, elapsed: float, label: str = None) -> None:
+        """So'rov vaqtini hisobga olish va sekin so'rovlarni logga yozish"""
+        elapsed_ms = elapsed * 1000
+        slow = elapsed_ms >= self.slow_query_ms
+
+        with self._stats_lock:
+            self.queries_count += 1
+            self.queries_time += elapsed
+            if slow:
+                self.slow_queries_count += 1
+        record_db_query(elapsed, label or sql_label(sql))
+
+        if slow:
+            logging.warning(f"Sekin so'rov ({elapsed_ms:.1f} ms): {' '.join(sql.split())[:200]}")
+
+    # So'rov yordamchilari
+    def fetchone(self, sql: str, params: Sequence = ()) -> Optional[Tuple]:
+        """Bitta qatorni olish"""
+        with self.connection() as conn:
+            started = time.perf_counter()
+            try:
+                return conn.execute(sql, params).fetchone()
+            finally:
+                self._record(sql, time.perf_counter() - started)
+
+    def fetchall(self, sql: str, params: Sequence = ()) -> List[Tuple]:
+        """Barcha qatorlarni olish"""
+        with self.connection() as conn:
+            started = time.perf_counter()
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                self._record(sql, time.perf_counter() - started)
+
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """O'zgartiruvchi so'rovni bajarish va commit qilish"""
+        with self.connection() as conn:
+            started = time.perf_counter()
+            try:
+                cursor = conn.execute(sql, params)
+                conn.commit()
+                return cursor
+            finally:
+                self._record(sql, time.perf_counter() - started)
+
+    @contextmanager
+    def transaction(self, name: str = 'transaction'):
+        """Bir nechta so'rovni bitta tranzaksiyada bajarish va commit qilish"""
+        with self.connection() as conn:
+            started = time.perf_counter()
+            try:
+                yield conn
+                conn.commit()
+            finally:
+                self._record(name, time.perf_counter() - started, label=name)
+
+    # Asinxron interfeys
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Sinxron db_api funksiyasini event loop'ni bloklamasdan ishchi oqimda bajarish"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix='db_pool')
+
+        # Kontekst (joriy update statistikasi) ishchi oqimga ham o'tkaziladi
+        context = contextvars.copy_context()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(context.run, func, *args, **kwargs))
+
+    def get_pragmas(self) -> Dict:
+        """Ulanishda amalda qo'llangan sozlamalar"""
+        with self.connection() as conn:
+            return {name: conn.execute(f'PRAGMA {name}').fetchone()[0] for name, _ in PRAGMAS}
+
+    def get_stats(self) -> Dict:
+        """Pul statistikasi"""
+        with self._stats_lock:
+            avg_ms = (self.queries_time / self.queries_count * 1000) if self.queries_count else 0.0
+            return {
+                'size': self.size,
+                'connections': self._created,
+                'queries_count': self.queries_count,
+                'avg_query_ms': round(avg_ms, 2),
+                'slow_queries_count': self.slow_queries_count
+            }
+
+    def collect_metrics(self) -> None:
+        """Pul holatini metrikalarga yozish (eksport paytida chaqiriladi)"""
+        with self._stats_lock:
+            metrics.set_gauge('db_pool_connections', self._created)
+            metrics.set_counter('db_slow_queries_total', self.slow_queries_count)
+
+    def close(self) -> None:
+        """Barcha ulanishlarni yopish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+        while True:
+            try:
+                conn = self._connections.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            self._created -= 1
+
+        logging.info("Ma'lumotlar bazasi ulanishlari yopildi")
+
+
+db_pool = ConnectionPool(DB_NAME, size=config.DB_POOL_SIZE, slow_query_ms=config.DB_SLOW_QUERY_MS)
+metrics.add_collector(db_pool.collect_metrics)
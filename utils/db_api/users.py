@@ -1,46 +1,28 @@
 import sqlite3
 import logging
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, NamedTuple, Optional, Tuple
 import os
 
-DB_NAME = 'bot_database.db'
+from utils.db_api.pool import db_pool, DB_NAME
 
 def init_users_db():
-    """Foydalanuvchilar uchun ma'lumotlar bazasini yaratish"""
-    conn = sqlite3.connect(DB_NAME)
-    cursor = conn.cursor()
-
-    # Users jadvalini yaratish
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS users (
-            id INTEGER PRIMARY KEY,
-            full_name TEXT NOT NULL,
-            username TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_active TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-
-    conn.commit()
-    conn.close()
+    """Foydalanuvchilar uchun ma'lumotlar bazasini yaratish (migratsiyalar orqali)"""
+    from utils.db_api.migrations import migrate
+
+    migrate()
     logging.info("Foydalanuvchilar bazasi muvaffaqiyatli yaratildi")
 
 # Foydalanuvchi operatsiyalari
 def add_user(user_id: int, full_name: str, username: str = None) -> None:
     """Yangi foydalanuvchi qo'shish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('''
+        db_pool.execute('''
             INSERT OR REPLACE INTO users (id, full_name, username, created_at, last_active)
             VALUES (?, ?, ?, 
                 COALESCE((SELECT created_at FROM users WHERE id = ?), CURRENT_TIMESTAMP),
                 CURRENT_TIMESTAMP)
         ''', (user_id, full_name, username, user_id))
 
-        conn.commit()
-        conn.close()
         logging.info(f"Foydalanuvchi qo'shildi/yangilandi: {full_name} (ID: {user_id})")
     except Exception as e:
         logging.error(f"Foydalanuvchi qo'shishda xatolik: {str(e)}")
@@ -49,13 +31,7 @@ def add_user(user_id: int, full_name: str, username: str = None) -> None:
 def get_user(user_id: int) -> Optional[Dict]:
     """Foydalanuvchi ma'lumotlarini olish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
-        result = cursor.fetchone()
-
-        conn.close()
+        result = db_pool.fetchone('SELECT * FROM users WHERE id = ?', (user_id,))
 
         if result:
             return {
@@ -73,52 +49,120 @@ def get_user(user_id: int) -> Optional[Dict]:
 def update_user_activity(user_id: int) -> None:
     """Foydalanuvchi faolligini yangilash"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('''
+        db_pool.execute('''
             UPDATE users SET last_active = CURRENT_TIMESTAMP WHERE id = ?
         ''', (user_id,))
-
-        conn.commit()
-        conn.close()
     except Exception as e:
         logging.error(f"Foydalanuvchi faolligini yangilashda xatolik: {str(e)}")
 
-def get_all_users() -> List[Dict]:
-    """Barcha foydalanuvchilarni olish"""
-    try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('SELECT * FROM users ORDER BY last_active DESC')
-        results = cursor.fetchall()
-
-        conn.close()
-
-        users = []
-        for result in results:
-            users.append({
-                'id': result[0],
-                'full_name': result[1],
-                'username': result[2],
-                'created_at': result[3],
-                'last_active': result[4]
-            })
-
-        return users
-    except Exception as e:
-        logging.error(f"Foydalanuvchilarni olishda xatolik: {str(e)}")
-        return []
+def flush_user_activity(profiles: List[Tuple], activity: List[Tuple]) -> int:
+    """Yig'ilgan foydalanuvchilar va faollik vaqtlarini bitta tranzaksiyada yozish
+
+    profiles - (id, full_name, username, last_active) qatorlari
+    activity - (last_active, id) qatorlari
+    """
+    with db_pool.transaction('flush_user_activity') as conn:
+        if profiles:
+            conn.executemany('''
+                INSERT INTO users (id, full_name, username, last_active)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    full_name = excluded.full_name,
+                    username = excluded.username,
+                    last_active = excluded.last_active,
+                    is_active = 1
+            ''', profiles)
+
+        if activity:
+            # Botdan yana foydalanayotgan foydalanuvchi bloklamagan hisoblanadi
+            conn.executemany('''
+                UPDATE users SET last_active = ?, is_active = 1 WHERE id = ?
+            ''', activity)
+
+    return len(profiles) + len(activity)
+
+class UserRow(NamedTuple):
+    """Foydalanuvchi qatori (dict o'rniga ixcham tuple)"""
+    id: int
+    full_name: str
+    username: Optional[str]
+    created_at: str
+    last_active: str
+    is_active: int
+
+
+USER_COLUMNS = ', '.join(UserRow._fields)
+
+# Keyset sahifalash tartiblari: (ORDER BY, keyingi sahifa sharti, kalit)
+USER_ORDERS = {
+    'last_active': ('last_active DESC, id DESC', '(last_active, id) < (?, ?)',
+                    lambda row: (row.last_active, row.id)),
+    'id': ('id', 'id > ?', lambda row: (row.id,)),
+}
+
+
+def get_users_chunk(after: Optional[Tuple] = None, limit: int = 1000, order: str = 'last_active',
+                    active_only: bool = False) -> List[UserRow]:
+    """Foydalanuvchilarning keyingi sahifasi (after - oldingi sahifa oxirgi qatorining kaliti)
+
+    OFFSET o'rniga oxirgi qator kaliti bo'yicha sahifalanadi, shuning uchun
+    har bir sahifa idx_users_last_active (yoki PRIMARY KEY) indeksidan olinadi.
+    """
+    order_by, after_condition, _ = USER_ORDERS[order]
+    conditions, params = [], []
+    if active_only:
+        conditions.append('is_active = 1')
+    if after is not None:
+        conditions.append(after_condition)
+        params.extend(after)
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+    rows = db_pool.fetchall(f'SELECT {USER_COLUMNS} FROM users {where} ORDER BY {order_by} LIMIT ?',
+                            (*params, limit))
+    return [UserRow._make(row) for row in rows]
+
+
+def iter_users(chunk_size: int = 1000, order: str = 'last_active', active_only: bool = False) -> Iterator[UserRow]:
+    """Foydalanuvchilarni sahifalab o'qish (xotirada bir vaqtda faqat bitta sahifa turadi)
+
+    Har bir sahifa alohida qisqa so'rov bilan olinadi, shuning uchun uzun
+    o'qish tranzaksiyasi WAL checkpoint'ni ushlab turmaydi. last_active
+    tartibida o'qish paytida faollashgan foydalanuvchi o'tkazib yuborilishi
+    mumkin - barcha foydalanuvchilar aniq bir martadan kerak bo'lsa order='id'.
+    """
+    key = USER_ORDERS[order][2]
+    after = None
+    while True:
+        rows = get_users_chunk(after, chunk_size, order, active_only)
+        yield from rows
+        if len(rows) < chunk_size:
+            return
+        after = key(rows[-1])
+
+
+def count_active_users() -> int:
+    """Botni bloklamagan foydalanuvchilar soni"""
+    return db_pool.fetchone('SELECT COUNT(*) FROM users WHERE is_active = 1')[0]
+
+def get_active_user_ids(after_id: int = 0, limit: int = 100) -> List[int]:
+    """after_id dan keyingi faol foydalanuvchilar ID lari (id bo'yicha keyset sahifalash)"""
+    rows = db_pool.fetchall('''
+        SELECT id FROM users WHERE is_active = 1 AND id > ? ORDER BY id LIMIT ?
+    ''', (after_id, limit))
+    return [row[0] for row in rows]
+
+def mark_users_inactive(user_ids: List[int]) -> None:
+    """Botni bloklagan yoki o'chirilgan foydalanuvchilarni nofaol deb belgilash"""
+    if not user_ids:
+        return
+    with db_pool.transaction('mark_users_inactive') as conn:
+        conn.executemany('UPDATE users SET is_active = 0 WHERE id = ?', [(user_id,) for user_id in user_ids])
 
 # Database ulanishini tekshirish (umumiy, lekin users uchun moslashtirilgan)
 def check_database_connection() -> bool:
     """Database ulanishini tekshirish"""
     try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-        cursor.execute('SELECT 1')
-        conn.close()
+        db_pool.fetchone('SELECT 1')
         return True
     except Exception as e:
         logging.error(f"Database ulanishida xatolik: {str(e)}")
@@ -128,15 +172,9 @@ def check_database_connection() -> bool:
 def create_backup(backup_path: str = None) -> bool:
     """Database backup yaratish"""
     try:
-        import shutil
-        from datetime import datetime
+        from utils.db_api.backup import backup_database
 
-        if not backup_path:
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_path = f'backup_bot_database_{timestamp}.db'
-
-        shutil.copy2(DB_NAME, backup_path)
-        logging.info(f"Database backup yaratildi: {backup_path}")
+        backup_database(backup_path)
         return True
     except Exception as e:
         logging.error(f"Backup yaratishda xatolik: {str(e)}")
@@ -144,18 +182,11 @@ def create_backup(backup_path: str = None) -> bool:
 
 # Database optimizatsiya qilish (umumiy)
 def optimize_database() -> bool:
-    """Database optimizatsiya qilish"""
-    try:
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        cursor.execute('VACUUM')
-        cursor.execute('ANALYZE')
+    """Database optimizatsiya qilish (bazani bloklaydigan VACUUM o'rniga maintenance orqali)"""
+    from utils.db_api.maintenance import run_maintenance
 
-        conn.commit()
-        conn.close()
-
-        logging.info("Database optimizatsiya qilindi")
+    try:
+        run_maintenance()
         return True
     except Exception as e:
         logging.error(f"Database optimizatsiyasida xatolik: {str(e)}")
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, ParseMode
+from aiogram.utils.exceptions import (RetryAfter, Unauthorized, ChatNotFound, MessageNotModified,
+                                      TelegramAPIError)
+
+from data import config
+from utils.db_api.pool import db_pool
+from utils.db_api.users import get_active_user_ids, mark_users_inactive
+from utils.db_api.broadcasts import get_running_broadcasts, save_broadcast_progress, finish_broadcast
+from utils.misc.rate_limiter import bulk_requests
+
+SENT, FAILED, BLOCKED = 'sent', 'failed', 'blocked'
+
+
+def format_duration(seconds: float) -> str:
+    """Soniyalarni H:MM:SS ko'rinishiga keltirish"""
+    return str(timedelta(seconds=int(seconds)))
+
+
+class Broadcaster:
+    """Barcha faol foydalanuvchilarga xabar tarqatish
+
+    Foydalanuvchi ID lari bazadan chunk_size tadan olinadi, xabarlar
+    bir vaqtda concurrency tagacha so'rov bilan yuboriladi. Tezlikni bot
+    so'rovlar navbati cheklaydi (bulk_requests - interaktiv javoblar uchun
+    zaxira qoldiriladi). RetryAfter kelsa ko'rsatilgan vaqt kutilib, ko'pi
+    bilan max_retries marta qayta yuboriladi, botni bloklaganlar nofaol deb
+    belgilanadi. Jarayon har chunk'dan keyin bazaga yoziladi,
+    shuning uchun bot qayta ishga tushganda tarqatish shu joydan davom etadi
+    (to'satdan to'xtasa, ko'pi bilan bitta chunk qayta yuborilishi mumkin).
+    """
+
+    def __init__(self, concurrency: int = 10, chunk_size: int = 100, report_interval: float = 3,
+                 max_retries: int = 3):
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.report_interval = report_interval
+        self.max_retries = max_retries
+
+        self.current: Optional[Dict] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._cancelled = False
+
+    @property
+    def active(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, bot, broadcasts: List[Dict]) -> bool:
+        """Xabar tarqatishni fonda boshlash (bir vaqtda faqat bittasi)"""
+        if self.active or not broadcasts:
+            return False
+        self._stopping = False
+        self._task = asyncio.ensure_future(self._run_all(bot, broadcasts))
+        return True
+
+    async def resume(self, bot) -> None:
+        """Bot to'xtaganda uzilib qolgan tarqatishlarni davom ettirish"""
+        broadcasts = await db_pool.run(get_running_broadcasts)
+        if broadcasts:
+            logging.info(f"{len(broadcasts)} ta uzilgan xabar tarqatish davom ettirilmoqda")
+            self.start(bot, broadcasts)
+
+    def cancel(self, broadcast_id: int) -> bool:
+        """Joriy tarqatishni bekor qilish (joriy chunk tugagach to'xtaydi)"""
+        if not self.active or not self.current or self.current['id'] != broadcast_id:
+            return False
+        self._cancelled = True
+        return True
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Bot to'xtaganda joriy chunk'ni tugatib, jarayonni saqlash"""
+        if not self.active:
+            return
+        self._stopping = True
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            logging.warning("Xabar tarqatish chunk tugashini kutmasdan to'xtatildi")
+        except Exception:
+            pass
+        self._task = None
+
+    async def _run_all(self, bot, broadcasts: List[Dict]) -> None:
+        for broadcast in broadcasts:
+            if self._stopping:
+                break
+            try:
+                await self._run(bot, broadcast)
+            except Exception as e:
+                logging.error(f"Xabar tarqatish #{broadcast['id']} da xatolik: {str(e)}")
+
+    async def _send(self, bot, user_id: int, broadcast: Dict) -> str:
+        """Bitta foydalanuvchiga xabar nusxasini yuborish (RetryAfter - ko'pi bilan max_retries marta)"""
+        for attempt in range(1, self.max_retries + 2):
+            try:
+                with bulk_requests():
+                    await bot.copy_message(user_id, broadcast['from_chat_id'], broadcast['message_id'])
+                return SENT
+            except RetryAfter as e:
+                if attempt > self.max_retries:
+                    logging.warning(f"Xabar tarqatish: {user_id} ga {self.max_retries} ta qayta urinishdan "
+                                    f"keyin ham yuborilmadi (RetryAfter {e.timeout} s)")
+                    return FAILED
+                logging.warning(f"Xabar tarqatish: Telegram {e.timeout} soniya kutishni so'radi "
+                                f"({attempt}/{self.max_retries})")
+                await asyncio.sleep(e.timeout)
+            except (Unauthorized, ChatNotFound):
+                return BLOCKED
+            except TelegramAPIError as e:
+                logging.debug(f"Xabar tarqatish: {user_id} ga yuborilmadi: {str(e)}")
+                return FAILED
+            except Exception as e:
+                logging.error(f"Xabar tarqatishda kutilmagan xatolik ({user_id}): {str(e)}")
+                return FAILED
+
+    async def _run(self, bot, broadcast: Dict) -> None:
+        self.current = broadcast
+        self._cancelled = False
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def deliver(user_id: int) -> str:
+            async with semaphore:
+                result = await self._send(bot, user_id, broadcast)
+            # Hisoblagichlar jonli hisobot uchun darhol, jarayon esa chunk oxirida saqlanadi
+            broadcast[result] += 1
+            return result
+
+        # Tezlik va qolgan vaqt joriy sessiya bo'yicha hisoblanadi
+        session = {'started': time.monotonic(), 'elapsed': broadcast['elapsed'],
+                   'processed': self._processed(broadcast)}
+        reporter = asyncio.ensure_future(self._report_periodically(bot, broadcast, session))
+        status = None
+
+        try:
+            while not self._stopping:
+                if self._cancelled:
+                    status = 'cancelled'
+                    break
+
+                user_ids = await db_pool.run(get_active_user_ids, broadcast['last_user_id'], self.chunk_size)
+                if not user_ids:
+                    status = 'done'
+                    break
+
+                results = await asyncio.gather(*(deliver(user_id) for user_id in user_ids))
+
+                blocked = [user_id for user_id, result in zip(user_ids, results) if result == BLOCKED]
+                broadcast['last_user_id'] = user_ids[-1]
+                broadcast['elapsed'] = session['elapsed'] + time.monotonic() - session['started']
+
+                await db_pool.run(mark_users_inactive, blocked)
+                await db_pool.run(save_broadcast_progress, broadcast)
+        finally:
+            reporter.cancel()
+            self.current = None
+
+        if status:
+            await db_pool.run(finish_broadcast, broadcast['id'], status)
+            logging.info(
+                f"Xabar tarqatish #{broadcast['id']} {status}: {broadcast['sent']} yuborildi, "
+                f"{broadcast['blocked']} bloklagan, {broadcast['failed']} xatolik, "
+                f"{format_duration(broadcast['elapsed'])}"
+            )
+        await self._report(bot, broadcast, session, status)
+
+    @staticmethod
+    def _processed(broadcast: Dict) -> int:
+        return broadcast['sent'] + broadcast['failed'] + broadcast['blocked']
+
+    async def _report_periodically(self, bot, broadcast: Dict, session: Dict) -> None:
+        while True:
+            await asyncio.sleep(self.report_interval)
+            await self._report(bot, broadcast, session)
+
+    def format_report(self, broadcast: Dict, session: Dict, status: str = None) -> str:
+        processed = self._processed(broadcast)
+        total = max(broadcast['total'], processed)
+        percent = processed * 100 / total if total else 100
+
+        session_elapsed = time.monotonic() - session['started']
+        rate = (processed - session['processed']) / session_elapsed if session_elapsed > 0 else 0
+
+        if status == 'done':
+            title = "✅ **Xabar yuborish yakunlandi**"
+        elif status == 'cancelled':
+            title = "⏹ **Xabar yuborish to'xtatildi**"
+        elif status is None and self._stopping:
+            title = "⏸ **Xabar yuborish to'xtatildi** (bot qayta ishga tushganda davom etadi)"
+        else:
+            title = "📢 **Xabar yuborilmoqda...**"
+
+        text = f"""{title}
+
+✅ Yuborildi: {broadcast['sent']}
+🚫 Bloklagan: {broadcast['blocked']}
+❌ Xatolik: {broadcast['failed']}
+📊 Jarayon: {processed}/{total} ({percent:.1f}%)
+⚡ Tezlik: {rate:.1f} xabar/s"""
+
+        if status:
+            text += f"\n⏱️ Umumiy vaqt: {format_duration(broadcast['elapsed'])}"
+        elif rate > 0:
+            text += f"\n⏱️ Qolgan vaqt: ~{format_duration((total - processed) / rate)}"
+        return text
+
+    async def _report(self, bot, broadcast: Dict, session: Dict, status: str = None) -> None:
+        """Admin xabarida jarayonni yangilash"""
+        if not broadcast.get('status_message_id'):
+            return
+
+        keyboard = None
+        if status is None and not self._stopping:
+            keyboard = InlineKeyboardMarkup().add(
+                InlineKeyboardButton("⏹ To'xtatish", callback_data=f"broadcast_cancel_{broadcast['id']}")
+            )
+
+        try:
+            await bot.edit_message_text(
+                self.format_report(broadcast, session, status),
+                chat_id=broadcast['admin_chat_id'],
+                message_id=broadcast['status_message_id'],
+                reply_markup=keyboard,
+                parse_mode=ParseMode.MARKDOWN
+            )
+        except MessageNotModified:
+            pass
+        except Exception as e:
+            logging.error(f"Xabar tarqatish holatini yangilashda xatolik: {str(e)}")
+
+
+broadcaster = Broadcaster(
+    concurrency=config.BROADCAST_CONCURRENCY,
+    chunk_size=config.BROADCAST_CHUNK_SIZE,
+    report_interval=config.BROADCAST_REPORT_INTERVAL,
+    max_retries=config.BROADCAST_MAX_RETRIES
+)
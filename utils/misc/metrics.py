@@ -0,0 +1,249 @@
+import asyncio
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Gistogramma chegaralari (millisekund)
+DEFAULT_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Qat'iy chegarali gistogramma (Prometheus uslubida, kvantillar taxminiy)"""
+
+    __slots__ = ('buckets', 'counts', 'count', 'sum', 'max')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # oxirgisi - +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """q-kvantil (kvantil tushgan chegaraning yuqori qiymati, max dan oshmaydi)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    @property
+    def avg(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Labels, extra: str = None) -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class MetricsRegistry:
+    """Hisoblagichlar, gistogrammalar va gauge'lar (ishchi oqimlardan ham yozish mumkin)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.gauges: Dict[Tuple[str, Labels], float] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name: str, labels: Dict) -> Tuple[str, Labels]:
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def set_counter(self, name: str, value: float, **labels) -> None:
+        """Tashqarida hisoblanadigan (kesh, pul...) hisoblagich qiymatini o'rnatish"""
+        key = self._key(name, labels)
+        with self._lock:
+            self.counters[key] = value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        key = self._key(name, labels)
+        with self._lock:
+            self.gauges[key] = value
+
+    def add_collector(self, func: Callable[[], None]) -> None:
+        """Eksportdan oldin chaqiriladigan funksiya (set_counter/set_gauge bilan qiymat yozadi)"""
+        self._collectors.append(func)
+
+    def register_cache(self, name: str, cache) -> None:
+        """get_stats() li keshni (LRUCache, KeyboardCache) metrikalarga ulash"""
+
+        def collect():
+            stats = cache.get_stats()
+            self.set_counter('cache_hits_total', stats['hits'], cache=name)
+            self.set_counter('cache_misses_total', stats['misses'], cache=name)
+            self.set_gauge('cache_size', stats['size'], cache=name)
+            self.set_gauge('cache_hit_ratio', stats['hit_rate'], cache=name)
+
+        self.add_collector(collect)
+
+    def collect(self) -> None:
+        for func in self._collectors:
+            try:
+                func()
+            except Exception as e:
+                logging.error(f"Metrikalarni yig'ishda xatolik: {str(e)}")
+
+    def get_counters(self, name: str) -> Dict[Labels, float]:
+        with self._lock:
+            return {labels: value for (n, labels), value in self.counters.items() if n == name}
+
+    def get_histograms(self, name: str) -> Dict[Labels, Histogram]:
+        with self._lock:
+            return {labels: h for (n, labels), h in self.histograms.items() if n == name}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.gauges.clear()
+            self.started_at = time.time()
+
+    def render_prometheus(self, prefix: str = '') -> str:
+        """Prometheus text formatida (version 0.0.4) eksport"""
+        self.collect()
+        with self._lock:
+            counters = sorted(self.counters.items())
+            gauges = sorted(self.gauges.items())
+            histograms = sorted(((key, h.buckets, list(h.counts), h.count, h.sum)
+                                 for key, h in self.histograms.items()), key=lambda item: item[0])
+
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f'# TYPE {name} {kind}')
+
+        for (name, labels), value in counters:
+            declare(prefix + name, 'counter')
+            lines.append(f'{prefix}{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for (name, labels), value in gauges:
+            declare(prefix + name, 'gauge')
+            lines.append(f'{prefix}{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for (name, labels), buckets, counts, count, total in histograms:
+            full = prefix + name
+            declare(full, 'histogram')
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + ('+Inf',), counts):
+                cumulative += bucket_count
+                le = _format_labels(labels, f'le="{bound}"')
+                lines.append(f'{full}_bucket{le} {cumulative}')
+            lines.append(f'{full}_sum{_format_labels(labels)} {_format_value(total)}')
+            lines.append(f'{full}_count{_format_labels(labels)} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+
+
+class UpdateStats:
+    """Bitta update davomidagi SQL va Bot API chaqiruvlari"""
+
+    __slots__ = ('handler', 'started', 'db_count', 'db_time', 'api_count', 'api_time')
+
+    def __init__(self):
+        self.handler: Optional[str] = None
+        self.started = time.perf_counter()
+        self.db_count = 0
+        self.db_time = 0.0
+        self.api_count = 0
+        self.api_time = 0.0
+
+
+# Joriy update statistikasi (db_pool.run kontekstni ishchi oqimga ham o'tkazadi)
+current_update: ContextVar[Optional[UpdateStats]] = ContextVar('current_update', default=None)
+
+
+def record_db_query(elapsed: float, sql: str) -> None:
+    """SQL so'rov vaqtini yozish (ConnectionPool dan chaqiriladi, sql - sql_label() yorlig'i)"""
+    metrics.observe('db_query_ms', elapsed * 1000, sql=sql)
+    stats = current_update.get()
+    if stats is not None:
+        stats.db_count += 1
+        stats.db_time += elapsed
+
+
+def record_api_call(method: str, elapsed: float) -> None:
+    """Bot API so'rov vaqtini yozish (RateLimitedBot dan chaqiriladi)"""
+    metrics.observe('bot_api_ms', elapsed * 1000, method=method)
+    stats = current_update.get()
+    if stats is not None:
+        stats.api_count += 1
+        stats.api_time += elapsed
+
+
+def timed(name: str = None):
+    """Funksiya bajarilish vaqtini db_func_ms gistogrammasiga yozish dekoratori"""
+
+    def decorator(func):
+        label = name or func.__name__
+
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    metrics.observe('db_func_ms', (time.perf_counter() - started) * 1000, func=label)
+
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                metrics.observe('db_func_ms', (time.perf_counter() - started) * 1000, func=label)
+
+        return wrapper
+
+    return decorator
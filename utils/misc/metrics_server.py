@@ -0,0 +1,51 @@
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+from data import config
+from utils.misc.metrics import metrics
+
+METRICS_PREFIX = 'jurnal_bot_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+async def metrics_handler(request: web.Request) -> web.Response:
+    """GET /metrics - Prometheus text formatidagi metrikalar"""
+    body = metrics.render_prometheus(METRICS_PREFIX)
+    return web.Response(body=body.encode('utf-8'), headers={'Content-Type': CONTENT_TYPE})
+
+
+class MetricsServer:
+    """Prometheus uchun lokal HTTP endpoint (bot bilan bitta event loop'da ishlaydi)"""
+
+    def __init__(self, host: str, port: int, path: str = '/metrics'):
+        self.host = host
+        self.port = port
+        self.path = path
+        self._runner: Optional[web.AppRunner] = None
+
+    async def start(self) -> None:
+        if self._runner is not None:
+            return
+
+        app = web.Application()
+        app.router.add_get(self.path, metrics_handler)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        try:
+            await web.TCPSite(runner, self.host, self.port).start()
+        except Exception:
+            await runner.cleanup()
+            raise
+        self._runner = runner
+        logging.info(f"Metrikalar http://{self.host}:{self.port}{self.path} manzilida")
+
+    async def stop(self) -> None:
+        if self._runner is None:
+            return
+        await self._runner.cleanup()
+        self._runner = None
+
+
+metrics_server = MetricsServer(config.METRICS_HOST, config.METRICS_PORT, config.METRICS_PATH)
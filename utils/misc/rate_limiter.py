@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from aiogram import Bot
+from aiogram.utils.exceptions import RetryAfter, TelegramAPIError
+
+from utils.misc.metrics import metrics, record_api_call
+from utils.misc.token_bucket import BucketMap, TokenBucket
+
+# Chatga xabar chiqaradigan (Telegram xabar limitlariga kiradigan) metodlar
+PACED_METHOD_PREFIXES = ('send', 'copyMessage', 'forwardMessage', 'editMessage')
+# Xabar limitlariga kirmaydigan metodlar (navbatda kutsa, ma'nosini yo'qotadi)
+UNPACED_METHODS = ('sendChatAction',)
+
+# Ommaviy so'rovlar (xabar tarqatish) belgisi - ular interaktiv javoblar uchun zaxirani ishlata olmaydi
+_bulk = ContextVar('bulk_requests', default=False)
+
+
+@contextmanager
+def bulk_requests():
+    """Blok ichidagi so'rovlarni ommaviy deb belgilash"""
+    token = _bulk.set(True)
+    try:
+        yield
+    finally:
+        _bulk.reset(token)
+
+
+class RateLimitedBot(Bot):
+    """Bot API so'rovlarini tezlik limitlari bo'yicha navbatga qo'yadigan Bot
+
+    Xabar yuboruvchi/tahrirlovchi so'rovlar yuborilishidan oldin umumiy
+    (global_rate xabar/s) va chat bo'yicha (shaxsiy chatlar chat_rate,
+    guruhlar group_rate xabar/s) token bucket'lardan token kutadi. Telegram
+    RetryAfter qaytarsa, chat chelagi ko'rsatilgan vaqtga to'xtatiladi va
+    so'rov max_retry_delay soniyadan oshmasa qayta yuboriladi - shunda
+    tirband paytda javoblar yo'qolmasdan biroz kechikib boradi.
+
+    bulk_requests() ichidagi so'rovlar (xabar tarqatish) umumiy chelakdan
+    oldin (global_rate - interactive_reserve) xabar/s li alohida chelakdan
+    token oladi, shuning uchun tarqatish paytida ham foydalanuvchilarga
+    javoblar uchun kamida interactive_reserve xabar/s qoladi.
+    """
+
+    def __init__(self, *args, global_rate: float = 30, chat_rate: float = 1, chat_burst: int = 3,
+                 group_rate: float = 20 / 60, interactive_reserve: float = 5, max_retries: int = 3,
+                 max_retry_delay: float = 30, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.global_bucket = TokenBucket(global_rate)
+        self.bulk_bucket = TokenBucket(max(global_rate - interactive_reserve, 1))
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.group_rate = group_rate
+        self.max_retries = max_retries
+        self.max_retry_delay = max_retry_delay
+        self._chat_buckets = BucketMap(idle_ttl=600)
+
+        # Metrikalar
+        self.queued = 0
+        self.max_queued = 0
+        self.paced = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.retries = 0
+        metrics.add_collector(self._collect_metrics)
+
+    def _chat_bucket(self, chat_id) -> TokenBucket:
+        if isinstance(chat_id, str) or chat_id < 0:
+            # Guruh va kanallar (manfiy ID yoki @username) uchun qattiqroq limit
+            return self._chat_buckets.get(chat_id, lambda: TokenBucket(self.group_rate, 1))
+        return self._chat_buckets.get(chat_id, lambda: TokenBucket(self.chat_rate, self.chat_burst))
+
+    async def _acquire(self, chat_id) -> None:
+        """Chat va umumiy limitdan token kutish (navbat metrikalari bilan)"""
+        started = time.monotonic()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._chat_bucket(chat_id).acquire()
+            if _bulk.get():
+                await self.bulk_bucket.acquire()
+            await self.global_bucket.acquire()
+        finally:
+            self.queued -= 1
+
+        waited = time.monotonic() - started
+        self.paced += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+
+    async def request(self, method, data: Optional[Dict] = None, files: Optional[Dict] = None, **kwargs):
+        chat_id = data.get('chat_id') if data else None
+        if isinstance(chat_id, str) and chat_id.lstrip('-').isdigit():
+            chat_id = int(chat_id)
+        paced = (chat_id is not None and method.startswith(PACED_METHOD_PREFIXES)
+                 and method not in UNPACED_METHODS)
+
+        attempt = 0
+        while True:
+            if paced:
+                await self._acquire(chat_id)
+            started = time.perf_counter()
+            try:
+                return await super().request(method, data, files, **kwargs)
+            except RetryAfter as e:
+                metrics.inc('bot_api_errors_total', method=method, error='RetryAfter')
+                if _bulk.get():
+                    # Ommaviy yuborish limitga urildi - boshqa ommaviy so'rovlar ham kutadi
+                    self.bulk_bucket.pause(e.timeout)
+                attempt += 1
+                # Fayl yuklovchi so'rovlar qayta yuborilmaydi (fayl oqimi allaqachon o'qilgan)
+                if files or attempt > self.max_retries or e.timeout > self.max_retry_delay:
+                    raise
+
+                self.retries += 1
+                logging.warning(f"Bot API: {method} uchun {e.timeout} soniyadan keyin qayta urinish "
+                                f"({attempt}/{self.max_retries})")
+                if chat_id is not None:
+                    self._chat_bucket(chat_id).pause(e.timeout)
+                if not paced:
+                    await asyncio.sleep(e.timeout)
+            except TelegramAPIError as e:
+                metrics.inc('bot_api_errors_total', method=method, error=type(e).__name__)
+                raise
+            finally:
+                record_api_call(method, time.perf_counter() - started)
+
+    def _collect_metrics(self) -> None:
+        metrics.set_gauge('bot_api_queued', self.queued)
+        metrics.set_gauge('bot_api_chat_buckets', len(self._chat_buckets))
+        metrics.set_counter('bot_api_paced_total', self.paced)
+        metrics.set_counter('bot_api_wait_seconds_total', self.wait_total)
+        metrics.set_counter('bot_api_retries_total', self.retries)
+
+    def get_stats(self) -> Dict:
+        """Navbat statistikasi"""
+        return {
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'paced': self.paced,
+            'avg_wait_ms': round(self.wait_total / self.paced * 1000, 1) if self.paced else 0,
+            'max_wait_ms': round(self.wait_max * 1000, 1),
+            'retries': self.retries,
+            'chats': len(self._chat_buckets)
+        }
@@ -1,14 +1,16 @@
-def rate_limit(limit: int, key=None):
+def rate_limit(limit: int, key=None, burst: int = 1):
     """
     Decorator for configuring rate limit and key in different functions.
 
     :param limit:
     :param key:
+    :param burst:
     :return:
     """
 
     def decorator(func):
         setattr(func, 'throttling_rate_limit', limit)
+        setattr(func, 'throttling_burst', burst)
         if key:
             setattr(func, 'throttling_key', key)
         return func
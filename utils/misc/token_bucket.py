@@ -0,0 +1,108 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class TokenBucket:
+    """Token bucket tezlik cheklovchisi
+
+    Chelak capacity tagacha token saqlaydi va soniyasiga rate ta token bilan
+    to'ladi. Har bir amal bitta token sarflaydi, token bo'lmasa keyingi token
+    paydo bo'lguncha kutiladi. pause() bilan chelak butunlay to'xtatib
+    qo'yiladi (masalan, Telegram RetryAfter qaytarganda).
+    """
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at', 'paused_until', '_lock')
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = None
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+            self.updated_at = now
+
+    def consume(self, tokens: float = 1, now: float = None) -> float:
+        """Token olishga urinish (bloklamaydi)
+
+        0 qaytarsa token olindi, aks holda token paydo bo'lishigacha
+        kutish kerak bo'lgan soniyalar qaytariladi.
+        """
+        now = time.monotonic() if now is None else now
+        if now < self.paused_until:
+            return self.paused_until - now
+
+        self._refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1) -> None:
+        """Token olinguncha kutish
+
+        Kutayotganlar kelish tartibida (FIFO) xizmat qilinadi - aks holda
+        uyg'ongan har bir korutina tokenni birinchi bo'lib olishga urinadi va
+        ba'zi so'rovlar cheksiz kechikib qolishi mumkin.
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                delay = self.consume(tokens)
+                if not delay:
+                    return
+                await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        """Chelakni seconds soniyaga to'xtatish (to'plangan tokenlar ham bekor qilinadi)"""
+        now = time.monotonic()
+        self.paused_until = max(self.paused_until, now + seconds)
+        self.tokens = 0.0
+        self.updated_at = self.paused_until
+
+
+class BucketMap:
+    """Kalit (foydalanuvchi, chat...) bo'yicha token bucket'lar
+
+    Oxirgi ishlatilgan chelak lug'at oxiriga o'tkaziladi, shuning uchun
+    idle_ttl soniya ishlatilmagan (yoki max_size dan oshgan) chelaklar
+    eng eskisidan boshlab O(1) amortizatsiya bilan o'chiriladi.
+    """
+
+    def __init__(self, idle_ttl: float = 600, max_size: int = 100000):
+        self.idle_ttl = idle_ttl
+        self.max_size = max_size
+        self._buckets: 'OrderedDict[Hashable, TokenBucket]' = OrderedDict()
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def __iter__(self):
+        return iter(self._buckets)
+
+    def get(self, key: Hashable, factory: Callable[[], TokenBucket], now: float = None) -> TokenBucket:
+        """Kalit uchun chelakni olish (bo'lmasa factory() bilan yaratiladi)"""
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            return bucket
+
+        bucket = self._buckets[key] = factory()
+        self._evict(time.monotonic() if now is None else now)
+        return bucket
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        while buckets:
+            key, bucket = next(iter(buckets.items()))
+            if len(buckets) <= self.max_size and now - bucket.updated_at < self.idle_ttl:
+                break
+            del buckets[key]
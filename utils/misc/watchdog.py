@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Dict, List, Optional
+
+from data import config
+from utils.misc.metrics import metrics
+
+# Loyiha ildizi (stekdan loyiha fayllarini ajratish uchun)
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HANDLERS_DIR = os.path.join(BASE_DIR, 'handlers') + os.sep
+DB_API_DIR = os.path.join(BASE_DIR, 'utils', 'db_api') + os.sep
+POOL_FILE = os.path.join(DB_API_DIR, 'pool.py')
+AIOGRAM_NOTIFY_FILE = os.path.join('aiogram', 'dispatcher', 'handler.py')
+
+
+def find_culprits(stack: List[traceback.FrameSummary]) -> Dict[str, str]:
+    """Stekdan handler (eng tashqi handlers/ kadri) va db_api funksiyasini (eng ichki) topish"""
+    handler = next((f.name for f in stack if f.filename.startswith(HANDLERS_DIR)), None)
+    if handler is None:
+        # handlers/ dan tashqaridagi handler - aiogram Handler.notify chaqirgan oxirgi kadr
+        notify = [i for i, f in enumerate(stack) if f.filename.endswith(AIOGRAM_NOTIFY_FILE)]
+        handler = stack[notify[-1] + 1].name if notify and notify[-1] + 1 < len(stack) else 'none'
+
+    db_frames = [f for f in stack if f.filename.startswith(DB_API_DIR)]
+    # pool.py - faqat o'ram, asosiy funksiya undan oldingi kadrda
+    named = [f for f in db_frames if f.filename != POOL_FILE] or db_frames
+    func = named[-1].name if named else 'none'
+    return {'handler': handler, 'func': func}
+
+
+class LoopWatchdog:
+    """Event loop kechikishini (lag) o'lchash va bloklovchi chaqiruvlarni aniqlash
+
+    Loop ichidagi vazifa har interval soniyada uxlab, uyg'onish qancha
+    kechikkanini loop_lag_ms gistogrammasiga yozadi. Alohida oqim esa
+    vazifa belgilangan vaqtdan threshold soniyadan ko'p kechikayotganini
+    (ya'ni loop hozir bloklanganini) sezsa, loop oqimining stekini oladi:
+    handler nomi va db_api funksiyasi logga hamda loop_blocked_total /
+    loop_blocked_ms metrikalariga yoziladi.
+    """
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.blocked_count = 0
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id: Optional[int] = None
+        self._deadline = 0.0  # vazifa uyg'onishi kerak bo'lgan vaqt (monotonic)
+        self._captured: Optional[Dict] = None  # joriy bloklanishda olingan stek
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # loop.time() ham time.monotonic() ga asoslangan
+            self._deadline = expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe('loop_lag_ms', lag * 1000)
+            metrics.set_gauge('loop_lag_last_ms', lag * 1000)
+
+            captured, self._captured = self._captured, None
+            if captured is not None and captured['deadline'] == expected:
+                self._report(captured, lag)
+
+    def _report(self, captured: Dict, lag: float) -> None:
+        """Bloklanish tugagach, uning davomiyligi bilan birga log va metrikalarga yozish"""
+        self.blocked_count += 1
+        handler, func = captured['handler'], captured['func']
+        metrics.inc('loop_blocked_total', handler=handler, func=func)
+        metrics.observe('loop_blocked_ms', lag * 1000, handler=handler, func=func)
+        logging.warning(f"Event loop {lag * 1000:.0f} ms bloklandi (handler: {handler}, db_api: {func})\n"
+                        f"{captured['stack']}")
+
+    def _monitor(self) -> None:
+        """Loop bloklanganini sezib, loop oqimi stekini olish (alohida oqimda)"""
+        check_interval = max(self.threshold / 2, 0.01)
+        while not self._stop_event.wait(check_interval):
+            deadline = self._deadline
+            if not deadline or self._captured is not None:
+                continue
+            if time.monotonic() - deadline < self.threshold:
+                continue
+
+            # sys._current_frames - CPython'da boshqa oqimning joriy stekini olishning yagona yo'li
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            del frame
+            project_stack = [f for f in stack if f.filename.startswith(BASE_DIR)] or stack
+            self._captured = {
+                'deadline': deadline,
+                **find_culprits(stack),
+                'stack': ''.join(traceback.format_list(project_stack)).rstrip()
+            }
+
+    def start(self) -> None:
+        if self.interval <= 0 or self._task is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.create_task(self._run())
+
+        if self.threshold > 0:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._monitor, name='loop-watchdog', daemon=True)
+            self._thread.start()
+        logging.info(f"Event loop kuzatuvi ishga tushdi (har {self.interval} soniyada, "
+                     f"bloklanish chegarasi {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stop_event.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def get_stats(self):
+        """Kechikish statistikasi (ms)"""
+        return {
+            'last_lag_ms': round(self.last_lag * 1000, 1),
+            'max_lag_ms': round(self.max_lag * 1000, 1),
+            'blocked_count': self.blocked_count
+        }
+
+
+loop_watchdog = LoopWatchdog(config.LOOP_LAG_INTERVAL, config.LOOP_BLOCK_THRESHOLD)
@@ -0,0 +1,73 @@
+import asyncio
+import hmac
+import logging
+import time
+
+from aiohttp import web
+from aiogram.dispatcher.webhook import WebhookRequestHandler
+
+from data import config
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+
+class InflightTracker:
+    """Ishlanayotgan webhook so'rovlarini sanash (to'xtashda kutib turish uchun)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def enter(self):
+        self.count += 1
+
+    def exit(self):
+        self.count -= 1
+
+    async def drain(self, timeout: float) -> bool:
+        """Barcha so'rovlar tugashini kutish (timeout soniyagacha)"""
+        deadline = time.monotonic() + timeout
+        if self.count:
+            logging.info(f"Webhook: {self.count} ta so'rov tugashi kutilmoqda...")
+
+        while self.count and time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+
+        if self.count:
+            logging.warning(f"Webhook: {self.count} ta so'rov {timeout} soniyada tugamadi")
+            return False
+        return True
+
+
+webhook_inflight = InflightTracker()
+
+
+class SecretWebhookRequestHandler(WebhookRequestHandler):
+    """Telegram maxfiy tokenini tekshiradigan webhook handler"""
+
+    def validate_secret(self):
+        if not config.WEBHOOK_SECRET:
+            return
+
+        token = self.request.headers.get(SECRET_HEADER, '')
+        if not hmac.compare_digest(token, config.WEBHOOK_SECRET):
+            logging.warning(f"Webhook: noto'g'ri maxfiy token ({self.request.remote})")
+            raise web.HTTPUnauthorized()
+
+    async def post(self):
+        self.validate_secret()
+
+        webhook_inflight.enter()
+        try:
+            return await super().post()
+        finally:
+            webhook_inflight.exit()
+
+
+async def setup_webhook(bot):
+    """Telegramda webhook manzilini o'rnatish"""
+    await bot.set_webhook(
+        config.WEBHOOK_URL,
+        secret_token=config.WEBHOOK_SECRET or None,
+        max_connections=config.WEBHOOK_MAX_CONNECTIONS
+    )
+    logging.info(f"Webhook o'rnatildi: {config.WEBHOOK_URL}")
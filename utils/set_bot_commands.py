@@ -5,6 +5,7 @@ async def set_default_commands(dp):
     await dp.bot.set_my_commands(
         [
             types.BotCommand("start", "Botni ishga tushurish"),
+            types.BotCommand("search", "Jurnal qidirish"),
             types.BotCommand("help", "Yordam"),
         ]
     )